@@ -1,15 +1,28 @@
 import requests
-import time
 import hashlib
 import json
 import html
 from datetime import datetime, timezone
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Optional, Set, Tuple
 import re
 from bs4 import BeautifulSoup
 from pathlib import Path
 import asyncio
-from playwright.async_api import async_playwright
+import time
+
+# Import warm browser pool
+from browser_pool_system import DashboardBrowserPool
+from asset_bundle_system import AssetBundle
+from output_profile_system import DashboardOutputProfiles
+from native_renderer_system import NativeDashboardRenderer
+from svg_renderer_system import SvgDashboardRenderer
+from variant_matrix_system import DashboardVariantMatrix
+from render_cache_system import DashboardRenderCache
+from cycle_trace_system import CycleTrace
+from dashboard_template_system import DashboardTemplate
+from render_queue_system import open_render_queue
+from image_store_system import DashboardImageStore
+from image_encoder_system import FORMAT_EXTENSIONS, default_encoder
 
 # Import trend cache system
 from trend_cache_system import HospitalTrendCache
@@ -37,6 +50,15 @@ MOBILE_COMPACT = True
 # Local state file for change detection
 STATE_FILE = "state.json"
 
+# Wait history ring buffer (fixed-size binary file, memory-mapped): readings kept per hospital.
+# 2016 = 7 days of 5-minute polls, enough for the longest trend window ('7d'); longer retention
+# costs disk only, not startup or save time
+HISTORY_FILE = "hospital_wait_history.bin"
+HISTORY_RETENTION_READINGS = 7 * 24 * 3600 // POLL_SECONDS
+
+# Average-wait trend line in the Telegram text: {trend window: label} (windows from TREND_WINDOWS)
+TELEGRAM_TREND_WINDOWS = {'1h': "vs 1h ago", '24h': "vs yesterday", '7d': "vs last week"}
+
 # Severity thresholds (minutes)
 THRESHOLDS = {
     "red": 240,
@@ -46,13 +68,65 @@ THRESHOLDS = {
 
 # Dashboard configuration
 GENERATE_DASHBOARD = True  # Set to False to disable dashboard generation
-DASHBOARD_FILE = "dashboard_current.png"  # Legacy filename for compatibility
-DASHBOARD_HTML_TEMPLATE = "dashboard.html"
-
-# 4K Screenshot configuration
+DASHBOARD_FILE = "dashboard_current.png"  # Legacy filename for compatibility (only written when archiving)
+ARCHIVE_DASHBOARD_IMAGES = False  # Keep dashboard_4k_<timestamp> copies on disk (written in the background)
+ARCHIVE_DIR = "dashboard_archive"  # Managed image store: oldest-used images evicted beyond the budget below
+ARCHIVE_MAX_BYTES = 200 * 1024 * 1024
+ARCHIVE_MAX_FILES = 200
+ARCHIVE_THUMBNAIL_LONG_EDGE = 480  # Small copies kept after full images are evicted (None = no thumbnails)
+ARCHIVE_MAX_THUMBNAIL_BYTES = 20 * 1024 * 1024
+DASHBOARD_HTML_TEMPLATE = "dashboard.html"  # Compiled once at startup (restart to pick up edits)
+WRITE_DEBUG_HTML = False  # Write dashboard_debug.html (template + data, opens standalone) in the background
+DASHBOARD_SVG_FILE = "dashboard_current.svg"  # Vector copy for web clients (svg backend, served by enhanced_app.py)
+DASHBOARD_DATA_LOG_FILE = None  # e.g. "dashboard_payloads.jsonl": append each render's data (replay with benchmark_stages.py)
+
+# 4K Screenshot configuration (CSS layout viewport - final pixel size comes from the output profile)
 SCREENSHOT_4K_WIDTH = 3840
 SCREENSHOT_4K_HEIGHT = 2160
-SCREENSHOT_DEVICE_SCALE = 2  # Retina-level clarity
+
+# Output profile: final pixel size, byte budget and encoder (see output_profile_system.OUTPUT_PROFILES)
+# 'telegram' = 2560px long edge (Telegram's own limit), 'archive' = previous 4K @ 2x JPEG q95
+OUTPUT_PROFILE = "telegram"
+
+# Render backend: 'playwright' (Chromium + dashboard.html), 'native' (Pillow drawing of the same layout, no browser)
+# or 'svg' (same layout as an SVG document, rasterised with resvg - the SVG is also written for the web)
+DASHBOARD_RENDER_BACKEND = "playwright"
+
+# Extra variants rendered alongside the main image (playwright backend), written as dashboard_<variant>.png
+# Dicts of aspect ('portrait'/'landscape'), theme ('dark'/'light') and scale; each aspect+theme is one
+# browser render and other scales are resampled from it, e.g.:
+#   DashboardVariantMatrix.expand(["portrait", "landscape"], ["dark", "light"], [1, 0.5])
+DASHBOARD_EXTRA_VARIANTS: List[Dict[str, Any]] = []
+
+# Render cache: identical dashboard data + profile reuses the last encoded image instead of re-rendering
+# (forced sends, retries). RENDER_CACHE_DIR = None keeps it in memory; set a directory to survive restarts
+RENDER_CACHE_MAX_BYTES = 64 * 1024 * 1024
+RENDER_CACHE_DIR = None
+
+# Render queue: None renders in this process. 'sqlite:///render_queue.db' (workers on this machine) or
+# 'redis://host:6379/0' (workers anywhere) hands renders to render_worker.py processes, so a hung Chromium
+# times out one job instead of stalling the poller. Extra variants still render here (playwright backend)
+RENDER_QUEUE_URL = None
+RENDER_JOB_TIMEOUT_S = 60  # Per-job limit enforced by the worker
+RENDER_QUEUE_WAIT_S = 120  # Give up on the image after this (queue wait + render); the text still goes out
+
+# Browser pool configuration (keeps Chromium and a loaded page warm between polls)
+USE_BROWSER_POOL = True  # Set to False to launch a fresh browser for every render
+BROWSER_POOL_MAX_RENDERS_PER_PAGE = 50  # Reload the page after this many renders
+BROWSER_POOL_MAX_RENDERS_PER_BROWSER = 200  # Relaunch Chromium after this many renders
+RENDER_READY_TIMEOUT_MS = 5000  # Capture anyway if the page hasn't signalled ready by then
+RENDER_ALLOW_NETWORK = False  # Render fully offline from assets/ (True = let unbundled requests through)
+
+# Polling cycle stages and what each waits for (text, render and persist run concurrently)
+CYCLE_DEPENDENCIES = {
+    "prepare": ["fetch"],
+    "text": ["prepare"],
+    "dashboard_data": ["prepare"],
+    "render": ["dashboard_data"],
+    "persist": ["dashboard_data"],
+    "photo": ["text", "render"],
+    "daily_update": ["persist", "photo"],  # Sent after the photo so the chat order is unchanged
+}
 
 # === EXPERIMENTAL FEATURES (Easy to toggle) ===
 # Feature 1: Portrait mode for better Telegram compression
@@ -62,10 +136,6 @@ USE_PORTRAIT_MODE = True  # Set to True to flip to 2160x3840 (preserves text det
 USE_TEXT_SCALING = True  # Set to True to scale all text by 25%
 TEXT_SCALE_FACTOR = 1.50  # 1.25 = 25% larger, 1.30 = 30% larger
 
-# Feature 3: JPEG export for better Telegram compression
-USE_JPEG_EXPORT = True  # Set to True to export as JPEG instead of PNG
-JPEG_QUALITY = 95  # 95 = high quality, avoids Telegram's aggressive re-encode
-
 # Apply experimental settings
 if USE_PORTRAIT_MODE:
     SCREENSHOT_4K_WIDTH, SCREENSHOT_4K_HEIGHT = 2160, 3840  # Flip to portrait
@@ -73,9 +143,62 @@ if USE_PORTRAIT_MODE:
 # Initialize trend cache
 trend_cache = HospitalTrendCache(
     cache_file="hospital_wait_cache.json",
-    history_file="hospital_wait_history.json"
+    history_file=HISTORY_FILE,
+    history_capacity=HISTORY_RETENTION_READINGS
+)
+
+# Initialize browser pool (Chromium is launched lazily on first render)
+browser_pool = DashboardBrowserPool(
+    max_renders_per_page=BROWSER_POOL_MAX_RENDERS_PER_PAGE,
+    max_renders_per_browser=BROWSER_POOL_MAX_RENDERS_PER_BROWSER,
+    ready_timeout_ms=RENDER_READY_TIMEOUT_MS,
+    asset_bundle=AssetBundle(allow_network=RENDER_ALLOW_NETWORK)
+)
+
+# Dashboard template with the experimental text scaling baked in (theme is filled per render)
+dashboard_template = DashboardTemplate(
+    Path(__file__).parent / DASHBOARD_HTML_TEMPLATE,
+    text_scale=TEXT_SCALE_FACTOR if USE_TEXT_SCALING else None
 )
 
+# Variant matrix for DASHBOARD_EXTRA_VARIANTS (pages share the browser pool's Chromium and context)
+variant_matrix = DashboardVariantMatrix(
+    browser_pool,
+    dashboard_template.html,
+    aspects={
+        "portrait": {"width": 2160, "height": 3840},
+        "landscape": {"width": 3840, "height": 2160},
+    },
+    selector='.max-w-6xl'
+)
+
+# Render cache (LRU under RENDER_CACHE_MAX_BYTES)
+render_cache = DashboardRenderCache(max_bytes=RENDER_CACHE_MAX_BYTES, cache_dir=RENDER_CACHE_DIR)
+
+# Archive image store (only created when archiving is on)
+image_store = DashboardImageStore(
+    Path(__file__).parent / ARCHIVE_DIR,
+    max_bytes=ARCHIVE_MAX_BYTES,
+    max_files=ARCHIVE_MAX_FILES,
+    thumbnail_long_edge=ARCHIVE_THUMBNAIL_LONG_EDGE,
+    max_thumbnail_bytes=ARCHIVE_MAX_THUMBNAIL_BYTES
+) if ARCHIVE_DASHBOARD_IMAGES else None
+
+# Render queue (None = render in this process)
+render_queue = open_render_queue(RENDER_QUEUE_URL) if RENDER_QUEUE_URL else None
+
+# Native renderer (used when DASHBOARD_RENDER_BACKEND = "native")
+native_renderer = NativeDashboardRenderer()
+
+# SVG renderer (used when DASHBOARD_RENDER_BACKEND = "svg")
+svg_renderer = SvgDashboardRenderer()
+
+# Output profiles (remembers the measured dashboard size to pick the device scale)
+output_profiles = DashboardOutputProfiles()
+
+# Background archive writes still in flight (awaited before shutdown)
+_archive_tasks: Set[asyncio.Task] = set()
+
 
 def now_iso() -> str:
     return datetime.now(timezone.utc).astimezone().strftime("%Y-%m-%d %H:%M:%S %Z")
@@ -384,7 +507,30 @@ def format_changes_section(changes: List[Dict[str, Any]]) -> str:
     return "\n".join(lines) + "\n\n"
 
 
-def format_message(rows: List[Dict[str, Any]], source_label: str, last_updated_any: Optional[str], changes: Optional[List[Dict[str, Any]]] = None) -> str:
+def format_trend_section(trend_windows: Dict[str, dict]) -> str:
+    """
+    Format the average wait change over each TELEGRAM_TREND_WINDOWS window for the Telegram text
+    
+    Args:
+        trend_windows: Dict of {window_name: summary} from trend_cache.calculate_windows()
+    
+    Returns:
+        HTML line like "📈 Average wait: ↑ 4% vs 1h ago | ↓ 2% vs yesterday", or "" with no comparisons
+    """
+    parts = []
+    for window, label in TELEGRAM_TREND_WINDOWS.items():
+        change = trend_windows.get(window, {}).get('avg_change_pct')
+        if change is None:
+            continue
+        arrow = "↑" if change > 0 else "↓" if change < 0 else "→"
+        parts.append(f"{arrow} {abs(change):.0f}% {label}")
+    
+    if not parts:
+        return ""
+    return f"<b>📈 Average wait:</b> {' | '.join(parts)}\n\n"
+
+
+def format_message(rows: List[Dict[str, Any]], source_label: str, last_updated_any: Optional[str], changes: Optional[List[Dict[str, Any]]] = None, trend_windows: Optional[Dict[str, dict]] = None) -> str:
     # (Keep all your existing format_message logic - not repeating for brevity)
     # Just return your existing formatted message
     rows_sorted = sorted(rows, key=lambda r: (r["wait_mins"] is None, -(r["wait_mins"] or 0)))
@@ -422,10 +568,12 @@ def format_message(rows: List[Dict[str, Any]], source_label: str, last_updated_a
         changes_section = ""
         if changes:
             changes_section = format_changes_section(changes) + "\n"
+        trend_section = format_trend_section(trend_windows) if trend_windows else ""
         
         header = (
             f"<b>🚑 NI Emergency Department Wait Times — Live Update</b>\n\n"
             f"<i>🕛 Updated: {header_time_esc}</i>\n\n"
+            f"{trend_section}"
             f"{changes_section}"
             f"<b>📊 Average over past 4 hours</b>\n\n"
             f"<b>Hospitals:</b>\n"
@@ -466,19 +614,18 @@ def telegram_send_message(text: str) -> Tuple[bool, Optional[str], Optional[int]
         return False, str(e), None
 
 
-def telegram_send_photo(image_path: str, caption: str = "") -> Tuple[bool, Optional[str]]:
-    """Send image to Telegram"""
+def telegram_send_photo(image_bytes: bytes, caption: str = "", filename: str = "dashboard.jpg") -> Tuple[bool, Optional[str]]:
+    """Send an in-memory image to Telegram"""
     url = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendPhoto"
     
     try:
-        with open(image_path, 'rb') as photo:
-            files = {'photo': photo}
-            data = {
-                'chat_id': TELEGRAM_CHAT_ID,
-                'caption': caption,
-                'parse_mode': 'HTML'
-            }
-            r = requests.post(url, files=files, data=data, timeout=30)
+        files = {'photo': (filename, image_bytes)}
+        data = {
+            'chat_id': TELEGRAM_CHAT_ID,
+            'caption': caption,
+            'parse_mode': 'HTML'
+        }
+        r = requests.post(url, files=files, data=data, timeout=30)
         
         response_data = {}
         try:
@@ -496,9 +643,177 @@ def telegram_send_photo(image_path: str, caption: str = "") -> Tuple[bool, Optio
         return False, str(e)
 
 
-async def generate_dashboard_image(hospitals_dict: Dict[str, int], theme: str = 'light', source_updated: str = None) -> Tuple[str, str]:
+def write_dashboard_archive(image_bytes: bytes, timestamp: str, file_extension: str) -> List[Path]:
+    """Store the timestamped copy of a dashboard image and replace the legacy copy (runs in a worker thread)"""
+    archived = image_store.put(f"dashboard_4k_{timestamp}.{file_extension}", image_bytes)
+    legacy = Path(__file__).parent / DASHBOARD_FILE
+    tmp_path = legacy.with_name(legacy.name + ".tmp")
+    tmp_path.write_bytes(image_bytes)
+    tmp_path.replace(legacy)
+    return [archived, legacy]
+
+
+def archive_dashboard_image(image_bytes: bytes, timestamp: str, file_extension: str) -> None:
+    """Persist a dashboard image in the background so disk I/O stays off the polling cycle"""
+    async def _archive():
+        try:
+            paths = await asyncio.to_thread(write_dashboard_archive, image_bytes, timestamp, file_extension)
+            print(f"[{now_iso()}] Archived: {', '.join(path.name for path in paths)}")
+        except Exception as e:
+            print(f"[{now_iso()}] Warning: Failed to archive dashboard image: {e}")
+    
+    task = asyncio.create_task(_archive())
+    _archive_tasks.add(task)
+    task.add_done_callback(_archive_tasks.discard)
+
+
+def write_dashboard_svg(svg: str) -> Path:
+    """Replace the served SVG atomically so web clients never read a half-written file (runs in a worker thread)"""
+    path = Path(__file__).parent / DASHBOARD_SVG_FILE
+    tmp_path = path.with_suffix(".svg.tmp")
+    tmp_path.write_text(svg, encoding="utf-8")
+    tmp_path.replace(path)
+    return path
+
+
+def publish_dashboard_svg(svg: str) -> None:
+    """Write the vector dashboard for web clients in the background"""
+    async def _publish():
+        try:
+            path = await asyncio.to_thread(write_dashboard_svg, svg)
+            print(f"[{now_iso()}] Published: {path.name} ({len(svg) // 1024} KB)")
+        except Exception as e:
+            print(f"[{now_iso()}] Warning: Failed to write dashboard SVG: {e}")
+    
+    task = asyncio.create_task(_publish())
+    _archive_tasks.add(task)
+    task.add_done_callback(_archive_tasks.discard)
+
+
+def write_dashboard_variants(images: Dict[str, Dict[str, Any]]) -> List[Path]:
+    """Write variant matrix images as dashboard_<variant>.<ext> (runs in a worker thread)"""
+    parent_dir = Path(__file__).parent
+    paths = []
+    for name, image in images.items():
+        path = parent_dir / f"dashboard_{name}.{FORMAT_EXTENSIONS[image['format']]}"
+        path.write_bytes(image['bytes'])
+        paths.append(path)
+    return paths
+
+
+def archive_dashboard_variants(images: Dict[str, Dict[str, Any]]) -> None:
+    """Persist variant matrix images in the background"""
+    async def _archive():
+        try:
+            paths = await asyncio.to_thread(write_dashboard_variants, images)
+            print(f"[{now_iso()}] Variants written: {', '.join(path.name for path in paths)}")
+        except Exception as e:
+            print(f"[{now_iso()}] Warning: Failed to write dashboard variants: {e}")
+    
+    task = asyncio.create_task(_archive())
+    _archive_tasks.add(task)
+    task.add_done_callback(_archive_tasks.discard)
+
+
+def append_dashboard_data(dashboard_data: Dict[str, Any], theme: str) -> None:
+    """Append one render payload to DASHBOARD_DATA_LOG_FILE (runs in a worker thread)"""
+    record = {"timestamp": now_iso(), "theme": theme, "dashboard_data": dashboard_data}
+    with open(Path(__file__).parent / DASHBOARD_DATA_LOG_FILE, "a", encoding="utf-8") as f:
+        f.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+
+def record_dashboard_data(dashboard_data: Dict[str, Any], theme: str) -> None:
+    """Record a render payload for benchmark replays in the background"""
+    async def _record():
+        try:
+            await asyncio.to_thread(append_dashboard_data, dashboard_data, theme)
+        except Exception as e:
+            print(f"[{now_iso()}] Warning: Failed to record dashboard data: {e}")
+    
+    task = asyncio.create_task(_record())
+    _archive_tasks.add(task)
+    task.add_done_callback(_archive_tasks.discard)
+
+
+def write_debug_html(html_content: str) -> None:
+    """Write dashboard_debug.html in the background"""
+    async def _write():
+        debug_html_path = Path(__file__).parent / "dashboard_debug.html"
+        try:
+            await asyncio.to_thread(debug_html_path.write_text, html_content, encoding='utf-8')
+            print(f"[DEBUG] Modified HTML saved to: {debug_html_path}")
+        except Exception as e:
+            print(f"[DEBUG] Failed to write {debug_html_path}: {e}")
+    
+    task = asyncio.create_task(_write())
+    _archive_tasks.add(task)
+    task.add_done_callback(_archive_tasks.discard)
+
+
+async def wait_for_archive_writes() -> None:
+    """Let pending archive writes finish (call before the event loop shuts down)"""
+    if _archive_tasks:
+        await asyncio.gather(*_archive_tasks, return_exceptions=True)
+
+
+def render_cache_settings(theme: str) -> Dict[str, Any]:
+    """Render settings outside dashboard_data that change the image (part of the render cache key)"""
+    settings = {'backend': DASHBOARD_RENDER_BACKEND}
+    if DASHBOARD_RENDER_BACKEND == "playwright":
+        settings['template'] = dashboard_template.key(theme)
+        settings['viewport'] = [SCREENSHOT_4K_WIDTH, SCREENSHOT_4K_HEIGHT]
+    return settings
+
+
+async def render_dashboard_playwright(dashboard_data: Dict[str, Any], theme: str) -> Dict[str, Any]:
+    """
+    Render dashboard data through dashboard.html on the warm Chromium pool
+    
+    Args:
+        dashboard_data: Data passed to updateDashboard()
+        theme: 'light' or 'dark'
+    
+    Returns:
+        Encoded image dict from DashboardOutputProfiles.capture()
+    """
+    html_content = dashboard_template.html(theme)
+    
+    # DEBUG: Save the template with data injected so it renders standalone (off the render path)
+    if WRITE_DEBUG_HTML:
+        write_debug_html(dashboard_template.with_data(theme, dashboard_data))
+    
+    # Log experimental features status
+    if USE_PORTRAIT_MODE:
+        print(f"[EXPERIMENTAL] Portrait mode enabled: {SCREENSHOT_4K_WIDTH}x{SCREENSHOT_4K_HEIGHT}")
+    if USE_TEXT_SCALING:
+        print(f"[EXPERIMENTAL] Text scaling wrapper applied: scale({TEXT_SCALE_FACTOR})")
+    
+    # Render on the warm page; the profile picks the device scale that lands on its final pixel size
+    # (layout stays at the 4K CSS viewport, so text proportions are unchanged)
+    template_key = hash(html_content)
+    variant = output_profiles.variant(
+        OUTPUT_PROFILE,
+        template_key,
+        {'width': SCREENSHOT_4K_WIDTH, 'height': SCREENSHOT_4K_HEIGHT}
+    )
+    
+    async def capture(page):
+        # Single screenshot of only the dashboard container (not the entire page), encoded in memory for the profile
+        return await output_profiles.capture(page, OUTPUT_PROFILE, template_key, selector='.max-w-6xl')
+    
+    image = await browser_pool.render(variant, html_content, dashboard_data, capture)
+    
+    print(f"[{now_iso()}] Profile: {OUTPUT_PROFILE} | {image['width']}x{image['height']} @ {variant['scale']}x scale | "
+          f"{image['format'].upper()}" + (f" (quality={image['quality']})" if image['quality'] else "") +
+          f" | {len(image['bytes']) // 1024} KB")
+    return image
+
+
+def build_dashboard_data(hospitals_dict: Dict[str, int], theme: str = 'light', source_updated: str = None) -> Tuple[Dict[str, Any], str]:
     """
-    Generate dashboard image using Playwright
+    Calculate trends against the trend cache and build the data passed to updateDashboard()
+    
+    Reads the trend cache only, so trend_cache.update_cache() can run as soon as this returns.
     
     Args:
         hospitals_dict: Dict of {hospital_name: wait_minutes}
@@ -506,12 +821,14 @@ async def generate_dashboard_image(hospitals_dict: Dict[str, int], theme: str =
         source_updated: When NI Direct last updated (from their webpage)
     
     Returns:
-        Tuple of (image_path, headline_text)
+        Tuple of (dashboard_data, headline_text)
     """
-    # Calculate all stats using trend cache
-    trends = trend_cache.calculate_trends(hospitals_dict)
-    biggest_change_24h = trend_cache.calculate_biggest_24h_change(hospitals_dict)
-    pressure = trend_cache.calculate_pressure_index(hospitals_dict)
+    # Calculate all stats using trend cache (one pass over the history)
+    stats = trend_cache.calculate_all(hospitals_dict)
+    trends = stats['trends']
+    biggest_change_24h = stats['biggest_change_24h']
+    pressure = stats['pressure']
+    changes_by_hospital = {change['hospital']: change for change in trends.get('changes', [])}
     
     # Helper function to get color class and emoji
     def get_color_info(wait):
@@ -526,20 +843,19 @@ async def generate_dashboard_image(hospitals_dict: Dict[str, int], theme: str =
     
     # Helper function to get trend
     def get_trend(name):
-        # Look for hospital in the changes list
-        if 'changes' in trends:
-            for change in trends['changes']:
-                if change['hospital'] == name:
-                    diff = change['diff']
-                    if diff > 0:
-                        return 'up'  # Wait time increased (worsening)
-                    elif diff < 0:
-                        return 'down'  # Wait time decreased (improving)
-                    # If diff == 0, check last known trend
-                    elif 'last_trends' in trends and name in trends['last_trends']:
-                        trend = trends['last_trends'][name]
-                        print(f"[TREND DEBUG] {name}: diff=0, using persisted trend '{trend}'")
-                        return trend
+        # Look for hospital in the changes
+        change = changes_by_hospital.get(name)
+        if change is not None:
+            diff = change['diff']
+            if diff > 0:
+                return 'up'  # Wait time increased (worsening)
+            elif diff < 0:
+                return 'down'  # Wait time decreased (improving)
+            # If diff == 0, check last known trend
+            elif 'last_trends' in trends and name in trends['last_trends']:
+                trend = trends['last_trends'][name]
+                print(f"[TREND DEBUG] {name}: diff=0, using persisted trend '{trend}'")
+                return trend
         
         # Fallback to last known trend if hospital not in changes
         if 'last_trends' in trends and name in trends['last_trends']:
@@ -559,16 +875,15 @@ async def generate_dashboard_image(hospitals_dict: Dict[str, int], theme: str =
         fastest = trends['fastest_improvement']
         print(f"[DEBUG] Fastest improvement raw: {fastest}")
         # Find the change data for this hospital
-        for change in trends.get('changes', []):
-            if change['hospital'] == fastest['hospital']:
-                fastest_improvement_detail = {
-                    'name': fastest['hospital'],
-                    'before': change['previous'],
-                    'after': change['current'],
-                    'diff': change['diff']
-                }
-                print(f"[DEBUG] Fastest improvement detail: {fastest_improvement_detail}")
-                break
+        change = changes_by_hospital.get(fastest['hospital'])
+        if change is not None:
+            fastest_improvement_detail = {
+                'name': fastest['hospital'],
+                'before': change['previous'],
+                'after': change['current'],
+                'diff': change['diff']
+            }
+            print(f"[DEBUG] Fastest improvement detail: {fastest_improvement_detail}")
     else:
         # No improvement yet - use first hospital as placeholder with no change
         print(f"[DEBUG] No fastest_improvement (value is None). Using placeholder.")
@@ -582,35 +897,30 @@ async def generate_dashboard_image(hospitals_dict: Dict[str, int], theme: str =
             }
             print(f"[DEBUG] Using placeholder: {fastest_improvement_detail}")
     
-    # Calculate hourly trend (average wait time change)
+    # Calculate hourly trend (average wait time change vs each hospital's reading an hour ago)
     hourly_trend = None
-    if trends.get('changes') and len(trends['changes']) > 0:
-        # Calculate current and previous average
-        current_avg = sum(hospitals_dict.values()) / len(hospitals_dict)
-        previous_values = [c['previous'] for c in trends['changes']]
-        if previous_values:
-            previous_avg = sum(previous_values) / len(previous_values)
-            change_minutes = current_avg - previous_avg
-            percentage_change = (change_minutes / previous_avg) * 100 if previous_avg > 0 else 0
-            
-            # Format the hourly trend string (using inline SVG for better rendering)
-            if percentage_change < 0:
-                # Down arrow (improving)
-                hourly_trend = f'<span class="inline-flex items-center gap-1 text-emerald-400"><svg class="h-4 w-4" fill="currentColor" viewBox="0 0 20 20"><path fill-rule="evenodd" d="M14.707 12.293a1 1 0 010 1.414l-4 4a1 1 0 01-1.414 0l-4-4a1 1 0 111.414-1.414L9 14.586V3a1 1 0 012 0v11.586l2.293-2.293a1 1 0 011.414 0z" clip-rule="evenodd"/></svg><span>{abs(percentage_change):.0f}% vs 1h ago</span></span>'
-            elif percentage_change > 0:
-                # Up arrow (worsening)
-                hourly_trend = f'<span class="inline-flex items-center gap-1 text-rose-400"><svg class="h-4 w-4" fill="currentColor" viewBox="0 0 20 20"><path fill-rule="evenodd" d="M5.293 7.707a1 1 0 010-1.414l4-4a1 1 0 011.414 0l4 4a1 1 0 01-1.414 1.414L11 5.414V17a1 1 0 11-2 0V5.414L6.707 7.707a1 1 0 01-1.414 0z" clip-rule="evenodd"/></svg><span>{percentage_change:.0f}% vs 1h ago</span></span>'
-            else:
-                # Right arrow (stable)
-                hourly_trend = '<span class="inline-flex items-center gap-1 text-slate-400"><svg class="h-4 w-4" fill="currentColor" viewBox="0 0 20 20"><path fill-rule="evenodd" d="M10.293 3.293a1 1 0 011.414 0l6 6a1 1 0 010 1.414l-6 6a1 1 0 01-1.414-1.414L14.586 11H3a1 1 0 110-2h11.586l-4.293-4.293a1 1 0 010-1.414z" clip-rule="evenodd"/></svg><span>0% vs 1h ago</span></span>'
-            
-            print(f"[DEBUG] Hourly trend: current_avg={current_avg:.1f}, previous_avg={previous_avg:.1f}, change={percentage_change:.1f}%")
+    hourly = stats['windows']['1h']
+    if hourly['avg_change_pct'] is not None:
+        percentage_change = hourly['avg_change_pct']
+        
+        # Format the hourly trend string (using inline SVG for better rendering)
+        if percentage_change < 0:
+            # Down arrow (improving)
+            hourly_trend = f'<span class="inline-flex items-center gap-1 text-emerald-400"><svg class="h-4 w-4" fill="currentColor" viewBox="0 0 20 20"><path fill-rule="evenodd" d="M14.707 12.293a1 1 0 010 1.414l-4 4a1 1 0 01-1.414 0l-4-4a1 1 0 111.414-1.414L9 14.586V3a1 1 0 012 0v11.586l2.293-2.293a1 1 0 011.414 0z" clip-rule="evenodd"/></svg><span>{abs(percentage_change):.0f}% vs 1h ago</span></span>'
+        elif percentage_change > 0:
+            # Up arrow (worsening)
+            hourly_trend = f'<span class="inline-flex items-center gap-1 text-rose-400"><svg class="h-4 w-4" fill="currentColor" viewBox="0 0 20 20"><path fill-rule="evenodd" d="M5.293 7.707a1 1 0 010-1.414l4-4a1 1 0 011.414 0l4 4a1 1 0 01-1.414 1.414L11 5.414V17a1 1 0 11-2 0V5.414L6.707 7.707a1 1 0 01-1.414 0z" clip-rule="evenodd"/></svg><span>{percentage_change:.0f}% vs 1h ago</span></span>'
+        else:
+            # Right arrow (stable)
+            hourly_trend = '<span class="inline-flex items-center gap-1 text-slate-400"><svg class="h-4 w-4" fill="currentColor" viewBox="0 0 20 20"><path fill-rule="evenodd" d="M10.293 3.293a1 1 0 011.414 0l6 6a1 1 0 010 1.414l-6 6a1 1 0 01-1.414-1.414L14.586 11H3a1 1 0 110-2h11.586l-4.293-4.293a1 1 0 010-1.414z" clip-rule="evenodd"/></svg><span>0% vs 1h ago</span></span>'
+        
+        print(f"[DEBUG] Hourly trend: current_avg={hourly['avg_current']:.1f}, previous_avg={hourly['avg_previous']:.1f}, change={percentage_change:.1f}%")
     
     # Generate headline story
     headline = None
     if trends.get('changes') and len(trends['changes']) > 0:
-        avg_wait = int(current_avg)
-        avg_change = int(change_minutes) if 'change_minutes' in locals() else 0
+        avg_wait = sum(hospitals_dict.values()) // len(hospitals_dict)
+        avg_change = int(trends['avg_change'] or 0)  # Same 30-minute window as the improving/worsening counts
         improving = trends.get('improving_count', 0)
         worsening = trends.get('worsening_count', 0)
         pressure_pct = pressure.get('percentage', 0)
@@ -692,266 +1002,255 @@ async def generate_dashboard_image(hospitals_dict: Dict[str, int], theme: str =
     for i, h in enumerate(dashboard_data['hospitals'][:3]):
         print(f"  [{i+1}] {h['name']}: {h['wait']}m, trend: {h['trend']}")
     
-    # Load HTML template
-    html_path = Path(__file__).parent / DASHBOARD_HTML_TEMPLATE
-    if not html_path.exists():
-        raise FileNotFoundError(f"Dashboard template not found: {html_path}")
+    return dashboard_data, headline if headline else "NI A&E Wait Times Update"
+
+
+async def render_dashboard_queued(dashboard_data: Dict[str, Any], theme: str) -> Dict[str, Any]:
+    """Render on a queue worker and wait for the encoded image (raises TimeoutError/RuntimeError)"""
+    payload = {
+        'dashboard_data': dashboard_data,
+        'theme': theme,
+        'backend': DASHBOARD_RENDER_BACKEND,
+        'profile': OUTPUT_PROFILE
+    }
+    job_id = await asyncio.to_thread(render_queue.enqueue, payload, RENDER_JOB_TIMEOUT_S)
+    start = time.perf_counter()
+    image = await render_queue.wait_for_result(job_id, RENDER_QUEUE_WAIT_S)
+    print(f"[{now_iso()}] Render job {job_id} done ({DASHBOARD_RENDER_BACKEND}) in "
+          f"{(time.perf_counter() - start) * 1000:.0f}ms")
+    return image
+
+
+async def render_dashboard(dashboard_data: Dict[str, Any], theme: str = 'light') -> Dict[str, Any]:
+    """
+    Render dashboard data with the configured backend (or return the cached render)
+    
+    Returns:
+        Encoded dashboard from DashboardOutputProfiles.capture() ({'bytes', 'format', 'width', 'height', ...})
+    """
+    # Timestamp for the archived copy
+    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
     
-    with open(html_path, 'r', encoding='utf-8') as f:
-        html_content = f.read()
+    if DASHBOARD_DATA_LOG_FILE:
+        record_dashboard_data(dashboard_data, theme)
     
-    # Add theme attribute to body
-    html_content = html_content.replace(
-        '<body class="bg-white p-8">',
-        f'<body class="bg-white p-8" data-theme="{theme}">'
-    )
+    profile = output_profiles.get(OUTPUT_PROFILE)
+    cache_key = render_cache.key(dashboard_data, profile, render_cache_settings(theme))
+    image = render_cache.get(cache_key)
     
-    # EXPERIMENTAL: Apply text scaling wrapper if enabled
-    if USE_TEXT_SCALING:
-        # Wrap the main dashboard container with scaling transform
-        # Use inline style for better compatibility (Tailwind CDN may not support arbitrary scale values)
-        html_content = html_content.replace(
-            '<div class="max-w-6xl mx-auto bg-white rounded-2xl shadow-lg overflow-visible relative"',
-            f'<div style="transform: scale({TEXT_SCALE_FACTOR}); transform-origin: top left;"><div class="max-w-6xl mx-auto bg-white rounded-2xl shadow-lg overflow-visible relative"'
-        )
-        # Close the wrapper before the closing body tag
-        html_content = html_content.replace(
-            '</div>\n</body>',
-            '</div></div>\n</body>'
-        )
-        print(f"[EXPERIMENTAL] Text scaling enabled: {TEXT_SCALE_FACTOR}x")
-    
-    # Inject data via JavaScript - call updateDashboard() function
-    data_script = f"""
-    <script>
-        // Inject dashboard data and call updateDashboard() on load
-        window.addEventListener('DOMContentLoaded', function() {{
-            if (typeof updateDashboard === 'function') {{
-                updateDashboard({json.dumps(dashboard_data)});
-            }} else {{
-                console.error('updateDashboard() function not found');
-            }}
-        }});
-    </script>
-    </head>
+    if image is not None:
+        print(f"[{now_iso()}] Render cache hit ({cache_key[:12]}) - skipping {DASHBOARD_RENDER_BACKEND} render")
+    elif render_queue is not None:
+        # Out of process: a render_worker.py renders with the same backend and profile
+        image = await render_dashboard_queued(dashboard_data, theme)
+        if DASHBOARD_EXTRA_VARIANTS and DASHBOARD_RENDER_BACKEND == "playwright":
+            variants = await variant_matrix.render(dashboard_data, DASHBOARD_EXTRA_VARIANTS)
+            archive_dashboard_variants(variants["images"])
+        if image.get("svg"):
+            publish_dashboard_svg(image["svg"])
+    elif DASHBOARD_RENDER_BACKEND == "native":
+        # Browserless: draw the same layout with Pillow (dark theme) in a worker thread
+        image = await asyncio.to_thread(native_renderer.render_profile, dashboard_data, profile)
+    elif DASHBOARD_RENDER_BACKEND == "svg":
+        # One vector render: rasterised for Telegram, published as-is for the web
+        image = await asyncio.to_thread(svg_renderer.render_profile, dashboard_data, profile)
+        publish_dashboard_svg(image["svg"])
+    else:
+        try:
+            if DASHBOARD_EXTRA_VARIANTS:
+                # Main image and the variant matrix render concurrently in pages of the same browser
+                render_start = time.perf_counter()
+                image, variants = await asyncio.gather(
+                    render_dashboard_playwright(dashboard_data, theme),
+                    variant_matrix.render(dashboard_data, DASHBOARD_EXTRA_VARIANTS)
+                )
+                archive_dashboard_variants(variants["images"])
+                print(f"[{now_iso()}] Render cycle: {1 + len(variants['images'])} images in "
+                      f"{(time.perf_counter() - render_start) * 1000:.0f}ms")
+            else:
+                image = await render_dashboard_playwright(dashboard_data, theme)
+        finally:
+            if not USE_BROWSER_POOL:
+                await browser_pool.close()
+    
+    if not image.get("cached"):
+        render_cache.put(cache_key, image)
+    
+    if ARCHIVE_DASHBOARD_IMAGES:
+        archive_dashboard_image(image["bytes"], timestamp, FORMAT_EXTENSIONS[image["format"]])
+    
+    print(f"[{now_iso()}] Dashboard generated ({len(image['bytes']) // 1024} KB in memory)")
+    return image
+
+
+async def generate_dashboard_image(hospitals_dict: Dict[str, int], theme: str = 'light', source_updated: str = None) -> Tuple[Dict[str, Any], str]:
     """
-    html_content = html_content.replace('</head>', data_script)
+    Generate dashboard image with the configured render backend
     
-    # DEBUG: Save modified HTML for verification (only when experimental features are enabled)
-    if USE_TEXT_SCALING or USE_PORTRAIT_MODE:
-        debug_html_path = Path(__file__).parent / "dashboard_debug.html"
-        with open(debug_html_path, 'w', encoding='utf-8') as f:
-            f.write(html_content)
-        print(f"[DEBUG] Modified HTML saved to: {debug_html_path}")
+    Args:
+        hospitals_dict: Dict of {hospital_name: wait_minutes}
+        theme: 'light' or 'dark'
+        source_updated: When NI Direct last updated (from their webpage)
     
-    # Generate image with Playwright in true 4K resolution
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        
-        # Log experimental features status
-        if USE_PORTRAIT_MODE:
-            print(f"[EXPERIMENTAL] Portrait mode enabled: {SCREENSHOT_4K_WIDTH}x{SCREENSHOT_4K_HEIGHT}")
-        if USE_TEXT_SCALING:
-            print(f"[EXPERIMENTAL] Text scaling wrapper applied: scale({TEXT_SCALE_FACTOR})")
-        
-        # Create page with 4K viewport (3840x2160 or 2160x3840 if portrait) and 2x device scale for retina clarity
-        page = await browser.new_page(
-            viewport={'width': SCREENSHOT_4K_WIDTH, 'height': SCREENSHOT_4K_HEIGHT},
-            device_scale_factor=SCREENSHOT_DEVICE_SCALE
-        )
-        
-        # Enable console logging
-        page.on('console', lambda msg: print(f'[BROWSER] {msg.type}: {msg.text}'))
-        page.on('pageerror', lambda err: print(f'[BROWSER ERROR] {err}'))
-        
-        # Set content
-        await page.set_content(html_content, wait_until='networkidle')
-        
-        # Wait for fonts and rendering
-        await page.wait_for_timeout(1000)
-        
-        # Wait for table to be populated (check for at least one row)
-        await page.wait_for_selector('tbody#hospital-table tr', timeout=5000)
-        
-        # Wait 3 seconds for dashboard animations/data load before capture
-        await page.wait_for_timeout(3000)
-        
-        # Generate timestamped filename for 4K capture
-        timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-        
-        # Determine file extension and type based on JPEG export setting
-        file_extension = "jpg" if USE_JPEG_EXPORT else "png"
-        screenshot_type = "jpeg" if USE_JPEG_EXPORT else "png"
-        
-        output_filename_4k = f"dashboard_4k_{timestamp}.{file_extension}"
-        output_path_4k = Path(__file__).parent / output_filename_4k
-        
-        # Also save to legacy filename for compatibility (keep as PNG for backward compatibility)
-        output_path_legacy = Path(__file__).parent / DASHBOARD_FILE
-        
-        # Take screenshot of only the dashboard container (not the entire page)
-        # This eliminates empty space and provides a tight, zoomed-in view
-        dashboard_element = await page.query_selector('.max-w-6xl')
-        if dashboard_element:
-            # Save 4K timestamped version (JPEG or PNG based on setting)
-            if USE_JPEG_EXPORT:
-                await dashboard_element.screenshot(path=str(output_path_4k), type='jpeg', quality=JPEG_QUALITY)
-                print(f"[EXPERIMENTAL] JPEG export enabled: quality={JPEG_QUALITY}")
-            else:
-                await dashboard_element.screenshot(path=str(output_path_4k), type='png')
-            
-            # Save legacy version for Telegram (always use current format)
-            if USE_JPEG_EXPORT:
-                await dashboard_element.screenshot(path=str(output_path_legacy), type='jpeg', quality=JPEG_QUALITY)
-            else:
-                await dashboard_element.screenshot(path=str(output_path_legacy), type='png')
-            
-            print(f"[{now_iso()}] 4K screenshot saved: {output_path_4k}")
-            print(f"[{now_iso()}] Resolution: {SCREENSHOT_4K_WIDTH}x{SCREENSHOT_4K_HEIGHT} @ {SCREENSHOT_DEVICE_SCALE}x scale")
-            print(f"[{now_iso()}] Format: {screenshot_type.upper()}" + (f" (quality={JPEG_QUALITY})" if USE_JPEG_EXPORT else ""))
-        else:
-            # Fallback to full page if selector not found
-            if USE_JPEG_EXPORT:
-                await page.screenshot(path=str(output_path_4k), full_page=False, type='jpeg', quality=JPEG_QUALITY)
-                await page.screenshot(path=str(output_path_legacy), full_page=False, type='jpeg', quality=JPEG_QUALITY)
-            else:
-                await page.screenshot(path=str(output_path_4k), full_page=False, type='png')
-                await page.screenshot(path=str(output_path_legacy), full_page=False, type='png')
-        
-        await browser.close()
+    Returns:
+        Tuple of (image, headline_text) where image is the encoded dashboard from
+        DashboardOutputProfiles.capture() ({'bytes', 'format', 'width', 'height', ...})
+    """
+    dashboard_data, headline = build_dashboard_data(hospitals_dict, theme, source_updated)
+    image = await render_dashboard(dashboard_data, theme)
+    # Return both image and headline for Telegram caption
+    return image, headline
+
+
+def persist_reading(hospitals_dict: Dict[str, int], source_updated: Optional[str]) -> None:
+    """Update the trend cache and daily stats with this reading (runs in a worker thread)"""
+    # Update cache for next trend comparison
+    trend_cache.update_cache(hospitals_dict, source_updated=source_updated)
     
-    print(f"[{now_iso()}] Dashboard generated: {output_path_legacy}")
-    # Return both image path and headline for Telegram caption (use legacy path for Telegram)
-    return str(output_path_legacy), headline if headline else "NI A&E Wait Times Update"
+    # Record reading for daily statistics
+    daily_stats_tracker.record_reading(hospitals_dict, source_updated=source_updated)
+
+
+async def run_traced(trace: CycleTrace, stage: str, awaitable):
+    """Await a stage under the cycle trace"""
+    with trace.stage(stage):
+        return await awaitable
+
+
+def send_daily_update(hospitals_dict: Dict[str, int]) -> None:
+    """Send the daily statistics message if it's due"""
+    if not daily_stats_tracker.should_send_update():
+        return
+    print(f"[{now_iso()}] Sending daily statistics update...")
+    try:
+        daily_stats = daily_stats_tracker.calculate_daily_stats(hospitals_dict)
+        if daily_stats:
+            daily_message = daily_stats_tracker.format_daily_update(daily_stats)
+            daily_ok, daily_err, _ = telegram_send_message(daily_message)
+            if daily_ok:
+                print(f"[{now_iso()}] Daily statistics update sent to Telegram")
+            else:
+                print(f"[{now_iso()}] Failed to send daily update: {daily_err}")
+    except Exception as daily_e:
+        print(f"[{now_iso()}] Daily stats error: {daily_e}")
+        import traceback
+        traceback.print_exc()
 
 
 async def run_once_async() -> None:
-    """Main polling function with async dashboard generation"""
+    """
+    Main polling function with async dashboard generation
+    
+    After the fetch, the cycle runs as a dependency graph (see CYCLE_DEPENDENCIES):
+    the text send, dashboard render and stats persistence run concurrently, and the
+    photo goes out as soon as both the text and the render are done.
+    """
+    trace = CycleTrace(CYCLE_DEPENDENCIES)
+    
     # Fetch hospital data
     rows: List[Dict[str, Any]] = []
     source_label = "NI Direct — Emergency Departments"
     last_updated_hint: Optional[str] = None
     
-    try:
-        rows, last_updated_hint = fetch_ni_direct_rows()
-        if not rows:
-            print(f"[{now_iso()}] NI Direct returned no rows. Skipping send.")
+    with trace.stage("fetch"):
+        try:
+            rows, last_updated_hint = fetch_ni_direct_rows()
+            if not rows:
+                print(f"[{now_iso()}] NI Direct returned no rows. Skipping send.")
+                return
+        except Exception as e:
+            print(f"[{now_iso()}] NI Direct fetch failed: {e}")
             return
-    except Exception as e:
-        print(f"[{now_iso()}] NI Direct fetch failed: {e}")
-        return
- 
-    # Check for changes
-    digest = compute_digest(rows)
-    state = load_state()
-    if not FORCE_SEND and state.get("digest") == digest:
-        print(f"[{now_iso()}] No change detected. Skipping send.")
-        return
- 
-    # Detect changes from previous run
-    previous_waits = state.get("previous_waits", {})
-    changes = detect_changes(rows, previous_waits) if previous_waits else []
     
-    # Format and send text message
-    last_updated_hint = last_updated_hint or None
-    message = format_message(rows, source_label, last_updated_hint, changes)
-
-    # Send text update
-    ok, err, message_id = telegram_send_message(message)
+    with trace.stage("prepare"):
+        # Check for changes
+        digest = compute_digest(rows)
+        state = load_state()
+        if not FORCE_SEND and state.get("digest") == digest:
+            print(f"[{now_iso()}] No change detected. Skipping send.")
+            return
+        
+        # Detect changes from previous run
+        previous_waits = state.get("previous_waits", {})
+        changes = detect_changes(rows, previous_waits) if previous_waits else []
+        
+        # Convert rows to dict for trend cache
+        hospitals_dict = {
+            row["hospital"]: row["wait_mins"]
+            for row in rows
+            if row["wait_mins"] is not None
+        }
+        
+        # Format text message (average wait trend from the same trend service as the dashboard)
+        last_updated_hint = last_updated_hint or None
+        trend_windows = trend_cache.calculate_windows(hospitals_dict, windows=list(TELEGRAM_TREND_WINDOWS))
+        message = format_message(rows, source_label, last_updated_hint, changes, trend_windows)
+    
+    # Send text update (in a worker thread, concurrently with the render)
+    text_task = asyncio.create_task(run_traced(trace, "text", asyncio.to_thread(telegram_send_message, message)))
+    
+    render_task = persist_task = None
+    if GENERATE_DASHBOARD:
+        # Auto-detect theme
+        theme = get_auto_theme()
+        print(f"[{now_iso()}] Generating dashboard (theme: {theme})...")
+        
+        try:
+            # Trends are read from the cache here, before persist_reading() updates it
+            with trace.stage("dashboard_data"):
+                dashboard_data, headline_text = build_dashboard_data(hospitals_dict, theme, source_updated=last_updated_hint)
+            render_task = asyncio.create_task(run_traced(trace, "render", render_dashboard(dashboard_data, theme)))
+            persist_task = asyncio.create_task(run_traced(
+                trace, "persist", asyncio.to_thread(persist_reading, hospitals_dict, last_updated_hint)
+            ))
+        except Exception as e:
+            print(f"[{now_iso()}] Dashboard generation failed: {e}")
+            import traceback
+            traceback.print_exc()
+    
+    ok, err, message_id = await text_task
     if not ok:
         print(f"[{now_iso()}] Failed to send Telegram message: {err}")
+        if render_task is not None:
+            render_task.cancel()
+            await asyncio.gather(render_task, return_exceptions=True)
+        if persist_task is not None:
+            await asyncio.gather(persist_task, return_exceptions=True)
         return
     
     print(f"[{now_iso()}] Text update sent to Telegram. Rows: {len(rows)} | Changes: {len(changes)}")
     
-    # Generate and send dashboard image
-    if GENERATE_DASHBOARD:
+    if render_task is not None:
         try:
-            # Convert rows to dict for trend cache
-            hospitals_dict = {
-                row["hospital"]: row["wait_mins"]
-                for row in rows
-                if row["wait_mins"] is not None
-            }
-            
-            # Auto-detect theme
-            theme = get_auto_theme()
-            print(f"[{now_iso()}] Generating dashboard (theme: {theme})...")
-            
-            # Generate dashboard (returns path and headline)
-            # NOTE: Dashboard generation uses current cache for trend comparison
-            dashboard_path, headline_text = await generate_dashboard_image(
-                hospitals_dict, 
-                theme, 
-                source_updated=last_updated_hint
-            )
+            image = await render_task
             
-            # Send to Telegram with headline as caption
-            photo_ok, photo_err = telegram_send_photo(
-                dashboard_path,
-                caption=headline_text
-            )
+            # Send the captured bytes straight to Telegram with headline as caption
+            photo_ok, photo_err = await run_traced(trace, "photo", asyncio.to_thread(
+                telegram_send_photo,
+                image["bytes"],
+                caption=headline_text,
+                filename=f"dashboard.{FORMAT_EXTENSIONS[image['format']]}"
+            ))
             
             if photo_ok:
                 print(f"[{now_iso()}] Dashboard image sent to Telegram")
-                
-                # Delete the dashboard images after successful send
-                try:
-                    # Delete the legacy file (used for Telegram)
-                    legacy_path = Path(dashboard_path)
-                    if legacy_path.exists():
-                        legacy_path.unlink()
-                        print(f"[{now_iso()}] Deleted: {legacy_path.name}")
-                    
-                    # Delete the timestamped 4K file
-                    parent_dir = legacy_path.parent
-                    file_extension = "jpg" if USE_JPEG_EXPORT else "png"
-                    timestamp = datetime.now().strftime("%Y%m%d_%H%M")
-                    timestamped_file = parent_dir / f"dashboard_4k_{timestamp}.{file_extension}"
-                    if timestamped_file.exists():
-                        timestamped_file.unlink()
-                        print(f"[{now_iso()}] Deleted: {timestamped_file.name}")
-                    
-                    # Also delete debug HTML if it exists
-                    debug_html = parent_dir / "dashboard_debug.html"
-                    if debug_html.exists():
-                        debug_html.unlink()
-                        print(f"[{now_iso()}] Deleted: dashboard_debug.html")
-                        
-                except Exception as del_err:
-                    print(f"[{now_iso()}] Warning: Failed to delete files: {del_err}")
             else:
                 print(f"[{now_iso()}] Failed to send dashboard image: {photo_err}")
-                print(f"[{now_iso()}] Keeping files for debugging: {dashboard_path}")
-            
-            # Update cache for next trend comparison
-            trend_cache.update_cache(hospitals_dict, source_updated=last_updated_hint)
-            
-            # Record reading for daily statistics
-            daily_stats_tracker.record_reading(hospitals_dict, source_updated=last_updated_hint)
-            
-            # Check if it's time to send daily update
-            if daily_stats_tracker.should_send_update():
-                print(f"[{now_iso()}] Sending daily statistics update...")
-                try:
-                    daily_stats = daily_stats_tracker.calculate_daily_stats(hospitals_dict)
-                    if daily_stats:
-                        daily_message = daily_stats_tracker.format_daily_update(daily_stats)
-                        daily_ok, daily_err, _ = telegram_send_message(daily_message)
-                        if daily_ok:
-                            print(f"[{now_iso()}] Daily statistics update sent to Telegram")
-                        else:
-                            print(f"[{now_iso()}] Failed to send daily update: {daily_err}")
-                except Exception as daily_e:
-                    print(f"[{now_iso()}] Daily stats error: {daily_e}")
-                    import traceback
-                    traceback.print_exc()
-            
         except Exception as e:
             print(f"[{now_iso()}] Dashboard generation failed: {e}")
             import traceback
             traceback.print_exc()
     
+    if persist_task is not None:
+        try:
+            await persist_task
+            # Check if it's time to send daily update
+            await run_traced(trace, "daily_update", asyncio.to_thread(send_daily_update, hospitals_dict))
+        except Exception as e:
+            print(f"[{now_iso()}] Failed to record reading: {e}")
+            import traceback
+            traceback.print_exc()
+    
     # Update state
     state["digest"] = digest
     state["last_sent"] = now_iso()
@@ -959,11 +1258,41 @@ async def run_once_async() -> None:
         state["last_message_id"] = message_id
     state["previous_waits"] = {row["hospital"]: row["wait_mins"] for row in rows if row["wait_mins"] is not None}
     save_state(state)
+    
+    print(f"[{now_iso()}] Cycle trace: {trace.format()}")
 
 
 def run_once() -> None:
-    """Synchronous wrapper for async run_once"""
-    asyncio.run(run_once_async())
+    """Synchronous wrapper for async run_once (single cycle, browser closed afterwards)"""
+    async def _run_and_close():
+        try:
+            await run_once_async()
+        finally:
+            await wait_for_archive_writes()
+            await browser_pool.close()
+    asyncio.run(_run_and_close())
+
+
+async def run_forever_async() -> None:
+    """Poll forever on one event loop so the browser pool stays warm between cycles"""
+    try:
+        while True:
+            await run_once_async()
+            if GENERATE_DASHBOARD:
+                render_stats = {
+                    "native": native_renderer.stats,
+                    "svg": svg_renderer.stats
+                }.get(DASHBOARD_RENDER_BACKEND, browser_pool.stats)()
+                print(f"[{now_iso()}] Render latency: {render_stats} | cache: {render_cache.stats()} | "
+                      f"encode: {default_encoder().stats()}")
+                if render_queue is not None:
+                    print(f"[{now_iso()}] Render queue: {render_queue.stats()}")
+                if image_store is not None:
+                    print(f"[{now_iso()}] Archive: {image_store.stats()}")
+            await asyncio.sleep(POLL_SECONDS)
+    finally:
+        await wait_for_archive_writes()
+        await browser_pool.close()
 
 
 if __name__ == "__main__":
@@ -971,12 +1300,13 @@ if __name__ == "__main__":
     print(f"  Poll interval: {POLL_SECONDS}s")
     print(f"  FORCE_SEND: {'ON' if FORCE_SEND else 'OFF'}")
     print(f"  Dashboard: {'ENABLED' if GENERATE_DASHBOARD else 'DISABLED'}")
+    print(f"  Render backend: {DASHBOARD_RENDER_BACKEND}{f' (queued: {RENDER_QUEUE_URL})' if RENDER_QUEUE_URL else ''}")
+    print(f"  Browser pool: {'WARM' if USE_BROWSER_POOL else 'COLD (relaunch per render)'}")
+    print(f"  Output profile: {OUTPUT_PROFILE}")
+    print(f"  Archive images: {'ON' if ARCHIVE_DASHBOARD_IMAGES else 'OFF'}")
     print(f"  Theme: DARK (forced)")
     
-    while True:
-        run_once()
-        try:
-            time.sleep(POLL_SECONDS)
-        except KeyboardInterrupt:
-            print("Exiting...")
-            break
+    try:
+        asyncio.run(run_forever_async())
+    except KeyboardInterrupt:
+        print("Exiting...")
@@ -4,7 +4,6 @@ Integrates the existing monitoring with automatic Facebook post image generation
 """
 
 import requests
-import time
 import hashlib
 import json
 import html
@@ -16,7 +15,7 @@ from bs4 import BeautifulSoup
 from pathlib import Path
 
 # Import the dashboard generator
-from generate_dashboard_image import generate_dashboard_image, generate_square_dashboard_image
+from generate_dashboard_image import generate_dashboard_image, generate_square_dashboard_image, browser_pool
 
 # === Configuration ===
 NI_DIRECT_URL = "https://www.nidirect.gov.uk/articles/emergency-department-average-waiting-times"
@@ -324,18 +323,30 @@ async def run_once_async() -> None:
 
 
 def run_once() -> None:
-    """Wrapper to run async function."""
-    asyncio.run(run_once_async())
+    """Wrapper to run async function (single cycle, browser closed afterwards)."""
+    async def _run_and_close():
+        try:
+            await run_once_async()
+        finally:
+            await browser_pool.close()
+    asyncio.run(_run_and_close())
+
+
+async def run_forever_async() -> None:
+    """Poll forever on one event loop so the browser pool stays warm between cycles."""
+    try:
+        while True:
+            await run_once_async()
+            await asyncio.sleep(POLL_SECONDS)
+    finally:
+        await browser_pool.close()
 
 
 if __name__ == "__main__":
     print(f"[{now_iso()}] Starting NI ED wait monitor with image generation.")
     print(f"Poll every {POLL_SECONDS}s | FORCE_SEND={'ON' if FORCE_SEND else 'OFF'} | SEND_IMAGES={'ON' if SEND_IMAGES else 'OFF'}")
     
-    while True:
-        run_once()
-        try:
-            time.sleep(POLL_SECONDS)
-        except KeyboardInterrupt:
-            print("Exiting...")
-            break
+    try:
+        asyncio.run(run_forever_async())
+    except KeyboardInterrupt:
+        print("Exiting...")
@@ -0,0 +1,127 @@
+"""
+Offline Asset Bundle for Dashboard Rendering
+Serves the vendored stylesheets and fonts in assets/ to Playwright from memory
+"""
+
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+
+
+# Vendored assets (compiled Tailwind, Font Awesome, Inter) - see build_assets.py
+ASSET_DIR = Path(__file__).parent / "assets"
+
+# Origin the dashboard document is served from, so its relative asset URLs resolve into the bundle
+BUNDLE_ORIGIN = "https://dashboard.local"
+DOCUMENT_URL = f"{BUNDLE_ORIGIN}/dashboard.html"
+
+# CDN URLs still used by older templates, mapped to bundle paths
+# (prefix match - the rest of the URL is appended unless the target is a single file)
+CDN_ALIASES = {
+    "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/css/": "fontawesome/css/",
+    "https://cdnjs.cloudflare.com/ajax/libs/font-awesome/6.4.0/webfonts/": "fontawesome/webfonts/",
+    "https://fonts.googleapis.com/css2?family=Inter": "fonts/inter/inter.css",
+    "https://fonts.googleapis.com/Inter-": "fonts/inter/Inter-",  # Relative url()s in the aliased inter.css
+}
+
+CONTENT_TYPES = {
+    ".css": "text/css; charset=utf-8",
+    ".js": "application/javascript; charset=utf-8",
+    ".woff2": "font/woff2",
+    ".woff": "font/woff",
+    ".ttf": "font/ttf",
+    ".png": "image/png",
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".svg": "image/svg+xml",
+}
+
+
+class AssetBundle:
+    """In-memory copy of assets/ that fulfils the renderer's requests without touching the network"""
+
+    def __init__(self, asset_dir: Path = ASSET_DIR, allow_network: bool = False):
+        """
+        Args:
+            asset_dir: Directory holding the vendored assets
+            allow_network: Let requests the bundle can't serve through (False = abort them)
+        """
+        self.asset_dir = Path(asset_dir)
+        self.allow_network = allow_network
+        self.files = self._load_files()  # {relative_path: (body, content_type)}
+        self.hits = 0
+        self.blocked = 0
+
+    def _load_files(self) -> Dict[str, Tuple[bytes, str]]:
+        """Read every servable asset into memory once"""
+        files = {}
+        if not self.asset_dir.exists():
+            print(f"[ASSET BUNDLE] WARNING: asset directory not found: {self.asset_dir}")
+            return files
+
+        for path in sorted(self.asset_dir.rglob("*")):
+            content_type = CONTENT_TYPES.get(path.suffix.lower())
+            if not path.is_file() or content_type is None:
+                continue
+            relative = path.relative_to(self.asset_dir).as_posix()
+            if relative.startswith("src/"):
+                continue  # Build inputs, not served
+            files[relative] = (path.read_bytes(), content_type)
+
+        total = sum(len(body) for body, _ in files.values())
+        print(f"[ASSET BUNDLE] Loaded {len(files)} assets ({total // 1024} KB) from {self.asset_dir}")
+        return files
+
+    def resolve(self, url: str) -> Optional[str]:
+        """Map a request URL to a bundle path (or None if the bundle doesn't cover it)"""
+        local_prefix = f"{BUNDLE_ORIGIN}/assets/"
+        if url.startswith(local_prefix):
+            return url[len(local_prefix):].split("?")[0].split("#")[0]
+
+        for prefix, target in CDN_ALIASES.items():
+            if url.startswith(prefix):
+                if target.endswith(".css"):
+                    return target
+                return target + url[len(prefix):].split("?")[0].split("#")[0]
+        return None
+
+    async def install(self, page, document_html: str) -> str:
+        """
+        Route all of the page's requests through the bundle
+
+        Args:
+            page: Playwright page
+            document_html: Dashboard HTML to serve at DOCUMENT_URL
+
+        Returns:
+            URL to navigate the page to
+        """
+        document_body = document_html.encode("utf-8")
+
+        async def handle(route):
+            url = route.request.url
+            if url == DOCUMENT_URL:
+                await route.fulfill(status=200, body=document_body, content_type="text/html; charset=utf-8")
+                return
+
+            asset = self.files.get(self.resolve(url) or "")
+            if asset is not None:
+                self.hits += 1
+                body, content_type = asset
+                await route.fulfill(
+                    status=200,
+                    body=body,
+                    content_type=content_type,
+                    headers={"Access-Control-Allow-Origin": "*"}  # Fonts requested via CDN aliases are cross-origin
+                )
+                return
+
+            if self.allow_network:
+                await route.continue_()
+                return
+
+            self.blocked += 1
+            print(f"[ASSET BUNDLE] Blocked request not in bundle: {url}")
+            await route.abort()
+
+        await page.route("**/*", handle)
+        return DOCUMENT_URL
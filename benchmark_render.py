@@ -0,0 +1,273 @@
+"""
+Render latency benchmark for the dashboard screenshot pipeline.
+
+Renders the same dashboard payload repeatedly through DashboardBrowserPool and
+reports p50/p95 render times for:
+- 'sleeps': legacy fixed waits (networkidle + 1s on load, table selector + 3s per render)
+- 'signal': capture as soon as updateDashboard() signals 'dashboard:ready'
+
+With --profiles it instead reports time and bytes per output profile (see output_profile_system.py).
+--from-image skips the browser and measures only the resize/encode stage on an existing 4K capture.
+--formats compares encode time, size, chosen quality and PSNR per format for each profile's budget
+(on --from-image, or a native render of the sample payload).
+
+Usage:
+    python benchmark_render.py --runs 20
+    python benchmark_render.py --profiles --runs 10
+    python benchmark_render.py --profiles --from-image dashboard_archive/dashboard_4k_20251218_1846.jpg
+    python benchmark_render.py --formats jpeg webp avif
+"""
+
+import argparse
+import asyncio
+import io
+import json
+import math
+import time
+from pathlib import Path
+from typing import Dict, List
+
+from PIL import Image
+
+from asset_bundle_system import AssetBundle
+from browser_pool_system import DashboardBrowserPool
+from image_encoder_system import ImageEncoder, psnr
+from output_profile_system import OUTPUT_PROFILES, DashboardOutputProfiles
+
+
+# Portrait 4K viewport used by app_with_dashboard.py
+VIEWPORT = {"width": 2160, "height": 3840, "scale": 2}
+
+# Text scaling wrapper applied by app_with_dashboard.py (USE_TEXT_SCALING)
+TEXT_SCALE_FACTOR = 1.50
+
+SAMPLE_DASHBOARD_DATA = {
+    "theme": "dark",
+    "updateTime": "12:00 am, Fri 17 Oct 2025",
+    "trendDirection": "6 hospitals improving | 4 worsening",
+    "hourlyTrend": None,
+    "headline": "Altnagelvin under pressure — 317m wait tops NI.",
+    "improvingCount": 6,
+    "worseningCount": 4,
+    "avgWait": "181m",
+    "longestWait": 'Altnagelvin Area ED — <span class="text-red-600">317m 🔴</span>',
+    "fastestImprovement": "Ulster ↓ 21m",
+    "fastestImprovementDetail": {"name": "Ulster ED", "before": 259, "after": 238, "diff": -21},
+    "biggestChange24h": {"increase": "Antrim +92m", "decrease": "Ulster −36m"},
+    "pressureIndex": "80% hospitals over 2h",
+    "hospitals": [
+        {"name": name, "wait": wait, "colorClass": "", "emoji": "", "trend": trend,
+         "severity": "critical" if wait >= 240 else "high" if wait >= 120 else "moderate" if wait >= 60 else "low"}
+        for name, wait, trend in [
+            ("Altnagelvin Area ED", 317, "up"), ("Royal Victoria ED", 281, "up"),
+            ("Ulster ED", 238, "down"), ("Mater ED", 220, "down"),
+            ("Antrim Area ED", 162, "up"), ("Craigavon Area ED", 157, "down"),
+            ("Causeway ED", 152, None), ("South West Acute ED", 131, "down"),
+            ("Royal Children's ED", 119, "up"), ("Daisy Hill ED", 86, "down"),
+        ]
+    ],
+}
+
+
+def percentile(samples: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    ordered = sorted(samples)
+    rank = max(1, math.ceil(pct / 100 * len(ordered)))
+    return ordered[rank - 1]
+
+
+async def benchmark_strategy(strategy: str, template_html: str, runs: int) -> Dict[str, float]:
+    """Render `runs` times with one wait strategy and summarise the timings"""
+    pool = DashboardBrowserPool(wait_strategy=strategy, max_renders_per_page=runs + 1, asset_bundle=AssetBundle())
+
+    async def capture(page):
+        element = await page.query_selector('.max-w-6xl')
+        return await (element or page).screenshot(type='jpeg', quality=95)
+
+    timings = []
+    try:
+        for _ in range(runs):
+            start = time.perf_counter()
+            await pool.render(VIEWPORT, template_html, SAMPLE_DASHBOARD_DATA, capture)
+            timings.append((time.perf_counter() - start) * 1000)
+    finally:
+        await pool.close()
+
+    warm = timings[1:] or timings
+    return {
+        "cold_ms": round(timings[0], 1),
+        "warm_p50_ms": round(percentile(warm, 50), 1),
+        "warm_p95_ms": round(percentile(warm, 95), 1),
+        "all_p50_ms": round(percentile(timings, 50), 1),
+        "all_p95_ms": round(percentile(timings, 95), 1),
+        "runs": runs,
+    }
+
+
+def apply_text_scaling(template_html: str) -> str:
+    """Wrap the dashboard in the same scale() transform app_with_dashboard.py uses"""
+    html = template_html.replace(
+        '<div class="max-w-6xl mx-auto bg-white rounded-2xl shadow-lg overflow-visible relative"',
+        f'<div style="transform: scale({TEXT_SCALE_FACTOR}); transform-origin: top left;">'
+        '<div class="max-w-6xl mx-auto bg-white rounded-2xl shadow-lg overflow-visible relative"'
+    )
+    return html.replace('</div>\n</body>', '</div></div>\n</body>')
+
+
+async def benchmark_profile(profile_name: str, template_html: str, runs: int) -> Dict[str, float]:
+    """Render `runs` times for one output profile and summarise time and bytes"""
+    pool = DashboardBrowserPool(max_renders_per_page=runs + 2, asset_bundle=AssetBundle())
+    profiles = DashboardOutputProfiles()
+    template_key = hash(template_html)
+    viewport = {"width": VIEWPORT["width"], "height": VIEWPORT["height"]}
+
+    timings, images = [], []
+    try:
+        # Untimed first render measures the element so later renders use the profile's device scale
+        variant = profiles.variant(profile_name, template_key, viewport)
+        await pool.render(variant, template_html, SAMPLE_DASHBOARD_DATA,
+                          lambda page: profiles.capture(page, profile_name, template_key))
+
+        variant = profiles.variant(profile_name, template_key, viewport)
+        for _ in range(runs):
+            start = time.perf_counter()
+            image = await pool.render(variant, template_html, SAMPLE_DASHBOARD_DATA,
+                                      lambda page: profiles.capture(page, profile_name, template_key))
+            timings.append((time.perf_counter() - start) * 1000)
+            images.append(image)
+    finally:
+        await pool.close()
+
+    last = images[-1]
+    return {
+        "scale": variant["scale"],
+        "size": f"{last['width']}x{last['height']}",
+        "bytes": len(last["bytes"]),
+        "quality": last["quality"],
+        "render_p50_ms": round(percentile(timings, 50), 1),
+        "render_p95_ms": round(percentile(timings, 95), 1),
+        "capture_p50_ms": round(percentile([i["capture_ms"] for i in images], 50), 1),
+        "encode_p50_ms": round(percentile([i["encode_ms"] for i in images], 50), 1),
+        "runs": runs,
+    }
+
+
+def benchmark_encode(profile_name: str, image_path: Path, runs: int) -> Dict[str, float]:
+    """Time the resize + encode stage alone on an existing full-resolution capture"""
+    profile = OUTPUT_PROFILES[profile_name]
+    with Image.open(image_path) as source:
+        source = source.convert("RGB")
+
+    # Steady-state renders already rasterise at the target size, so only the encode is on the hot path
+    image = source
+    if profile["long_edge"] is not None:
+        image = DashboardOutputProfiles.resize_to_long_edge(source, profile["long_edge"])
+
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        data, quality = DashboardOutputProfiles.encode(image, profile)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    return {
+        "size": f"{image.size[0]}x{image.size[1]}",
+        "megapixels": round(image.size[0] * image.size[1] / 1e6, 2),
+        "bytes": len(data),
+        "quality": quality,
+        "encode_p50_ms": round(percentile(timings, 50), 1),
+        "runs": runs,
+    }
+
+
+def benchmark_formats(profile_name: str, source: Image.Image, formats: List[str], runs: int) -> Dict[str, dict]:
+    """Encode one capture to each format under a profile's budget and PSNR floor"""
+    profile = OUTPUT_PROFILES[profile_name]
+    image = source
+    if profile["long_edge"] is not None:
+        image = DashboardOutputProfiles.resize_to_long_edge(source, profile["long_edge"])
+
+    encoder = ImageEncoder(max_workers=1)  # One encode at a time so the timings don't contend
+    results = {}
+    try:
+        for image_format in formats:
+            timings = []
+            for _ in range(runs):
+                encoded = encoder.encode_formats(image, [image_format], max_bytes=profile["max_bytes"],
+                                                 quality=profile["quality"], min_quality=profile["min_quality"],
+                                                 min_psnr=profile.get("min_psnr")).get(image_format)
+                if encoded is None:
+                    break
+                timings.append(encoded["encode_ms"])
+            if not timings:
+                results[image_format] = {"error": "not supported by this Pillow build"}
+                continue
+            with Image.open(io.BytesIO(encoded["bytes"])) as decoded:
+                measured = psnr(image, decoded.convert("RGB"))
+            results[image_format] = {
+                "size": f"{image.size[0]}x{image.size[1]}",
+                "bytes": len(encoded["bytes"]),
+                "quality": encoded["quality"],
+                "psnr": round(measured, 2) if measured != math.inf else None,
+                "within_budget": encoded["within_budget"],
+                "attempts": encoded["attempts"],
+                "encode_p50_ms": round(percentile(timings, 50), 1),
+                "runs": len(timings),
+            }
+    finally:
+        encoder.close()
+    return results
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard render latency")
+    parser.add_argument("--runs", type=int, default=20, help="Renders per wait strategy or profile")
+    parser.add_argument("--profiles", action="store_true", help="Compare output profiles instead of wait strategies")
+    parser.add_argument("--from-image", type=Path, help="Encode-only profile benchmark on an existing capture")
+    parser.add_argument("--formats", nargs="+", choices=["jpeg", "webp", "avif", "png"],
+                        help="Compare encoders per profile instead of rendering")
+    args = parser.parse_args()
+
+    if args.formats:
+        if args.from_image:
+            with Image.open(args.from_image) as source:
+                source = source.convert("RGB")
+        else:
+            from native_renderer_system import NativeDashboardRenderer
+            source = NativeDashboardRenderer().render(SAMPLE_DASHBOARD_DATA)
+        results = {}
+        for profile_name in OUTPUT_PROFILES:
+            print(f"Encoding profile '{profile_name}' as {', '.join(args.formats)} ({args.runs} runs)...")
+            results[profile_name] = benchmark_formats(profile_name, source, args.formats, args.runs)
+        print(json.dumps(results, indent=2))
+        return
+
+    template_html = (Path(__file__).parent / "dashboard.html").read_text(encoding="utf-8")
+
+    if args.profiles:
+        results = {}
+        for profile_name in OUTPUT_PROFILES:
+            print(f"Benchmarking profile '{profile_name}' ({args.runs} runs)...")
+            if args.from_image:
+                results[profile_name] = benchmark_encode(profile_name, args.from_image, args.runs)
+            else:
+                results[profile_name] = await benchmark_profile(
+                    profile_name, apply_text_scaling(template_html), args.runs
+                )
+        print(json.dumps(results, indent=2))
+        return
+
+    results = {}
+    for strategy in ("sleeps", "signal"):
+        print(f"Benchmarking '{strategy}' ({args.runs} renders)...")
+        results[strategy] = await benchmark_strategy(strategy, template_html, args.runs)
+
+    sleeps, signal = results["sleeps"], results["signal"]
+    results["reduction"] = {
+        "p50_ms": round(sleeps["all_p50_ms"] - signal["all_p50_ms"], 1),
+        "p95_ms": round(sleeps["all_p95_ms"] - signal["all_p95_ms"], 1),
+    }
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,219 @@
+"""
+Stage-level render benchmark for the dashboard pipeline.
+
+Replays recorded payloads through app_with_dashboard.generate_dashboard_image() (with Telegram
+delivery stubbed out and the render cache disabled) and times each stage separately:
+- launch_ms: Chromium launch (cold renders only; 0 for the browserless backends)
+- set_content_ms: new page + template load (cold renders only; 0 for the browserless backends)
+- readiness_ms: updateDashboard() call + readiness signal wait (playwright only)
+- screenshot_ms: screenshot rasterisation (native: Pillow draw, svg: SVG build + resvg)
+- encode_ms: output profile encode
+- write_ms: writing the encoded image to disk
+- other_ms: everything else in generate_dashboard_image() (trend maths, data build, bookkeeping)
+
+Payload files are JSONL. Each line is either a recorded render payload ({'theme', 'dashboard_data'},
+written when DASHBOARD_DATA_LOG_FILE is set) or a recorded reading ({'hospitals': {name: minutes}},
+as in hospital_wait_trends.jsonl), which goes through the trend cache to build its dashboard_data.
+
+Results are JSON per backend and output profile: the cold first render plus p50/p95 per stage over
+the warm renders. --baseline compares warm p50 totals against a previous --output file and exits
+non-zero on a regression.
+
+Usage:
+    python benchmark_stages.py --runs 10
+    python benchmark_stages.py --payloads dashboard_payloads.jsonl --backends native svg --output stages.json
+    python benchmark_stages.py --backends native --baseline stages.json --tolerance 0.2
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import app_with_dashboard as app
+from benchmark_render import percentile
+from image_encoder_system import FORMAT_EXTENSIONS
+from output_profile_system import OUTPUT_PROFILES
+from render_cache_system import DashboardRenderCache
+
+
+BACKENDS = ["playwright", "native", "svg"]
+STAGES = ["launch_ms", "set_content_ms", "readiness_ms", "screenshot_ms", "encode_ms", "write_ms", "other_ms",
+          "total_ms"]
+
+
+def load_payloads(path: Path, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Read recorded render payloads or readings from a JSONL file"""
+    payloads = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "dashboard_data" in record:
+                payloads.append({"theme": record.get("theme", "dark"), "dashboard_data": record["dashboard_data"]})
+            elif isinstance(record.get("hospitals"), dict):
+                payloads.append({"theme": "dark", "hospitals": record["hospitals"],
+                                 "source_updated": record.get("source_updated")})
+            if limit and len(payloads) >= limit:
+                break
+    if not payloads:
+        raise ValueError(f"No payloads in {path}")
+    return payloads
+
+
+def stub_delivery() -> List[str]:
+    """Replace Telegram delivery so a replay can never post (returns the list of attempted sends)"""
+    attempts = []
+
+    def send_message(text: str):
+        attempts.append("message")
+        return True, None, None
+
+    def send_photo(image_bytes: bytes, caption: str = "", filename: str = "dashboard.jpg"):
+        attempts.append("photo")
+        return True, None
+
+    app.telegram_send_message = send_message
+    app.telegram_send_photo = send_photo
+    return attempts
+
+
+async def replay(payload: Dict[str, Any], out_dir: Path, index: int) -> Dict[str, Any]:
+    """Render one payload and return its stage timings"""
+    app.browser_pool.last_stages = {}
+    start = time.perf_counter()
+    if "dashboard_data" in payload:
+        image = await app.render_dashboard(payload["dashboard_data"], payload["theme"])
+    else:
+        image, _ = await app.generate_dashboard_image(payload["hospitals"], payload["theme"],
+                                                      source_updated=payload.get("source_updated"))
+    render_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    extension = FORMAT_EXTENSIONS[image["format"]]
+    await asyncio.to_thread((out_dir / f"dashboard_{index}.{extension}").write_bytes, image["bytes"])
+    if image.get("svg"):
+        await asyncio.to_thread((out_dir / f"dashboard_{index}.svg").write_text, image["svg"], encoding="utf-8")
+    write_ms = (time.perf_counter() - start) * 1000
+
+    pool = app.browser_pool.last_stages if app.DASHBOARD_RENDER_BACKEND == "playwright" else {}
+    stages = {
+        "launch_ms": pool.get("launch_ms", 0.0),
+        "set_content_ms": pool.get("set_content_ms", 0.0),
+        "readiness_ms": pool.get("update_ms", 0.0) + pool.get("ready_ms", 0.0),
+        "screenshot_ms": image["capture_ms"],
+        "encode_ms": image["encode_ms"],
+        "write_ms": write_ms,
+    }
+    stages["other_ms"] = max(0.0, render_ms - sum(stages.values()) + write_ms)
+    stages["total_ms"] = render_ms + write_ms
+    return {
+        "stages": {name: round(value, 1) for name, value in stages.items()},
+        "bytes": len(image["bytes"]),
+        "size": f"{image['width']}x{image['height']}"
+    }
+
+
+async def benchmark_combination(backend: str, profile_name: str, payloads: List[Dict[str, Any]],
+                                runs: int) -> Dict[str, Any]:
+    """Replay `runs` payloads (cycling through the file) on one backend and output profile"""
+    app.DASHBOARD_RENDER_BACKEND = backend
+    app.OUTPUT_PROFILE = profile_name
+    samples = []
+    try:
+        with tempfile.TemporaryDirectory() as out_dir:
+            for index in range(runs):
+                samples.append(await replay(payloads[index % len(payloads)], Path(out_dir), index))
+    finally:
+        await app.wait_for_archive_writes()
+        await app.browser_pool.close()
+
+    warm = samples[1:] or samples
+    summary = {
+        "runs": runs,
+        "bytes": samples[-1]["bytes"],
+        "size": samples[-1]["size"],
+        "cold": samples[0]["stages"],
+        "warm_p50": {},
+        "warm_p95": {}
+    }
+    for stage in STAGES:
+        values = [sample["stages"][stage] for sample in warm]
+        summary["warm_p50"][stage] = round(percentile(values, 50), 1)
+        summary["warm_p95"][stage] = round(percentile(values, 95), 1)
+    return summary
+
+
+def compare(results: Dict[str, Dict[str, dict]], baseline: Dict[str, Dict[str, dict]], tolerance: float) -> List[str]:
+    """Warm p50 totals (and stages) that got slower than the baseline by more than `tolerance`"""
+    regressions = []
+    for backend, profiles in results.items():
+        for profile_name, result in profiles.items():
+            before = baseline.get(backend, {}).get(profile_name)
+            if "error" in result or not before or "error" in before:
+                continue
+            for stage in STAGES:
+                old, new = before["warm_p50"].get(stage), result["warm_p50"][stage]
+                # Ignore slowdowns of a few ms on short stages - noise dominates there
+                if old and new > max(old * (1 + tolerance), old + 5):
+                    regressions.append(f"{backend}/{profile_name} {stage}: {old:.1f}ms -> {new:.1f}ms "
+                                       f"(+{(new / old - 1) * 100:.0f}%)")
+    return regressions
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="Benchmark dashboard render stages")
+    parser.add_argument("--payloads", type=Path, default=Path(__file__).parent / "hospital_wait_trends.jsonl",
+                        help="JSONL of recorded render payloads or readings")
+    parser.add_argument("--limit", type=int, help="Use only the first N payloads")
+    parser.add_argument("--runs", type=int, default=10, help="Renders per backend and profile")
+    parser.add_argument("--backends", nargs="+", default=BACKENDS, choices=BACKENDS)
+    parser.add_argument("--profiles", nargs="+", default=list(OUTPUT_PROFILES), choices=list(OUTPUT_PROFILES))
+    parser.add_argument("--output", type=Path, help="Also write the JSON results here")
+    parser.add_argument("--baseline", type=Path, help="Previous --output file to compare against")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed slowdown vs the baseline (0.2 = 20%%)")
+    args = parser.parse_args()
+
+    payloads = load_payloads(args.payloads, args.limit)
+    attempts = stub_delivery()
+    # Every replay must render - identical payloads would otherwise come back from the cache
+    app.render_cache = DashboardRenderCache(max_bytes=0)
+    app.ARCHIVE_DASHBOARD_IMAGES = False
+    app.publish_dashboard_svg = lambda svg: None  # replay() writes the SVG to its temp dir instead
+    app.DASHBOARD_DATA_LOG_FILE = None
+
+    results = {}
+    for backend in args.backends:
+        results[backend] = {}
+        for profile_name in args.profiles:
+            print(f"Benchmarking {backend}/{profile_name} ({args.runs} renders of {len(payloads)} payloads)...")
+            try:
+                results[backend][profile_name] = await benchmark_combination(backend, profile_name, payloads,
+                                                                             args.runs)
+            except Exception as e:
+                print(f"  {backend}/{profile_name} failed: {e}")
+                results[backend][profile_name] = {"error": str(e).splitlines()[0] if str(e) else type(e).__name__}
+
+    if attempts:
+        raise RuntimeError(f"Delivery was attempted during the benchmark: {attempts}")
+
+    print(json.dumps(results, indent=2))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+
+    if args.baseline:
+        regressions = compare(results, json.loads(args.baseline.read_text(encoding="utf-8")), args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}")
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions against {args.baseline} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,176 @@
+"""
+Trend stats benchmark: vectorised TrendEngine vs the per-hospital Python loops it replaced.
+
+Builds a synthetic wait history (random-walk waits, 5-minute polls with occasional missed polls)
+for each site count × retention in days, then times one full stats pass - 30-minute trends,
+24h change and pressure index - both ways and checks the results agree. Also times the 24h
+volatility stat from the running WindowStatsTracker against recomputing stdev over each window.
+
+Usage:
+    python benchmark_trends.py
+    python benchmark_trends.py --sites 10 100 1000 5000 --days 1 7 28 --runs 5
+"""
+
+import argparse
+import json
+import statistics
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from benchmark_render import percentile
+from trend_cache_system import CHANGE_WINDOW_SECONDS, TREND_WINDOW_SECONDS, WINDOW_TOLERANCE_SECONDS
+from trend_engine_system import TrendEngine
+from wait_history_system import WaitHistory
+from window_stats_system import WindowStatsTracker
+
+
+POLL_SECONDS = 300
+
+
+def build_history(path: str, sites: int, days: int, seed: int = 0) -> Tuple[WaitHistory, Dict[str, int], float]:
+    """
+    Fill a full history file for `sites` hospitals covering `days` days
+
+    Returns:
+        Tuple of (history, current readings, now)
+    """
+    capacity = days * 24 * 3600 // POLL_SECONDS
+    history = WaitHistory(path, capacity=capacity, slots=sites)
+    names = [f"Site {i:05d} ED" for i in range(sites)]
+    rng = np.random.default_rng(seed)
+
+    # ~2% of polls missed, each gap 1-11 polls long
+    gaps = np.where(rng.random(capacity) < 0.02, rng.integers(1, 12, capacity), 0) + 1
+    start = 1_700_000_000
+    stamps = start + np.cumsum(gaps) * POLL_SECONDS
+    history.append({name: 0 for name in names}, timestamp=start)  # Allocates the slots
+
+    heads, counts, times, waits = TrendEngine(history).rings()
+    times[:sites] = stamps
+    waits[:sites] = np.clip(150 + np.cumsum(rng.normal(0, 8, (sites, capacity)), axis=1), 0, 900)
+    heads[:sites] = 0
+    counts[:sites] = capacity
+    current = {name: int(wait) for name, wait in zip(names, waits[:sites, -1] + rng.integers(-20, 21, sites))}
+    del heads, counts, times, waits
+    history.flush()
+    return history, current, float(stamps[-1] + POLL_SECONDS)
+
+
+def python_stats(history: WaitHistory, current: Dict[str, int], now: float) -> dict:
+    """The per-hospital loops TrendEngine replaced, on the same history API"""
+    def reading_ago(hospital: str, seconds: int):
+        reading = history.at_or_before(hospital, now - seconds + WINDOW_TOLERANCE_SECONDS)
+        return reading if reading is not None else history.oldest(hospital)
+
+    diffs = {}
+    for hospital, wait in current.items():
+        reading = reading_ago(hospital, TREND_WINDOW_SECONDS)
+        if reading is not None:
+            diffs[hospital] = wait - reading[1]
+
+    day_changes = {}
+    for hospital in history.hospitals():
+        if history.count(hospital) >= 2 and hospital in current:
+            day_changes[hospital] = current[hospital] - reading_ago(hospital, CHANGE_WINDOW_SECONDS)[1]
+
+    over = sum(1 for wait in current.values() if wait >= 120)
+    return {
+        'improving_count': sum(1 for diff in diffs.values() if diff < 0),
+        'worsening_count': sum(1 for diff in diffs.values() if diff > 0),
+        'worst_decline': max(diffs.values(), default=None),
+        'biggest_increase': max(day_changes.values(), default=None),
+        'pressure_percentage': round(over / len(current) * 100) if current else 0
+    }
+
+
+def engine_summary(stats: dict) -> dict:
+    """The same fields as python_stats() from a TrendEngine result"""
+    trends, change = stats['trends'], stats['biggest_change_24h'] or {}
+    return {
+        'improving_count': trends['improving_count'],
+        'worsening_count': trends['worsening_count'],
+        'worst_decline': trends['worst_decline']['diff'] if trends['worst_decline'] else None,
+        'biggest_increase': change['biggest_increase']['change'] if change.get('biggest_increase') else None,
+        'pressure_percentage': stats['pressure']['percentage']
+    }
+
+
+def python_volatility(history: WaitHistory, now: float) -> float:
+    """Largest 24h standard deviation, recomputed from each hospital's window"""
+    windows = (history.since(hospital, now - CHANGE_WINDOW_SECONDS) for hospital in history.hospitals())
+    return max(round(statistics.stdev(window), 1) for window in windows if len(window) >= 4)
+
+
+def tracker_volatility(tracker: WindowStatsTracker, now: float) -> float:
+    """Largest 24h standard deviation from the running window stats"""
+    return max(round(stats['std_dev'], 1) for stats in tracker.all('24h', now).values() if stats['readings'] >= 4)
+
+
+def time_ms(fn, runs: int) -> List[float]:
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return timings
+
+
+def benchmark(sites: int, days: int, runs: int) -> dict:
+    with tempfile.TemporaryDirectory() as tmp:
+        build_start = time.perf_counter()
+        history, current, now = build_history(str(Path(tmp) / "history.bin"), sites, days)
+        build_ms = (time.perf_counter() - build_start) * 1000
+        engine = TrendEngine(history)
+
+        def vectorised():
+            return engine.compute(current, now=now, trend_window_s=TREND_WINDOW_SECONDS,
+                                  change_window_s=CHANGE_WINDOW_SECONDS, tolerance_s=WINDOW_TOLERANCE_SECONDS)
+
+        engine_ms = time_ms(vectorised, runs)
+        python_ms = time_ms(lambda: python_stats(history, current, now), runs)
+        match = engine_summary(vectorised()) == python_stats(history, current, now)
+
+        seed_start = time.perf_counter()
+        tracker = WindowStatsTracker({'24h': CHANGE_WINDOW_SECONDS})
+        tracker.seed(history)
+        seed_ms = (time.perf_counter() - seed_start) * 1000
+        tracker_ms = time_ms(lambda: tracker_volatility(tracker, now), runs)
+        recompute_ms = time_ms(lambda: python_volatility(history, now), runs)
+        volatility_match = tracker_volatility(tracker, now) == python_volatility(history, now)
+        history.close()
+
+    return {
+        "readings_per_site": history.capacity,
+        "build_ms": round(build_ms, 1),
+        "engine_p50_ms": round(percentile(engine_ms, 50), 2),
+        "python_p50_ms": round(percentile(python_ms, 50), 2),
+        "speedup": round(percentile(python_ms, 50) / percentile(engine_ms, 50), 1),
+        "match": match,
+        "volatility_seed_ms": round(seed_ms, 1),
+        "volatility_tracker_p50_ms": round(percentile(tracker_ms, 50), 2),
+        "volatility_recompute_p50_ms": round(percentile(recompute_ms, 50), 2),
+        "volatility_match": volatility_match
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the vectorised trend engine")
+    parser.add_argument("--sites", type=int, nargs="+", default=[10, 100, 1000, 5000], help="Hospital counts")
+    parser.add_argument("--days", type=int, nargs="+", default=[1, 7, 14], help="History retention in days")
+    parser.add_argument("--runs", type=int, default=5, help="Timed passes per configuration")
+    args = parser.parse_args()
+
+    results = {}
+    for sites in args.sites:
+        for days in args.days:
+            print(f"Benchmarking {sites} sites × {days} days ({args.runs} runs)...")
+            results[f"{sites}x{days}d"] = benchmark(sites, days, args.runs)
+    print(json.dumps(results, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,302 @@
+"""
+Warm Browser Pool for Dashboard Rendering
+Keeps one Chromium instance alive between polls with a warm page per output variant
+"""
+
+import asyncio
+import time
+from collections import defaultdict, deque
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+from playwright.async_api import async_playwright, TimeoutError as PlaywrightTimeoutError
+
+
+class DashboardBrowserPool:
+    """Long-lived Chromium with one pre-loaded dashboard page per output variant
+
+    Pages with the same device scale share one browser context, and renders on different
+    variants can run concurrently (renders on the same variant are serialised).
+    """
+
+    def __init__(self, max_renders_per_page: int = 50, max_renders_per_browser: int = 200, latency_window: int = 100,
+                 ready_timeout_ms: int = 5000, wait_strategy: str = "signal", asset_bundle=None):
+        """
+        Args:
+            max_renders_per_page: Reload a page after this many renders
+            max_renders_per_browser: Relaunch Chromium after this many renders
+            latency_window: Number of latency samples kept per start type
+            ready_timeout_ms: Deadline for the page's readiness signal before capturing anyway
+            wait_strategy: 'signal' to capture on the 'dashboard:ready' signal,
+                           'sleeps' for the legacy fixed waits (benchmark baseline)
+            asset_bundle: Optional AssetBundle serving the template and its assets offline
+                          (None = set_content, assets fetched from wherever the template points)
+        """
+        self.max_renders_per_page = max_renders_per_page
+        self.max_renders_per_browser = max_renders_per_browser
+        self.ready_timeout_ms = ready_timeout_ms
+        self.wait_strategy = wait_strategy
+        self.asset_bundle = asset_bundle
+        self._playwright = None
+        self._browser = None
+        self._contexts = {}  # {device_scale: BrowserContext}
+        self._launch_lock = asyncio.Lock()
+        self._page_locks = defaultdict(asyncio.Lock)  # {variant_key: Lock}
+        self._pages = {}  # {variant_key: {"page": Page, "template_key": int, "renders": int, "crashed": bool}}
+        self.browser_renders = 0
+        self.browser_launches = 0
+        self.page_loads = 0
+        self.launch_ms = 0.0  # Duration of the latest Chromium launch
+        self.last_stages = {}  # Stage timings of the latest render (see _render_locked)
+        self.latency = {
+            "cold": deque(maxlen=latency_window),  # Render needed a browser launch or page load
+            "warm": deque(maxlen=latency_window)   # Render reused a loaded page
+        }
+
+    @staticmethod
+    def variant_key(variant: dict) -> str:
+        """Build a stable key for a variant dict with width, height, scale and an optional label (e.g. theme)"""
+        key = f"{variant['width']}x{variant['height']}@{variant.get('scale', 1)}"
+        return f"{key}:{variant['label']}" if variant.get('label') else key
+
+    async def _ensure_browser(self):
+        """Launch Chromium if it is not running (or has crashed) - concurrent callers share one launch"""
+        async with self._launch_lock:
+            if self._browser is not None and self._browser.is_connected():
+                return
+            await self._launch_browser()
+
+    async def _launch_browser(self):
+        await self._discard_browser()
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+
+        start = time.perf_counter()
+        self._browser = await self._playwright.chromium.launch()
+        self.launch_ms = (time.perf_counter() - start) * 1000
+        self._browser.on('disconnected', lambda _: print("[BROWSER POOL] Chromium disconnected"))
+        self.browser_launches += 1
+        self.browser_renders = 0
+        print(f"[BROWSER POOL] Chromium launched (launch #{self.browser_launches}) in {self.launch_ms:.0f}ms")
+
+    async def _get_context(self, scale: float):
+        """Browser context for a device scale (created on first use, shared by its pages)"""
+        async with self._launch_lock:
+            context = self._contexts.get(scale)
+            if context is None:
+                context = await self._browser.new_context(device_scale_factor=scale)
+                self._contexts[scale] = context
+            return context
+
+    async def _open_page(self, key: str, variant: dict, template_html: str) -> dict:
+        """Open a page for the variant and load the dashboard template into it"""
+        start = time.perf_counter()
+        context = await self._get_context(variant.get('scale', 1))
+        page = await context.new_page()
+        await page.set_viewport_size({'width': variant['width'], 'height': variant['height']})
+        entry = {"page": page, "template_key": hash(template_html), "renders": 0, "crashed": False, "load_ms": 0.0}
+
+        # Enable console logging
+        page.on('console', lambda msg: print(f'[BROWSER] {msg.type}: {msg.text}'))
+        page.on('pageerror', lambda err: print(f'[BROWSER ERROR] {err}'))
+        page.on('crash', lambda _: entry.update(crashed=True))
+
+        # Fonts and late layout are covered by the readiness signal on each render
+        wait_until = 'networkidle' if self.wait_strategy == "sleeps" else 'load'
+        if self.asset_bundle is not None:
+            # Serve the template from the bundle origin so relative asset URLs resolve from memory
+            url = await self.asset_bundle.install(page, template_html)
+            await page.goto(url, wait_until=wait_until)
+        else:
+            await page.set_content(template_html, wait_until=wait_until)
+
+        if self.wait_strategy == "sleeps":
+            # Wait for fonts and rendering
+            await page.wait_for_timeout(1000)
+
+        entry["load_ms"] = (time.perf_counter() - start) * 1000
+        self._pages[key] = entry
+        self.page_loads += 1
+        return entry
+
+    async def _get_page(self, variant: dict, template_html: str):
+        """
+        Return a ready page for the variant
+
+        Returns:
+            Tuple of (entry, cold) where cold is True if a browser or page had to be started
+        """
+        key = self.variant_key(variant)
+        entry = self._pages.get(key)
+
+        if entry is not None and (entry["crashed"] or entry["page"].is_closed()):
+            print(f"[BROWSER POOL] Page {key} crashed or closed, reopening")
+            await self._discard_page(key)
+            entry = None
+
+        if entry is not None and entry["template_key"] != hash(template_html):
+            # Template changed (theme/scaling flags) - reload instead of reusing stale markup
+            await self._discard_page(key)
+            entry = None
+
+        if entry is not None and self._browser is not None and self._browser.is_connected():
+            return entry, False
+
+        await self._ensure_browser()
+        entry = await self._open_page(key, variant, template_html)
+        return entry, True
+
+    async def render(self, variant: dict, template_html: str, dashboard_data: dict,
+                     capture: Callable[[Any], Awaitable[Any]]) -> Any:
+        """
+        Render dashboard data on a warm page and capture it
+
+        Args:
+            variant: Dict with 'width', 'height', 'scale' (device scale factor) and optional 'label'
+                     (separates pages whose templates differ, e.g. themes at the same size)
+            template_html: Dashboard HTML without injected data
+            dashboard_data: Data passed to updateDashboard() in the page
+            capture: Coroutine taking the page and returning the screenshot result
+
+        Returns:
+            Whatever capture() returns
+        """
+        key = self.variant_key(variant)
+        async with self._page_locks[key]:
+            return await self._render_locked(key, variant, template_html, dashboard_data, capture)
+
+    async def _render_locked(self, key: str, variant: dict, template_html: str, dashboard_data: dict,
+                             capture: Callable[[Any], Awaitable[Any]]) -> Any:
+        for attempt in (1, 2):
+            start = time.perf_counter()
+            launches = self.browser_launches
+            try:
+                entry, cold = await self._get_page(variant, template_html)
+                page = entry["page"]
+                loaded = time.perf_counter()
+
+                # Re-render in place instead of reloading the page
+                render_seq = await page.evaluate("data => updateDashboard(data)", dashboard_data)
+                updated = time.perf_counter()
+                await self._wait_until_ready(page, key, render_seq)
+                ready = time.perf_counter()
+
+                result = await capture(page)
+            except Exception as e:
+                print(f"[BROWSER POOL] Render failed on {key} (attempt {attempt}): {e}")
+                await self._discard_page(key)
+                if self._browser is not None and not self._browser.is_connected():
+                    await self._discard_browser()
+                if attempt == 2:
+                    raise
+                continue
+
+            elapsed_ms = (time.perf_counter() - start) * 1000
+            self.latency["cold" if cold else "warm"].append(elapsed_ms)
+            self.last_stages = {
+                "launch_ms": round(self.launch_ms if self.browser_launches != launches else 0.0, 1),
+                "set_content_ms": round(entry["load_ms"] if cold else 0.0, 1),  # New page + template load
+                "update_ms": round((updated - loaded) * 1000, 1),  # updateDashboard() call
+                "ready_ms": round((ready - updated) * 1000, 1),  # Readiness signal wait
+                "capture_ms": round((time.perf_counter() - ready) * 1000, 1),  # capture() incl. any encode
+                "total_ms": round(elapsed_ms, 1)
+            }
+            entry["renders"] += 1
+            self.browser_renders += 1
+            print(f"[BROWSER POOL] {'Cold' if cold else 'Warm'} render {key}: {elapsed_ms:.0f}ms "
+                  f"(page {entry['renders']}/{self.max_renders_per_page}, "
+                  f"browser {self.browser_renders}/{self.max_renders_per_browser})")
+
+            await self._recycle_if_due(key)
+            return result
+
+    async def _wait_until_ready(self, page, key: str, render_seq: Optional[int]):
+        """Wait for the page's readiness signal, falling back to the deadline"""
+        if self.wait_strategy == "sleeps" or render_seq is None:
+            # Legacy template without a readiness signal
+            # Wait for table to be populated (check for at least one row)
+            await page.wait_for_selector('tbody#hospital-table tr', timeout=5000)
+            # Wait 3 seconds for dashboard animations/data load before capture
+            await page.wait_for_timeout(3000)
+            return
+
+        try:
+            await page.wait_for_function(
+                "seq => window.dashboardReadySeq >= seq",
+                arg=render_seq,
+                timeout=self.ready_timeout_ms
+            )
+        except PlaywrightTimeoutError:
+            print(f"[BROWSER POOL] No readiness signal from {key} within {self.ready_timeout_ms}ms, capturing anyway")
+
+    async def _recycle_if_due(self, key: str):
+        """Close pages and the browser once they reach their render budget"""
+        if self.browser_renders >= self.max_renders_per_browser:
+            print(f"[BROWSER POOL] Recycling Chromium after {self.browser_renders} renders")
+            await self._discard_browser()
+            return
+
+        entry = self._pages.get(key)
+        if entry is not None and entry["renders"] >= self.max_renders_per_page:
+            print(f"[BROWSER POOL] Recycling page {key} after {entry['renders']} renders")
+            await self._discard_page(key)
+
+    async def _discard_page(self, key: str):
+        """Close and forget a page (ignores errors from crashed pages)"""
+        entry = self._pages.pop(key, None)
+        if entry is None:
+            return
+        try:
+            await entry["page"].close()
+        except Exception:
+            pass
+
+    async def _discard_browser(self):
+        """Close all pages and the browser (ignores errors from a dead browser)"""
+        for key in list(self._pages.keys()):
+            await self._discard_page(key)
+        self._contexts = {}
+        if self._browser is not None:
+            try:
+                await self._browser.close()
+            except Exception:
+                pass
+        self._browser = None
+
+    async def close(self):
+        """Shut down the browser and the Playwright driver"""
+        await self._discard_browser()
+        if self._playwright is not None:
+            try:
+                await self._playwright.stop()
+            except Exception:
+                pass
+        self._playwright = None
+
+    def stats(self) -> dict:
+        """
+        Get render latency statistics for cold and warm starts
+
+        Returns:
+            Dict with:
+            {
+                'cold': {'count': int, 'avg_ms': float, 'last_ms': float} or None,
+                'warm': {'count': int, 'avg_ms': float, 'last_ms': float} or None,
+                'browser_launches': int,
+                'page_loads': int
+            }
+        """
+        def summarize(samples):
+            if not samples:
+                return None
+            return {
+                'count': len(samples),
+                'avg_ms': round(sum(samples) / len(samples), 1),
+                'last_ms': round(samples[-1], 1)
+            }
+
+        return {
+            'cold': summarize(self.latency["cold"]),
+            'warm': summarize(self.latency["warm"]),
+            'browser_launches': self.browser_launches,
+            'page_loads': self.page_loads
+        }
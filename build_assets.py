@@ -0,0 +1,86 @@
+"""
+Build the vendored dashboard assets in assets/
+
+Compiles assets/tailwind.css from assets/src/tailwind.input.css, scanning the dashboard
+template and the Python modules that emit Tailwind classes into dashboard data.
+Re-run after adding new Tailwind classes to any of those files.
+
+Also writes Latin subsets of the Inter fonts to assets/fonts/inter/subset/ - TTF for the SVG
+rasteriser (resvg can't read woff2) and woff2 for embedding in the served SVG. Re-run if the
+dashboard starts using characters outside SUBSET_UNICODES.
+
+Requires the standalone Tailwind CLI and fontTools (build-time only):
+    pip install tailwindcss-bin fonttools brotli
+
+Font Awesome (assets/fontawesome/) is copied from the fontawesomefree 6.4.0 package and
+Inter (assets/fonts/inter/) from the upstream woff2 release - both are committed as-is.
+
+Usage:
+    python build_assets.py
+"""
+
+import shutil
+import subprocess
+import sys
+from pathlib import Path
+
+
+ASSET_DIR = Path(__file__).parent / "assets"
+TAILWIND_INPUT = ASSET_DIR / "src" / "tailwind.input.css"
+TAILWIND_OUTPUT = ASSET_DIR / "tailwind.css"
+FONT_DIR = ASSET_DIR / "fonts" / "inter"
+FONT_SUBSET_DIR = FONT_DIR / "subset"
+
+# Basic Latin, Latin-1, dashes/quotes/ellipsis, arrows and minus
+SUBSET_UNICODES = "U+0020-007E,U+00A0-00FF,U+2010-2027,U+2190-2195,U+2212"
+
+
+def build_tailwind() -> bool:
+    """Compile and minify the Tailwind stylesheet"""
+    cli = shutil.which("tailwindcss")
+    if cli is None:
+        print("[BUILD] tailwindcss CLI not found - install it with: pip install tailwindcss-bin")
+        return False
+
+    # Run from the input's directory so its relative @source paths resolve
+    result = subprocess.run(
+        [cli, "-i", TAILWIND_INPUT.name, "-o", str(TAILWIND_OUTPUT.resolve()), "--minify"],
+        cwd=TAILWIND_INPUT.parent
+    )
+    if result.returncode != 0:
+        print(f"[BUILD] Tailwind build failed (exit code {result.returncode})")
+        return False
+
+    print(f"[BUILD] Wrote {TAILWIND_OUTPUT} ({TAILWIND_OUTPUT.stat().st_size // 1024} KB)")
+    return True
+
+
+def build_font_subsets() -> bool:
+    """Subset the Inter woff2 files to SUBSET_UNICODES as TTF and woff2"""
+    try:
+        from fontTools import subset
+    except ImportError:
+        print("[BUILD] fontTools not found - install it with: pip install fonttools brotli")
+        return False
+
+    FONT_SUBSET_DIR.mkdir(exist_ok=True)
+    unicodes = subset.parse_unicodes(SUBSET_UNICODES)
+    for source in sorted(FONT_DIR.glob("Inter-*.woff2")):
+        for flavor, suffix in ((None, ".ttf"), ("woff2", ".woff2")):
+            options = subset.Options()
+            options.flavor = flavor
+            options.layout_features = ["kern", "liga", "calt"]
+            font = subset.load_font(str(source), options)
+            subsetter = subset.Subsetter(options)
+            subsetter.populate(unicodes=unicodes)
+            subsetter.subset(font)
+            output = FONT_SUBSET_DIR / (source.stem + suffix)
+            subset.save_font(font, str(output), options)
+            print(f"[BUILD] Wrote {output} ({output.stat().st_size // 1024} KB)")
+    return True
+
+
+if __name__ == "__main__":
+    ok = build_tailwind()
+    ok = build_font_subsets() and ok
+    sys.exit(0 if ok else 1)
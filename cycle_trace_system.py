@@ -0,0 +1,96 @@
+"""
+Polling Cycle Trace
+Times each stage of a polling cycle and reports the critical path through the stage dependency graph
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+
+class CycleTrace:
+    """Stage timings for one polling cycle
+
+    Stages that run concurrently overlap in wall time; the critical path is the chain of
+    dependent stages with the largest total duration, i.e. the shortest the cycle could take.
+    """
+
+    def __init__(self, dependencies: Dict[str, List[str]] = None):
+        """
+        Args:
+            dependencies: {stage: [stages it waits for]} used for the critical path
+        """
+        self.dependencies = dependencies or {}
+        self.origin = time.perf_counter()
+        self.spans = {}  # {stage: (start_ms, end_ms)} relative to the cycle start
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block (sync or inside a coroutine) as a named stage"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            end = time.perf_counter()
+            self.spans[name] = ((start - self.origin) * 1000, (end - self.origin) * 1000)
+
+    def duration(self, name: str) -> float:
+        start, end = self.spans.get(name, (0, 0))
+        return end - start
+
+    def critical_path(self) -> Tuple[List[str], float]:
+        """
+        Longest chain of dependent stages that ran
+
+        Returns:
+            Tuple of (stage names in order, total duration in ms)
+        """
+        best = {}  # {stage: (path, total_ms)}
+
+        def longest(name: str) -> Tuple[List[str], float]:
+            if name not in best:
+                path, total = [], 0.0
+                for dependency in self.dependencies.get(name, []):
+                    if dependency in self.spans:
+                        dep_path, dep_total = longest(dependency)
+                        if dep_total > total:
+                            path, total = dep_path, dep_total
+                best[name] = (path + [name], total + self.duration(name))
+            return best[name]
+
+        if not self.spans:
+            return [], 0.0
+        return max((longest(name) for name in self.spans), key=lambda item: item[1])
+
+    def summary(self) -> dict:
+        """
+        Returns:
+            Dict with:
+            {
+                'stages': {stage: {'start_ms': float, 'duration_ms': float}},
+                'wall_ms': float,           # First stage start to last stage end
+                'sequential_ms': float,     # Sum of stage durations (the old strictly ordered cycle)
+                'critical_path': [stage, ...],
+                'critical_path_ms': float
+            }
+        """
+        path, path_ms = self.critical_path()
+        wall_ms = max((end for _, end in self.spans.values()), default=0)
+        return {
+            'stages': {name: {'start_ms': round(start, 1), 'duration_ms': round(end - start, 1)}
+                       for name, (start, end) in sorted(self.spans.items(), key=lambda item: item[1][0])},
+            'wall_ms': round(wall_ms, 1),
+            'sequential_ms': round(sum(self.duration(name) for name in self.spans), 1),
+            'critical_path': path,
+            'critical_path_ms': round(path_ms, 1)
+        }
+
+    def format(self) -> str:
+        """One-line trace for the cycle log"""
+        summary = self.summary()
+        stages = " | ".join(f"{name} +{span['start_ms']:.0f}ms {span['duration_ms']:.0f}ms"
+                            for name, span in summary['stages'].items())
+        saved_ms = summary['sequential_ms'] - summary['wall_ms']
+        return (f"{stages} || wall {summary['wall_ms']:.0f}ms vs sequential {summary['sequential_ms']:.0f}ms "
+                f"(saved {saved_ms:.0f}ms) | critical path: {' -> '.join(summary['critical_path'])} "
+                f"{summary['critical_path_ms']:.0f}ms")
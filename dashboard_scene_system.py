@@ -0,0 +1,480 @@
+"""
+Dashboard Scene Layout
+Lays out the dashboard.html design (dark theme) as drawing primitives from the dashboard_data dict
+"""
+
+import html
+import re
+from functools import lru_cache
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+from PIL import ImageFont
+
+
+# Inter weights vendored for the browser renderer (see build_assets.py)
+FONT_DIR = Path(__file__).parent / "assets" / "fonts" / "inter"
+FONT_FILES = {
+    400: "Inter-Regular.woff2",
+    500: "Inter-Medium.woff2",
+    600: "Inter-SemiBold.woff2",
+    700: "Inter-Bold.woff2",
+}
+
+# Scene size in CSS px - the Playwright capture of the dashboard element (1152px wide, 1.5x text scaling applied)
+SCENE_WIDTH = 1152
+PADDING = 20
+COLUMN_GAP = 26
+CARD_GAP = 13
+
+# Dark theme palette (Tailwind colours used by dashboard.html)
+COLORS = {
+    "page_top": "#111827",
+    "page_bottom": "#0B0F14",
+    "panel": "#111827",
+    "border": "#1E293B",
+    "header_from": "#1E293B",
+    "header_to": "#334155",
+    "text": "#F1F5F9",
+    "text_soft": "#E2E8F0",
+    "text_muted": "#CBD5E1",
+    "text_dim": "#94A3B8",
+    "text_faint": "#64748B",
+    "cyan": "#22D3EE",
+    "cyan_deep": "#06B6D4",
+    "blue": "#60A5FA",
+    "rose": "#FB7185",
+    "rose_soft": "#FDA4AF",
+    "rose_base": "#F43F5E",
+    "emerald": "#34D399",
+    "emerald_base": "#10B981",
+    "amber": "#FBBF24",
+    "amber_base": "#F59E0B",
+    "orange": "#FB923C",
+    "yellow": "#FACC15",
+}
+
+# Severity colours per band: (dot, badge text, badge base) - mirrors getSeverityDot()/getWaitBadge()
+SEVERITY_COLORS = {
+    "critical": ("#EF4444", "#FB7185", "#F43F5E"),
+    "high": ("#F97316", "#FB923C", "#F97316"),
+    "moderate": ("#EAB308", "#FACC15", "#EAB308"),
+    "low": ("#10B981", "#34D399", "#10B981"),
+}
+
+# Icons as strokes/fills in a 24x24 box (simplified from the template's heroicons)
+ICONS = {
+    "clock": [("circle", (12, 12), 10), ("line", [(12, 6), (12, 12), (16, 14)])],
+    "chart": [("line", [(4, 20), (4, 13)]), ("line", [(10, 20), (10, 8)]),
+              ("line", [(16, 20), (16, 4)]), ("line", [(20, 20), (20, 11)])],
+    "warning": [("line", [(12, 3), (22, 20), (2, 20), (12, 3)]), ("line", [(12, 9), (12, 13)]),
+                ("dot", (12, 16.5), 1.2)],
+    "info": [("circle", (12, 12), 9), ("line", [(12, 11), (12, 16)]), ("dot", (12, 8), 1.2)],
+    "check": [("circle", (12, 12), 9), ("line", [(9, 12), (11, 14), (15, 10)])],
+    "arrow_right": [("line", [(5, 12), (19, 12)]), ("line", [(13, 6), (19, 12), (13, 18)])],
+    "swap": [("line", [(7, 16), (7, 4)]), ("line", [(3, 8), (7, 4), (11, 8)]),
+             ("line", [(17, 8), (17, 20)]), ("line", [(13, 16), (17, 20), (21, 16)])],
+    "trend": [("line", [(3, 17), (9, 11), (13, 15), (21, 7)]), ("line", [(15, 7), (21, 7), (21, 13)])],
+    "bolt": [("fill", [(13, 2), (3, 14), (12, 14), (11, 22), (21, 10), (12, 10)])],
+    "arrow_up": [("fill", [(12, 4), (4, 12), (9, 12), (9, 20), (15, 20), (15, 12), (20, 12)])],
+    "arrow_down": [("fill", [(12, 20), (20, 12), (15, 12), (15, 4), (9, 4), (9, 12), (4, 12)])],
+}
+
+
+@lru_cache(maxsize=64)
+def load_font(weight: int, size: float) -> ImageFont.FreeTypeFont:
+    """Load the vendored Inter face closest to a CSS font-weight"""
+    nearest = min(FONT_FILES, key=lambda w: abs(w - weight))
+    return ImageFont.truetype(str(FONT_DIR / FONT_FILES[nearest]), max(1.0, size))
+
+
+def measure_text(text: str, size: float, weight: int = 400, tracking: float = 0) -> float:
+    """Advance width of a single line of text in CSS px"""
+    return load_font(weight, size).getlength(text) + tracking * max(0, len(text) - 1)
+
+
+def mix(color: str, background: str, alpha: float) -> str:
+    """Blend a colour over a background (e.g. Tailwind's bg-rose-500/20 on a dark panel)"""
+    fg = [int(color[i:i + 2], 16) for i in (1, 3, 5)]
+    bg = [int(background[i:i + 2], 16) for i in (1, 3, 5)]
+    return "#" + "".join(f"{round(f * alpha + b * (1 - alpha)):02X}" for f, b in zip(fg, bg))
+
+
+def html_to_text(value: Optional[str], svg_replacement: str = "") -> str:
+    """Flatten the HTML snippets in dashboard_data to plain text (inline SVG icons become svg_replacement)"""
+    if not value:
+        return ""
+    text = re.sub(r"<svg\b.*?</svg>", svg_replacement, str(value), flags=re.S)
+    text = re.sub(r"<[^>]+>", "", text)
+    return re.sub(r"\s+", " ", html.unescape(text)).strip()
+
+
+def fit_text(text: str, max_width: float, size: float, weight: int) -> str:
+    """Truncate text with an ellipsis so it fits max_width"""
+    if measure_text(text, size, weight) <= max_width:
+        return text
+    while text and measure_text(text + "…", size, weight) > max_width:
+        text = text[:-1]
+    return text.rstrip() + "…"
+
+
+def _text(ops: list, x: float, y: float, text: str, size: float, weight: int, fill: str,
+          anchor: str = "start", tracking: float = 0):
+    """Text with its baseline at y (anchor: start, middle or end)"""
+    ops.append({"op": "text", "x": x, "y": y, "text": text, "size": size, "weight": weight,
+                "fill": fill, "anchor": anchor, "tracking": tracking})
+
+
+def _rect(ops: list, x: float, y: float, w: float, h: float, fill: Optional[str], radius: float = 0,
+          stroke: Optional[str] = None, stroke_width: float = 1):
+    ops.append({"op": "rect", "x": x, "y": y, "w": w, "h": h, "radius": radius,
+                "fill": fill, "stroke": stroke, "stroke_width": stroke_width})
+
+
+def _gradient(ops: list, x: float, y: float, w: float, h: float, stops: List[Tuple[float, str]],
+              radius: float = 0, vertical: bool = False):
+    ops.append({"op": "gradient", "x": x, "y": y, "w": w, "h": h, "radius": radius,
+                "stops": stops, "vertical": vertical})
+
+
+def _circle(ops: list, cx: float, cy: float, r: float, fill: Optional[str],
+            stroke: Optional[str] = None, stroke_width: float = 1):
+    ops.append({"op": "circle", "cx": cx, "cy": cy, "r": r, "fill": fill,
+                "stroke": stroke, "stroke_width": stroke_width})
+
+
+def _icon(ops: list, name: str, x: float, y: float, size: float, color: str, stroke_width: float = 2):
+    """Place an ICONS entry with its 24x24 box at (x, y)"""
+    k = size / 24
+
+    def pt(p):
+        return (x + p[0] * k, y + p[1] * k)
+
+    for part in ICONS[name]:
+        kind = part[0]
+        if kind == "circle":
+            _circle(ops, *pt(part[1]), part[2] * k, None, stroke=color, stroke_width=stroke_width * k)
+        elif kind == "dot":
+            _circle(ops, *pt(part[1]), part[2] * k, color)
+        elif kind == "line":
+            ops.append({"op": "polyline", "points": [pt(p) for p in part[1]], "stroke": color,
+                        "width": stroke_width * k})
+        elif kind == "fill":
+            ops.append({"op": "polygon", "points": [pt(p) for p in part[1]], "fill": color})
+
+
+def _card(ops: list, x: float, y: float, w: float, h: float, title: str, icon: str, accent: str):
+    """Stat card shell: panel, tinted icon chip and uppercase title"""
+    _rect(ops, x, y, w, h, COLORS["panel"], radius=12, stroke=COLORS["border"])
+    _rect(ops, x + 16, y + 16, 26, 26, mix(accent, COLORS["panel"], 0.15), radius=6)
+    _icon(ops, icon, x + 21, y + 21, 16, accent)
+    _text(ops, x + 52, y + 35, title.upper(), 17, 600, COLORS["text_muted"], tracking=1.2)
+
+
+def headline_icon(headline: str) -> Tuple[str, str]:
+    """Icon and colour for the headline banner (same keyword rules as updateDashboard())"""
+    if any(word in headline for word in ("easing", "recovery", "improving")):
+        return "arrow_right", COLORS["emerald"]
+    if any(word in headline for word in ("strain", "pressure", "rising")):
+        return "warning", COLORS["rose"]
+    if any(word in headline for word in ("steady", "stable", "variance")):
+        return "check", "#C084FC"
+    if "Mixed" in headline:
+        return "swap", COLORS["amber"]
+    return "info", COLORS["cyan"]
+
+
+def hourly_trend_parts(hourly_trend: Optional[str]) -> Optional[Tuple[str, str]]:
+    """Split the hourlyTrend HTML into (text with arrow, colour)"""
+    if not hourly_trend:
+        return None
+    if "text-emerald" in hourly_trend:
+        return "↓ " + html_to_text(hourly_trend), COLORS["emerald"]
+    if "text-rose" in hourly_trend:
+        return "↑ " + html_to_text(hourly_trend), COLORS["rose"]
+    return "→ " + html_to_text(hourly_trend), COLORS["text_dim"]
+
+
+def build_dashboard_scene(data: dict, measure: Callable[..., float] = measure_text) -> dict:
+    """
+    Lay out the dashboard as drawing primitives
+
+    Args:
+        data: dashboard_data dict built by generate_dashboard_image() (same payload as updateDashboard())
+        measure: Text width function (text, size, weight, tracking) used for inline layout
+
+    Returns:
+        Dict with:
+        {
+            'width': int, 'height': int,   # CSS px
+            'background': {'stops': [(offset, colour), ...]},  # Vertical gradient
+            'ops': [dict, ...]             # rect, gradient, circle, polyline, polygon and text ops
+        }
+    """
+    ops = []
+    width = SCENE_WIDTH
+    right = width - PADDING
+
+    # --- Header ---
+    _text(ops, PADDING, 77, "Still Waiting NI", 58, 700, mix(COLORS["cyan"], COLORS["cyan_deep"], 0.6))
+    _text(ops, PADDING, 109, "A&E WAIT TIMES", 17, 600, COLORS["text_muted"], tracking=0.8)
+    _icon(ops, "clock", PADDING, 121, 14, COLORS["cyan"])
+    _text(ops, PADDING + 20, 133, f"Updated: {data.get('updateTime') or ''}", 13.5, 600,
+          COLORS["text_muted"], tracking=0.3)
+
+    fb_label = "FB.ME/NIERV"
+    fb_width = measure(fb_label, 17, 700, 1.2)
+    _text(ops, right, 36, fb_label, 17, 700, COLORS["text_muted"], anchor="end", tracking=1.2)
+    _circle(ops, right - fb_width - 20, 30, 10, COLORS["text_muted"])
+    _text(ops, right - fb_width - 17, 37, "f", 17, 700, COLORS["panel"], anchor="middle")
+    source_label = "Average over past 4 hours | Source: NI Direct"
+    _text(ops, right, 63, source_label, 16.5, 500, COLORS["text_muted"], anchor="end")
+    _icon(ops, "chart", right - measure(source_label, 16.5, 500) - 25, 50, 16, COLORS["cyan"])
+
+    # --- Headline banner with hourly trend ---
+    banner_y, banner_h = 157, 46
+    _gradient(ops, PADDING, banner_y, right - PADDING, banner_h,
+              [(0, mix("#1E293B", COLORS["page_top"], 0.5)), (1, mix("#0F172A", COLORS["page_top"], 0.5))],
+              radius=12)
+    _rect(ops, PADDING, banner_y, right - PADDING, banner_h, None, radius=12, stroke=mix("#334155", COLORS["page_top"], 0.5))
+    headline = data.get("headline") or "NI A&E Wait Times Update"
+    icon, icon_color = headline_icon(headline)
+    _icon(ops, icon, PADDING + 16, banner_y + 11, 24, icon_color, stroke_width=2.5)
+    trend = hourly_trend_parts(data.get("hourlyTrend"))
+    trend_width = measure(trend[0], 18, 600) + 24 if trend else 0
+    _text(ops, PADDING + 51, banner_y + 29, fit_text(headline, right - PADDING - 80 - trend_width, 16.5, 700),
+          16.5, 700, COLORS["text"])
+    if trend:
+        _text(ops, right - 16, banner_y + 30, trend[0], 18, 600, trend[1], anchor="end")
+
+    # --- Right column stat cards ---
+    top = banner_y + banner_h + 14
+    table_w = round((width - 2 * PADDING - COLUMN_GAP) * 1.2 / 2.2)
+    col_x = PADDING + table_w + COLUMN_GAP
+    col_w = right - col_x
+    y = top
+    y = _average_wait_card(ops, data, col_x, y, col_w, trend) + CARD_GAP
+    y = _trend_direction_card(ops, data, col_x, y, col_w) + CARD_GAP
+    y = _fastest_improvement_card(ops, data, col_x, y, col_w, measure) + CARD_GAP
+    y = _biggest_change_card(ops, data, col_x, y, col_w) + CARD_GAP
+    y = _pressure_card(ops, data, col_x, y, col_w, measure)
+    bottom = y
+
+    # --- Hospital table (stretches to the stat column) ---
+    _hospital_table(ops, data.get("hospitals") or [], PADDING, top, table_w, bottom - top, measure)
+
+    # --- Footer ---
+    footer_y = bottom + 18
+    _rect(ops, PADDING, footer_y, right - PADDING, 1, COLORS["border"])
+    powered, brand = "POWERED BY ", "NI EMERGENCY RESPONSE VIDS"
+    powered_w = measure(powered, 17, 600, 1.6) + 4
+    total_w = 28 + powered_w + measure(brand, 17, 700, 1.6)
+    x = (width - total_w) / 2
+    _icon(ops, "bolt", x, footer_y + 15, 18, COLORS["amber_base"])
+    _text(ops, x + 28, footer_y + 32, powered, 17, 600, COLORS["text_faint"], tracking=1.6)
+    _text(ops, x + 28 + powered_w, footer_y + 32, brand, 17, 700, COLORS["text_soft"], tracking=1.6)
+
+    return {
+        "width": width,
+        "height": round(footer_y + 56),
+        "background": {"stops": [(0, COLORS["page_top"]), (1, COLORS["page_bottom"])]},
+        "ops": ops
+    }
+
+
+def _average_wait_card(ops: list, data: dict, x: float, y: float, w: float, trend) -> float:
+    h = 186
+    _card(ops, x, y, w, h, "Average Wait", "clock", COLORS["cyan"])
+    _text(ops, x + 16, y + 86, html_to_text(data.get("avgWait")) or "N/A", 42, 700, COLORS["text"])
+    if trend:
+        _text(ops, x + 16, y + 113, trend[0], 18, 600, trend[1])
+
+    # Gauge: average as a share of the longest wait (updateAverageWaitGauge())
+    waits = [h["wait"] for h in data.get("hospitals") or [] if isinstance(h.get("wait"), (int, float))]
+    bar_y, bar_w = y + 130, w - 32
+    _rect(ops, x + 16, bar_y, bar_w, 8, COLORS["border"], radius=4)
+    if waits:
+        max_wait = max(waits)
+        percentage = round(sum(waits) / len(waits)) / max_wait * 100 if max_wait else 0
+        fill_w = max(8, bar_w * percentage / 100)
+        _gradient(ops, x + 16, bar_y, fill_w, 8,
+                  [(0, COLORS["emerald_base"]), (0.5, "#EAB308"), (0.8, "#F97316"), (1, COLORS["rose_base"])],
+                  radius=4)
+        _rect(ops, x + 16 + fill_w - 14, bar_y - 1, 14, 10, "#F1F5F9", radius=5)
+        _text(ops, x + 16, y + 166, f"{round(percentage)}% of max ({max_wait}m)", 16.5, 600, COLORS["text_soft"],
+              tracking=0.3)
+    _circle(ops, x + w - 16 - measure_text("Improving", 16.5, 600) - 9, y + 160, 4, COLORS["emerald"])
+    _text(ops, x + w - 16, y + 166, "Improving", 16.5, 600, COLORS["emerald"], anchor="end")
+    return y + h
+
+
+def _trend_direction_card(ops: list, data: dict, x: float, y: float, w: float) -> float:
+    h = 160
+    _card(ops, x, y, w, h, "Trend Direction", "trend", COLORS["blue"])
+    improving = int(data.get("improvingCount") or 0)
+    worsening = int(data.get("worseningCount") or 0)
+
+    box_w = (w - 32 - 12) / 2
+    for i, (count, label, color, base) in enumerate([
+        (improving, "IMPROVING", COLORS["emerald"], COLORS["emerald_base"]),
+        (worsening, "WORSENING", COLORS["rose"], COLORS["rose_base"]),
+    ]):
+        bx = x + 16 + i * (box_w + 12)
+        _rect(ops, bx, y + 55, box_w, 70, mix(base, COLORS["panel"], 0.1), radius=8,
+              stroke=mix(base, COLORS["panel"], 0.3))
+        _text(ops, bx + 11, y + 96, str(count), 38, 700, color)
+        _text(ops, bx + 11, y + 117, label, 15, 600, color, tracking=0.8)
+
+    total = improving + worsening
+    bar_w = w - 32
+    _rect(ops, x + 16, y + 137, bar_w, 5, COLORS["border"], radius=2.5)
+    if total:
+        improving_w = bar_w * improving / total
+        if improving:
+            _rect(ops, x + 16, y + 137, improving_w, 5, COLORS["emerald_base"], radius=2.5)
+        if worsening:
+            _rect(ops, x + 16 + improving_w, y + 137, bar_w - improving_w, 5, COLORS["rose_base"], radius=2.5)
+    return y + h
+
+
+def _fastest_improvement_card(ops: list, data: dict, x: float, y: float, w: float, measure) -> float:
+    h = 182
+    _card(ops, x, y, w, h, "Fastest Improvement", "arrow_right", COLORS["emerald"])
+    detail = data.get("fastestImprovementDetail")
+    if not detail:
+        _text(ops, x + 16, y + 76, html_to_text(data.get("fastestImprovement")) or "No previous data",
+              18, 600, COLORS["text_dim"])
+        return y + h
+
+    _text(ops, x + 16, y + 76, fit_text(detail["name"], w - 32, 22, 700), 22, 700, COLORS["emerald"], tracking=0.3)
+    box_w = (w - 32 - 76) / 2
+    before_x, after_x = x + 16, x + w - 16 - box_w
+    _text(ops, before_x, y + 108, "BEFORE", 15, 600, COLORS["text_soft"], tracking=0.8)
+    _text(ops, after_x, y + 108, "AFTER", 15, 600, COLORS["text_soft"], tracking=0.8)
+    _rect(ops, before_x, y + 120, box_w, 44, mix("#1E293B", COLORS["panel"], 0.6), radius=8)
+    _text(ops, before_x + box_w / 2, y + 150, f"{detail['before']}m", 23, 600, COLORS["text_soft"], anchor="middle")
+    _rect(ops, after_x, y + 120, box_w, 44, mix(COLORS["emerald_base"], COLORS["panel"], 0.1), radius=8,
+          stroke=mix(COLORS["emerald_base"], COLORS["panel"], 0.4))
+    _text(ops, after_x + box_w / 2, y + 150, f"{detail['after']}m", 23, 600, COLORS["emerald"], anchor="middle")
+
+    mid_x = x + w / 2
+    _circle(ops, mid_x, y + 126, 9, COLORS["emerald_base"])
+    _icon(ops, "arrow_up", mid_x - 6, y + 120, 12, COLORS["panel"])
+    diff = detail["diff"]
+    _text(ops, mid_x, y + 154, f"{'+' if diff > 0 else ''}{diff}m", 16, 600, COLORS["emerald"], anchor="middle")
+    return y + h
+
+
+def _biggest_change_card(ops: list, data: dict, x: float, y: float, w: float) -> float:
+    h = 292
+    _card(ops, x, y, w, h, "Biggest Change (24h)", "swap", COLORS["amber"])
+    changes = data.get("biggestChange24h") or {}
+    for i, (label, key, arrow, color, soft, base) in enumerate([
+        ("WORST JUMP", "increase", "↑", COLORS["rose"], COLORS["rose_soft"], COLORS["rose_base"]),
+        ("BEST DROP", "decrease", "↓", COLORS["emerald"], "#6EE7B7", COLORS["emerald_base"]),
+    ]):
+        by = y + 55 + i * 116
+        _rect(ops, x + 16, by, w - 32, 104, mix(base, COLORS["panel"], 0.1), radius=8,
+              stroke=mix(base, COLORS["panel"], 0.3))
+        _text(ops, x + 30, by + 27, label, 15, 600, soft, tracking=1)
+        _text(ops, x + w - 30, by + 27, arrow, 16, 600, soft, anchor="end")
+        value = html_to_text(changes.get(key), svg_replacement=f" {arrow} ") or "Insufficient data"
+        _text(ops, x + 30, by + 60, fit_text(value, w - 60, 22, 700), 22, 700, color, tracking=0.3)
+        _text(ops, x + 30, by + 86, "vs yesterday", 16.5, 400, COLORS["text_dim"])
+    return y + h
+
+
+def _pressure_card(ops: list, data: dict, x: float, y: float, w: float, measure) -> float:
+    h = 162
+    _card(ops, x, y, w, h, "Regional Pressure", "chart", COLORS["amber"])
+    match = re.search(r"(\d+)%", data.get("pressureIndex") or "")
+    percentage = int(match.group(1)) if match else 0
+
+    # Status badge (updateDashboard(): Low < 50% <= Moderate < 75% <= High)
+    if percentage < 50:
+        status, color, base = "LOW", COLORS["emerald"], COLORS["emerald_base"]
+    elif percentage < 75:
+        status, color, base = "MODERATE", COLORS["amber"], COLORS["amber_base"]
+    else:
+        status, color, base = "HIGH", COLORS["rose"], COLORS["rose_base"]
+    badge_w = measure(status, 13, 700) + 16
+    _rect(ops, x + w - 16 - badge_w, y + 20, badge_w, 20, mix(base, COLORS["panel"], 0.15), radius=5)
+    _text(ops, x + w - 24, y + 35, status, 13, 700, color, anchor="end")
+
+    value = f"{percentage}%"
+    _text(ops, x + 16, y + 88, value, 42, 700, COLORS["text"])
+    _text(ops, x + 16 + measure(value, 42, 700) + 14, y + 86, "hospitals > 2h", 19, 600, COLORS["text_soft"])
+
+    # Segmented zones: safe 0-50%, moderate 50-75%, critical 75-100%
+    seg_gap = 4
+    seg_w = (w - 32 - 2 * seg_gap) / 3
+    fills = [min(percentage, 50) / 50, max(0, min(percentage, 75) - 50) / 25, max(0, percentage - 75) / 25]
+    for i, (fill, zone_base) in enumerate(zip(fills, (COLORS["emerald_base"], COLORS["amber_base"], COLORS["rose_base"]))):
+        sx = x + 16 + i * (seg_w + seg_gap)
+        _rect(ops, sx, y + 104, seg_w, 9, mix(zone_base, COLORS["panel"], 0.2), radius=2)
+        if fill > 0:
+            _rect(ops, sx, y + 104, seg_w * fill, 9, mix(zone_base, COLORS["panel"], 0.85), radius=2)
+
+    for label, lx, anchor, zone_color in [
+        ("SAFE", x + 16, "start", COLORS["emerald"]),
+        ("MODERATE", x + w / 2, "middle", COLORS["amber"]),
+        ("CRITICAL", x + w - 16, "end", COLORS["rose"]),
+    ]:
+        label_w = measure(label, 13.5, 700, 0.5)
+        dot_x = {"start": lx + 3, "middle": lx - label_w / 2 - 4, "end": lx - label_w - 6}[anchor]
+        if anchor == "start":
+            lx += 10
+        _circle(ops, dot_x, y + 131, 2.5, zone_color)
+        _text(ops, lx, y + 136, label, 13.5, 700, zone_color, anchor=anchor, tracking=0.5)
+    return y + h
+
+
+def _hospital_table(ops: list, hospitals: List[dict], x: float, y: float, w: float, h: float, measure):
+    """Table panel: header, one row per hospital and the severity key"""
+    _rect(ops, x, y, w, h, COLORS["panel"], radius=12, stroke=COLORS["border"])
+    header_h = 36
+    _gradient(ops, x + 1, y + 1, w - 2, header_h, [(0, COLORS["header_from"]), (1, COLORS["header_to"])], radius=11)
+    # Square off the header's bottom corners
+    _gradient(ops, x + 1, y + header_h - 10, w - 2, 11, [(0, COLORS["header_from"]), (1, COLORS["header_to"])])
+
+    status_x, wait_x, name_x, trend_cx = x + 24, x + 137, x + 262, x + w - 53
+    for label, lx, anchor in [("STATUS", status_x, "start"), ("WAIT", wait_x, "start"),
+                              ("HOSPITAL", name_x, "start"), ("TREND", trend_cx, "middle")]:
+        _text(ops, lx, y + 24, label, 15, 600, COLORS["text_muted"], anchor=anchor, tracking=1)
+
+    key_h = 78
+    rows_top = y + header_h
+    rows_h = h - header_h - key_h
+    row_h = rows_h / max(1, len(hospitals))
+    for i, hospital in enumerate(hospitals):
+        ry = rows_top + i * row_h
+        cy = ry + row_h / 2
+        if i > 0:
+            _rect(ops, x + 1, ry, w - 2, 1, COLORS["border"])
+
+        wait = hospital.get("wait")
+        severity = hospital.get("severity") or "low"
+        dot, badge_text, badge_base = SEVERITY_COLORS.get(severity, SEVERITY_COLORS["low"])
+        _circle(ops, status_x + 7, cy, 10, mix(dot, COLORS["panel"], 0.25))  # Glow
+        _circle(ops, status_x + 7, cy, 7, dot)
+
+        wait_label = f"{wait}m" if wait is not None else "N/A"
+        badge_w = measure(wait_label, 19, 700) + 24
+        _rect(ops, wait_x, cy - 17, badge_w, 34, mix(badge_base, COLORS["panel"], 0.2), radius=6)
+        _text(ops, wait_x + 12, cy + 7, wait_label, 19, 700, badge_text)
+
+        name = fit_text(hospital.get("name", ""), trend_cx - 30 - name_x, 18.5, 600)
+        _text(ops, name_x, cy + 6.5, name, 18.5, 600, COLORS["text"])
+
+        if hospital.get("trend") == "up":
+            _icon(ops, "arrow_up", trend_cx - 11, cy - 11, 22, COLORS["rose"])
+        elif hospital.get("trend"):
+            _icon(ops, "arrow_down", trend_cx - 11, cy - 11, 22, COLORS["emerald"])
+
+    # Severity key gradient bar
+    key_y = y + h - key_h + 18
+    key_x, key_w = x + 24, w - 48
+    _gradient(ops, key_x, key_y, key_w, 40,
+              [(0, "#15803D"), (0.35, "#A16207"), (0.7, "#C2410C"), (1, "#BE123C")], radius=8)
+    for i, label in enumerate(["<60m", "60–119m", "120–239m", ">240m"]):
+        _text(ops, key_x + key_w * (i + 0.5) / 4, key_y + 26, label, 15, 600, "#FFFFFF", anchor="middle")
@@ -0,0 +1,90 @@
+"""
+Precompiled Dashboard Template
+Loads dashboard.html once, applies the static edits up front and fills the per-render slots by concatenation
+"""
+
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import Dict, Optional
+
+
+BODY_TAG = '<body class="bg-white p-8">'
+SCALE_CONTAINER = '<div class="max-w-6xl mx-auto bg-white rounded-2xl shadow-lg overflow-visible relative"'
+LOGO_DECLARATION = "const logoPath = 'NIERV Logo.jpg';"
+
+# Loads the injected data once the page is parsed (standalone debug copies)
+DATA_SCRIPT = """    <script>
+        // Inject dashboard data and call updateDashboard() on load
+        window.addEventListener('DOMContentLoaded', function() {{
+            if (typeof updateDashboard === 'function') {{
+                updateDashboard({data});
+            }} else {{
+                console.error('updateDashboard() function not found');
+            }}
+        }});
+    </script>
+"""
+
+
+def image_data_url(path: Path) -> str:
+    """Read an image file as a base64 data URL"""
+    mime_type = "image/jpeg" if path.suffix.lower() in (".jpg", ".jpeg") else "image/png"
+    return f"data:{mime_type};base64,{base64.b64encode(path.read_bytes()).decode('ascii')}"
+
+
+class DashboardTemplate:
+    """dashboard.html compiled once: text scaling and the logo are baked in, the theme and data are slots"""
+
+    def __init__(self, template_path: Path, text_scale: Optional[float] = None, logo_path: Optional[str] = None):
+        """
+        Args:
+            template_path: dashboard.html
+            text_scale: Wrap the dashboard container in a scale() transform (None = no scaling)
+            logo_path: Image inlined as a data URL for the watermark (skipped if missing)
+        """
+        self.template_path = Path(template_path)
+        if not self.template_path.exists():
+            raise FileNotFoundError(f"Dashboard template not found: {self.template_path}")
+        source = self.template_path.read_text(encoding="utf-8")
+
+        if text_scale:
+            # Wrap the main dashboard container with scaling transform, closed before the closing body tag
+            source = source.replace(
+                SCALE_CONTAINER,
+                f'<div style="transform: scale({text_scale}); transform-origin: top left;">{SCALE_CONTAINER}'
+            )
+            source = source.replace('</div>\n</body>', '</div></div>\n</body>')
+
+        if logo_path and Path(logo_path).exists():
+            source = source.replace(LOGO_DECLARATION, f"const logoPath = '{image_data_url(Path(logo_path))}';")
+
+        # Split around the two slots: data script before </head>, theme attribute on <body>
+        self._head, _, rest = source.partition("</head>")
+        self._between, _, self._body = rest.partition(BODY_TAG)
+        self._compiled = {}  # {theme: (html, sha256 hex)}
+
+    def html(self, theme: Optional[str] = None) -> str:
+        """Template for the browser pool (the same string object per theme, so its hash is computed once)"""
+        return self._compile(theme)[0]
+
+    def key(self, theme: Optional[str] = None) -> str:
+        """Stable content hash of the compiled template (for cache keys)"""
+        return self._compile(theme)[1]
+
+    def _compile(self, theme: Optional[str]):
+        if theme not in self._compiled:
+            html = self._head + "</head>" + self._between + self._body_tag(theme) + self._body
+            self._compiled[theme] = (html, hashlib.sha256(html.encode("utf-8")).hexdigest())
+        return self._compiled[theme]
+
+    @staticmethod
+    def _body_tag(theme: Optional[str]) -> str:
+        return f'<body class="bg-white p-8" data-theme="{theme}">' if theme else BODY_TAG
+
+    def with_data(self, theme: Optional[str], dashboard_data: Dict) -> str:
+        """Standalone document that renders dashboard_data on load (for debugging outside the pool)"""
+        data = json.dumps(dashboard_data).replace("</", "<\\/")
+        return (self._head + DATA_SCRIPT.format(data=data) + "</head>" + self._between
+                + self._body_tag(theme) + self._body)
@@ -7,11 +7,14 @@ import csv
 import io
 import logging
 import traceback
+from pathlib import Path
 from datetime import datetime, timezone, timedelta
 from typing import List, Dict, Any, Optional, Tuple
 from bs4 import BeautifulSoup
 from collections import defaultdict
 
+from trend_cache_system import TREND_WINDOWS, HospitalTrendCache
+
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
@@ -21,6 +24,9 @@ CORS(app)
 
 NI_DIRECT_URL = "https://www.nidirect.gov.uk/articles/emergency-department-average-waiting-times"
 
+# Vector dashboard written by app_with_dashboard.py (DASHBOARD_RENDER_BACKEND = "svg")
+DASHBOARD_SVG_FILE = Path(__file__).parent / "dashboard_current.svg"
+
 THRESHOLDS = {
     "red": 240,
     "orange": 120,
@@ -36,6 +42,14 @@ alert_thresholds = {
 }
 active_alerts = []
 
+# The poller's trend cache and wait history (app_with_dashboard.py), opened read-only: every worker
+# sees the same per-window trends as the Telegram text and dashboard, without blocking the poller
+trend_cache = HospitalTrendCache(
+    cache_file=str(Path(__file__).parent / "hospital_wait_cache.json"),
+    history_file=str(Path(__file__).parent / "hospital_wait_history.bin"),
+    readonly=True
+)
+
 def parse_wait_to_minutes(text: str) -> Optional[int]:
     if not text:
         return None
@@ -267,6 +281,13 @@ def check_alerts(rows: List[Dict[str, Any]], stats: Dict[str, Any]):
 def index():
     return render_template('enhanced_dashboard.html')
 
+@app.route('/dashboard.svg')
+def dashboard_svg():
+    """Latest dashboard as a self-contained SVG (same render that was posted to Telegram)"""
+    if not DASHBOARD_SVG_FILE.exists():
+        return jsonify({'success': False, 'error': 'Dashboard SVG not generated yet'}), 404
+    return send_file(DASHBOARD_SVG_FILE, mimetype='image/svg+xml', max_age=60)
+
 @app.route('/api/wait-times')
 def get_wait_times():
     try:
@@ -322,33 +343,38 @@ def get_historical():
 
 @app.route('/api/trends')
 def get_trends():
-    """Calculate trends from historical data"""
+    """Trends of the latest fetch over each comparison window (?windows=1h,24h - default all)"""
     if len(historical_data) < 2:
         return jsonify({
             'success': True,
             'trends': {},
+            'windows': {},
             'message': 'Insufficient data for trends'
         })
     
-    # Compare current vs 1 hour ago
-    current = historical_data[-1]
-    one_hour_ago = None
+    windows = request.args.get('windows', default=','.join(TREND_WINDOWS))
+    windows = [w for w in windows.split(',') if w in TREND_WINDOWS]
     
-    cutoff = datetime.now(timezone.utc) - timedelta(hours=1)
-    for d in reversed(historical_data[:-1]):
-        if datetime.fromisoformat(d["timestamp"]) <= cutoff:
-            one_hour_ago = d
-            break
+    current = historical_data[-1]
+    current_waits = {r['hospital']: r['wait_mins'] for r in current['data'] if r['wait_mins'] is not None}
+    now = datetime.fromisoformat(current["timestamp"]).timestamp()
+    trend_cache.refresh()
+    trend_windows = trend_cache.calculate_windows(current_waits, windows=sorted(set(windows) | {'1h'}), now=now)
     
-    if not one_hour_ago:
-        one_hour_ago = historical_data[0]
+    # Compare current vs 1 hour ago
+    hourly = trend_windows['1h']
+    one_hour_ago = next(
+        (d for d in reversed(historical_data[:-1]) if datetime.fromisoformat(d["timestamp"]).timestamp() <= now - 3600),
+        historical_data[0]
+    )
     
     trends = {
         'average_wait': {
-            'current': current['stats']['average_wait'],
-            'previous': one_hour_ago['stats']['average_wait'],
-            'change': current['stats']['average_wait'] - one_hour_ago['stats']['average_wait'],
-            'direction': 'up' if current['stats']['average_wait'] > one_hour_ago['stats']['average_wait'] else 'down'
+            'current': hourly['avg_current'],
+            'previous': hourly['avg_previous'],
+            'change': hourly['avg_change'],
+            'change_pct': hourly['avg_change_pct'],
+            'direction': 'up' if (hourly['avg_change'] or 0) > 0 else 'down'
         },
         'critical_count': {
             'current': current['stats']['critical'],
@@ -360,7 +386,8 @@ def get_trends():
     
     return jsonify({
         'success': True,
-        'trends': trends
+        'trends': trends,
+        'windows': {window: trend_windows[window] for window in windows}
     })
 
 @app.route('/api/export/csv')
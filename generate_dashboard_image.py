@@ -6,18 +6,24 @@ Uses Playwright to render the HTML dashboard and capture a screenshot.
 import asyncio
 import json
 import base64
+from functools import lru_cache
 from datetime import datetime, timezone
 from pathlib import Path
 from typing import List, Dict, Any, Optional
-from playwright.async_api import async_playwright
+
+from browser_pool_system import DashboardBrowserPool
+from asset_bundle_system import AssetBundle
+from variant_matrix_system import DashboardVariantMatrix
+from dashboard_template_system import DashboardTemplate
 
 
 # Logo path
 LOGO_PATH = r"C:\Users\m0luc\OneDrive\Documents\Desktop\hospital wait\NIERV Logo.jpg"
 
 
+@lru_cache(maxsize=4)
 def logo_to_base64(logo_path: str) -> str:
-    """Convert logo image to base64 data URL for embedding in HTML."""
+    """Convert logo image to base64 data URL for embedding in HTML (read once per path)."""
     try:
         with open(logo_path, "rb") as f:
             logo_data = f.read()
@@ -33,6 +39,18 @@ def logo_to_base64(logo_path: str) -> str:
 # Historical data file for trend tracking
 TREND_DATA_FILE = "hospital_wait_trends.jsonl"
 
+# Shared browser pool: the 16:9 and 1:1 variants each keep a warm page in one Chromium
+browser_pool = DashboardBrowserPool(asset_bundle=AssetBundle())
+
+# Default post variants: 16:9 and 1:1, light theme, 2x for higher quality rendering
+DEFAULT_VARIANTS = DashboardVariantMatrix.expand(["landscape", "square"], ["light"], [2])
+
+
+# Template compiled once with the logo inlined (so it isn't re-encoded and sent with every render)
+dashboard_template = DashboardTemplate(Path(__file__).parent / "dashboard.html", logo_path=LOGO_PATH)
+
+variant_matrix = DashboardVariantMatrix(browser_pool, dashboard_template.html)
+
 
 def get_severity_emoji(minutes: Optional[int]) -> str:
     """Return severity emoji based on wait time."""
@@ -236,6 +254,7 @@ def prepare_dashboard_data(rows: List[Dict[str, Any]], last_updated: str, logo_p
     Args:
         rows: List of hospital data dicts with 'hospital', 'wait_mins', 'status' keys
         last_updated: Timestamp string for last update
+        logo_path: Logo to send with the data (LOGO_PATH is already inlined in the template)
     
     Returns:
         Dictionary with formatted data for the dashboard
@@ -289,8 +308,8 @@ def prepare_dashboard_data(rows: List[Dict[str, Any]], last_updated: str, logo_p
             "trend": trend
         })
     
-    # Convert logo to base64 for embedding
-    logo_data_url = logo_to_base64(logo_path) if Path(logo_path).exists() else ""
+    # Convert logo to base64 for embedding (the default logo is compiled into the template)
+    logo_data_url = logo_to_base64(logo_path) if logo_path != LOGO_PATH and Path(logo_path).exists() else ""
     
     return {
         "updateTime": last_updated,
@@ -323,43 +342,53 @@ async def generate_dashboard_image(
     # Prepare data
     data = prepare_dashboard_data(rows, last_updated)
     
-    # Read the HTML template
-    html_path = Path(__file__).parent / "dashboard.html"
-    with open(html_path, "r", encoding="utf-8") as f:
-        html_content = f.read()
-    
-    # Inject data into HTML
-    data_json = json.dumps(data, ensure_ascii=False)
-    inject_script = f"""
-    <script>
-        const dashboardData = {data_json};
-        updateDashboard(dashboardData);
-    </script>
-    """
-    html_content = html_content.replace("</body>", f"{inject_script}</body>")
-    
-    # Launch Playwright
-    async with async_playwright() as p:
-        browser = await p.chromium.launch()
-        page = await browser.new_page(
-            viewport={"width": width, "height": height},
-            device_scale_factor=2  # Higher quality rendering
-        )
-        
-        # Set content and wait for rendering
-        await page.set_content(html_content, wait_until="networkidle")
-        
-        # Wait a bit for fonts and rendering
-        await asyncio.sleep(1)
-        
+    # Precompiled template (light theme)
+    html_content = dashboard_template.html("light")
+    
+    async def capture(page):
         # Take screenshot
         await page.screenshot(path=output_path, full_page=False)
-        
-        await browser.close()
+    
+    # Render on the warm page for this size; data is pushed in via updateDashboard()
+    variant = {"width": width, "height": height, "scale": 2}  # Higher quality rendering
+    await browser_pool.render(variant, html_content, data, capture)
     
     print(f"Dashboard image saved to: {output_path}")
 
 
+async def generate_dashboard_variants(
+    rows: List[Dict[str, Any]],
+    last_updated: str,
+    variants: List[Dict[str, Any]] = None,
+    output_prefix: str = "hospital_wait_dashboard"
+) -> Dict[str, str]:
+    """
+    Render several dashboard variants concurrently and save them as PNGs.
+    
+    Args:
+        rows: List of hospital data dicts
+        last_updated: Timestamp string
+        variants: Dicts with 'aspect' ('landscape', 'square', 'portrait'), 'theme' and 'scale'
+                  (default DEFAULT_VARIANTS)
+        output_prefix: Files are saved as <output_prefix>_<variant name>.png
+    
+    Returns:
+        Dict mapping variant name to saved path
+    """
+    # Prepare data once for every variant (also records the trend snapshot once)
+    data = prepare_dashboard_data(rows, last_updated)
+    result = await variant_matrix.render(data, variants or DEFAULT_VARIANTS)
+    
+    paths = {}
+    for name, image in result["images"].items():
+        output_path = f"{output_prefix}_{name}.png"
+        Path(output_path).write_bytes(image["bytes"])
+        paths[name] = output_path
+        print(f"Dashboard image saved to: {output_path} ({image['width']}x{image['height']})")
+    print(f"Rendered {len(paths)} variants in {result['total_ms']:.0f}ms")
+    return paths
+
+
 async def generate_square_dashboard_image(
     rows: List[Dict[str, Any]],
     last_updated: str,
@@ -388,11 +417,11 @@ async def main():
     
     timestamp = datetime.now(timezone.utc).astimezone().strftime("%I:%M %p, %a %d %b %Y")
     
-    # Generate 16:9 image (for Facebook landscape posts)
-    await generate_dashboard_image(sample_rows, timestamp)
+    # Generate 16:9 (Facebook landscape posts) and 1:1 (Instagram/Facebook square posts) concurrently
+    await generate_dashboard_variants(sample_rows, timestamp)
     
-    # Generate 1:1 image (for Instagram/Facebook square posts)
-    await generate_square_dashboard_image(sample_rows, timestamp)
+    print(f"Render latency: {browser_pool.stats()}")
+    await browser_pool.close()
 
 
 if __name__ == "__main__":
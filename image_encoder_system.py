@@ -0,0 +1,202 @@
+"""
+Dashboard Image Encoder
+Encodes captured pixels per destination format in a thread pool, searching quality against a byte budget and PSNR floor
+"""
+
+import asyncio
+import io
+import math
+import time
+from collections import defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from PIL import Image, ImageChops, ImageStat, features
+
+
+AVIF_AVAILABLE = features.check("avif")
+WEBP_AVAILABLE = features.check("webp")
+
+# Pillow save() arguments per format at a given quality
+ENCODER_OPTIONS: Dict[str, Callable[[int], dict]] = {
+    "jpeg": lambda quality: {"format": "JPEG", "quality": quality, "optimize": True, "progressive": True},
+    "webp": lambda quality: {"format": "WEBP", "quality": quality, "method": 4},
+    "avif": lambda quality: {"format": "AVIF", "quality": quality, "speed": 6},
+    "png": lambda quality: {"format": "PNG", "optimize": True},
+}
+
+FORMAT_EXTENSIONS = {"jpeg": "jpg", "webp": "webp", "avif": "avif", "png": "png"}
+
+
+def psnr(reference: Image.Image, candidate: Image.Image) -> float:
+    """Peak signal-to-noise ratio of candidate against reference in dB (inf if identical)"""
+    stat = ImageStat.Stat(ImageChops.difference(reference, candidate))
+    mse = sum(stat.sum2) / (reference.size[0] * reference.size[1] * len(stat.sum2))
+    return math.inf if mse == 0 else 10 * math.log10(255 ** 2 / mse)
+
+
+def format_available(image_format: str) -> bool:
+    """Whether this Pillow build can encode the format"""
+    return {"avif": AVIF_AVAILABLE, "webp": WEBP_AVAILABLE}.get(image_format, image_format in ENCODER_OPTIONS)
+
+
+class ImageEncoder:
+    """Encodes images to a format, byte budget and quality floor on a shared thread pool
+
+    Quality is found by binary search: the highest quality that fits max_bytes, raised again
+    if that falls below the min_psnr floor (the floor wins over the budget).
+    """
+
+    def __init__(self, max_workers: int = 2, latency_window: int = 100):
+        """
+        Args:
+            max_workers: Encoder threads (Pillow releases the GIL while encoding)
+            latency_window: Number of encodes kept per format for stats()
+        """
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="encoder")
+        self.samples = defaultdict(lambda: deque(maxlen=latency_window))  # {format: deque of (ms, bytes)}
+
+    def encode(self, image: Image.Image, image_format: str, max_bytes: Optional[int] = None, quality: int = 90,
+               min_quality: int = 75, min_psnr: Optional[float] = None) -> Dict[str, Any]:
+        """
+        Encode an image, searching quality between min_quality and quality
+
+        Args:
+            image: Pixels to encode
+            image_format: 'jpeg' (progressive), 'webp', 'avif' or 'png' (lossless, no search)
+            max_bytes: Byte budget (None = encode at `quality`)
+            quality: Highest quality to try
+            min_quality: Lowest quality the budget may push down to
+            min_psnr: Perceptual floor in dB (None = budget only)
+
+        Returns:
+            Dict with:
+            {
+                'bytes': bytes,
+                'format': str,
+                'quality': int or None,     # None for PNG
+                'psnr': float or None,      # Measured when min_psnr is set and the budget lowered quality
+                'within_budget': bool,
+                'attempts': int,            # Encodes tried
+                'encode_ms': float
+            }
+        """
+        if not format_available(image_format):
+            raise ValueError(f"Pillow can't encode {image_format} here")
+        start = time.perf_counter()
+        if image_format == "png":
+            data = self._save(image, "png", None)
+            return self._result(image_format, data, None, None, max_bytes, 1, start)
+
+        if image.mode != "RGB":
+            image = image.convert("RGB")
+        attempts = {}
+
+        def attempt(q: int) -> bytes:
+            if q not in attempts:
+                attempts[q] = self._save(image, image_format, q)
+            return attempts[q]
+
+        def fits(q: int) -> bool:
+            return max_bytes is None or len(attempt(q)) <= max_bytes
+
+        # Highest quality within the budget (size grows with quality)
+        chosen = quality
+        if not fits(quality):
+            low, high, chosen = min_quality, quality - 1, min_quality
+            while low <= high:
+                mid = (low + high) // 2
+                if fits(mid):
+                    chosen, low = mid, mid + 1
+                else:
+                    high = mid - 1
+
+        measured = None
+        if min_psnr is not None and chosen < quality:
+            # Only a budget-lowered quality can be raised back to the floor
+            scores = {}
+
+            def score(q: int) -> float:
+                if q not in scores:
+                    with Image.open(io.BytesIO(attempt(q))) as decoded:
+                        scores[q] = psnr(image, decoded.convert("RGB"))
+                return scores[q]
+
+            if score(chosen) < min_psnr:
+                # Lowest quality above the budget's pick that clears the floor
+                low, high, raised = chosen + 1, quality, quality
+                while low <= high:
+                    mid = (low + high) // 2
+                    if score(mid) >= min_psnr:
+                        raised, high = mid, mid - 1
+                    else:
+                        low = mid + 1
+                chosen = raised
+            measured = round(score(chosen), 2)
+
+        return self._result(image_format, attempt(chosen), chosen, measured, max_bytes, len(attempts), start)
+
+    async def encode_async(self, image: Image.Image, image_format: str, **budget) -> Dict[str, Any]:
+        """encode() on the encoder pool without blocking the event loop"""
+        return await self.run(lambda: self.encode(image, image_format, **budget))
+
+    async def run(self, fn: Callable[[], Any]) -> Any:
+        """Run a callable on the encoder pool"""
+        return await asyncio.get_running_loop().run_in_executor(self.executor, fn)
+
+    def encode_formats(self, image: Image.Image, formats: List[str], **budget) -> Dict[str, Dict[str, Any]]:
+        """Encode one image to several formats concurrently on the pool (skips formats Pillow lacks)"""
+        futures = {image_format: self.executor.submit(self.encode, image, image_format, **budget)
+                   for image_format in formats if format_available(image_format)}
+        return {image_format: future.result() for image_format, future in futures.items()}
+
+    @staticmethod
+    def _save(image: Image.Image, image_format: str, quality: Optional[int]) -> bytes:
+        buffer = io.BytesIO()
+        image.save(buffer, **ENCODER_OPTIONS[image_format](quality))
+        return buffer.getvalue()
+
+    def _result(self, image_format: str, data: bytes, quality: Optional[int], measured: Optional[float],
+                max_bytes: Optional[int], attempts: int, start: float) -> Dict[str, Any]:
+        encode_ms = (time.perf_counter() - start) * 1000
+        self.samples[image_format].append((encode_ms, len(data)))
+        return {
+            "bytes": data,
+            "format": image_format,
+            "quality": quality,
+            "psnr": measured,
+            "within_budget": max_bytes is None or len(data) <= max_bytes,
+            "attempts": attempts,
+            "encode_ms": round(encode_ms, 1)
+        }
+
+    def stats(self) -> dict:
+        """
+        Get encode time and size per format
+
+        Returns:
+            Dict of {format: {'count': int, 'avg_ms': float, 'last_ms': float, 'avg_bytes': int}}
+        """
+        return {
+            image_format: {
+                'count': len(samples),
+                'avg_ms': round(sum(ms for ms, _ in samples) / len(samples), 1),
+                'last_ms': round(samples[-1][0], 1),
+                'avg_bytes': round(sum(size for _, size in samples) / len(samples))
+            }
+            for image_format, samples in self.samples.items() if samples
+        }
+
+    def close(self):
+        self.executor.shutdown(wait=True)
+
+
+_default_encoder = None
+
+
+def default_encoder() -> ImageEncoder:
+    """Process-wide encoder shared by the renderers and output profiles"""
+    global _default_encoder
+    if _default_encoder is None:
+        _default_encoder = ImageEncoder()
+    return _default_encoder
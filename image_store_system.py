@@ -0,0 +1,225 @@
+"""
+Managed Dashboard Image Store
+Keeps generated dashboard images in one directory under a byte/count budget, evicting the least recently used
+"""
+
+import io
+import json
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+from PIL import Image
+
+from output_profile_system import DashboardOutputProfiles
+
+
+INDEX_FILE = "index.json"
+THUMBNAIL_DIR = "thumbs"
+
+
+class DashboardImageStore:
+    """Directory of dashboard images tracked by an index file
+
+    The store only touches files it wrote, so cleanup never depends on reconstructing a filename.
+    The index keeps the LRU order and sizes, so enforcing the budget never scans the directory.
+    With thumbnails enabled every image also gets a small JPEG copy that outlives the full image
+    (thumbnails have their own byte budget), so the archive keeps its history at a fraction of the size.
+    Safe to call from worker threads.
+    """
+
+    def __init__(self, store_dir: str, max_bytes: int = 200 * 1024 * 1024, max_files: int = 200,
+                 thumbnail_long_edge: Optional[int] = None, max_thumbnail_bytes: int = 20 * 1024 * 1024):
+        """
+        Args:
+            store_dir: Directory for the images (created if missing)
+            max_bytes: Byte budget for full-size images
+            max_files: Maximum number of full-size images
+            thumbnail_long_edge: Long edge of archive thumbnails in pixels (None = no thumbnails)
+            max_thumbnail_bytes: Byte budget for thumbnails
+        """
+        self.store_dir = Path(store_dir)
+        self.max_bytes = max_bytes
+        self.max_files = max_files
+        self.thumbnail_long_edge = thumbnail_long_edge
+        self.max_thumbnail_bytes = max_thumbnail_bytes
+        self._images = OrderedDict()  # {name: {"size": int, "created": float}}, LRU first
+        self._thumbnails = OrderedDict()  # {name: size}, LRU first
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.thumbnail_bytes = 0
+        self.evictions = 0
+
+        (self.store_dir / THUMBNAIL_DIR).mkdir(parents=True, exist_ok=True)
+        self._load_index()
+
+    def put(self, name: str, data: bytes) -> Path:
+        """
+        Store an image (replacing any image with the same name) and enforce the budget
+
+        Args:
+            name: File name inside the store, e.g. 'dashboard_4k_20251218_1846.jpg'
+            data: Encoded image bytes
+
+        Returns:
+            Path of the stored image
+        """
+        if Path(name).name != name or name == INDEX_FILE:
+            raise ValueError(f"Invalid image name: {name}")
+        thumbnail = self._thumbnail(data) if self.thumbnail_long_edge else None
+
+        with self._lock:
+            path = self.store_dir / name
+            replaced = self._images.pop(name, None)
+            if replaced is not None:
+                self.total_bytes -= replaced["size"]
+            self._write_atomic(path, data)
+            self._images[name] = {"size": len(data), "created": time.time()}
+            self.total_bytes += len(data)
+
+            if thumbnail is not None:
+                self._write_atomic(self._thumbnail_path(name), thumbnail)
+                self.thumbnail_bytes -= self._thumbnails.pop(name, 0)
+                self._thumbnails[name] = len(thumbnail)
+                self.thumbnail_bytes += len(thumbnail)
+
+            self._enforce_budget(keep=name)
+            self._save_index()
+        return path
+
+    def get(self, name: str) -> Optional[bytes]:
+        """Read a full-size image (marks it recently used), or None if it was evicted"""
+        with self._lock:
+            if name not in self._images:
+                return None
+            try:
+                data = (self.store_dir / name).read_bytes()
+            except FileNotFoundError:
+                self._forget_image(name)
+                self._save_index()
+                return None
+            self._images.move_to_end(name)
+            self._save_index()
+            return data
+
+    def get_thumbnail(self, name: str) -> Optional[bytes]:
+        """Read the thumbnail of an image (kept after the full image is evicted), or None"""
+        with self._lock:
+            if name not in self._thumbnails:
+                return None
+            try:
+                return self._thumbnail_path(name).read_bytes()
+            except FileNotFoundError:
+                self.thumbnail_bytes -= self._thumbnails.pop(name)
+                self._save_index()
+                return None
+
+    def names(self) -> list:
+        """Full-size image names, least recently used first"""
+        with self._lock:
+            return list(self._images)
+
+    def thumbnail_names(self) -> list:
+        """Names with a thumbnail, least recently used first"""
+        with self._lock:
+            return list(self._thumbnails)
+
+    def _thumbnail(self, data: bytes) -> Optional[bytes]:
+        """Downsampled JPEG copy of an encoded image"""
+        try:
+            with Image.open(io.BytesIO(data)) as image:
+                image = DashboardOutputProfiles.resize_to_long_edge(image.convert("RGB"), self.thumbnail_long_edge)
+        except (OSError, ValueError) as e:
+            print(f"[IMAGE STORE] Thumbnail skipped: {e}")
+            return None
+        buffer = io.BytesIO()
+        image.save(buffer, format="JPEG", quality=80, optimize=True)
+        return buffer.getvalue()
+
+    def _thumbnail_path(self, name: str) -> Path:
+        return self.store_dir / THUMBNAIL_DIR / f"{Path(name).stem}.jpg"
+
+    @staticmethod
+    def _write_atomic(path: Path, data: bytes):
+        tmp_path = path.with_name(path.name + ".tmp")
+        tmp_path.write_bytes(data)
+        tmp_path.replace(path)
+
+    def _forget_image(self, name: str):
+        """Delete a full-size image and drop it from the index (its thumbnail stays)"""
+        entry = self._images.pop(name, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry["size"]
+        try:
+            (self.store_dir / name).unlink()
+        except FileNotFoundError:
+            pass
+
+    def _enforce_budget(self, keep: str):
+        """Evict least recently used images (never `keep`) and thumbnails until within budget"""
+        while (self.total_bytes > self.max_bytes or len(self._images) > self.max_files) and len(self._images) > 1:
+            oldest = next(name for name in self._images if name != keep)
+            self._forget_image(oldest)
+            self.evictions += 1
+
+        while self.thumbnail_bytes > self.max_thumbnail_bytes and len(self._thumbnails) > 1:
+            name, size = self._thumbnails.popitem(last=False)
+            self.thumbnail_bytes -= size
+            try:
+                self._thumbnail_path(name).unlink()
+            except FileNotFoundError:
+                pass
+
+    def _save_index(self):
+        index = {
+            "images": [[name, entry] for name, entry in self._images.items()],
+            "thumbnails": [[name, size] for name, size in self._thumbnails.items()]
+        }
+        self._write_atomic(self.store_dir / INDEX_FILE, json.dumps(index).encode("utf-8"))
+
+    def _load_index(self):
+        """Load the index, or adopt the directory's images once (oldest first) if there is none"""
+        index_path = self.store_dir / INDEX_FILE
+        try:
+            index = json.loads(index_path.read_text(encoding="utf-8"))
+            images, thumbnails = index["images"], index["thumbnails"]
+        except FileNotFoundError:
+            files = sorted((path for path in self.store_dir.iterdir()
+                            if path.is_file() and path.suffix.lower() in (".jpg", ".jpeg", ".png", ".webp", ".avif")),
+                           key=lambda path: path.stat().st_mtime)
+            images = [[path.name, {"size": path.stat().st_size, "created": path.stat().st_mtime}] for path in files]
+            thumbnails = []
+        except (OSError, ValueError, KeyError) as e:
+            print(f"[IMAGE STORE] Index unreadable ({e}), starting empty - untracked files are left in place")
+            images, thumbnails = [], []
+
+        for name, entry in images:
+            self._images[name] = entry
+            self.total_bytes += entry["size"]
+        for name, size in thumbnails:
+            self._thumbnails[name] = size
+            self.thumbnail_bytes += size
+
+        with self._lock:
+            if self._images:
+                self._enforce_budget(keep=next(reversed(self._images)))
+            self._save_index()
+
+    def stats(self) -> dict:
+        """
+        Get store usage
+
+        Returns:
+            Dict with {'files': int, 'bytes': int, 'thumbnails': int, 'thumbnail_bytes': int, 'evictions': int}
+        """
+        with self._lock:
+            return {
+                'files': len(self._images),
+                'bytes': self.total_bytes,
+                'thumbnails': len(self._thumbnails),
+                'thumbnail_bytes': self.thumbnail_bytes,
+                'evictions': self.evictions
+            }
@@ -0,0 +1,192 @@
+"""
+Native Dashboard Renderer
+Draws the dashboard scene with Pillow - no browser, renders in well under a second
+"""
+
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+
+from PIL import Image, ImageDraw
+
+from dashboard_scene_system import build_dashboard_scene, load_font
+from output_profile_system import DashboardOutputProfiles
+
+
+TEXT_ANCHORS = {"start": "ls", "middle": "ms", "end": "rs"}
+
+
+def _hex_to_rgb(color: str) -> Tuple[int, int, int]:
+    return tuple(int(color[i:i + 2], 16) for i in (1, 3, 5))
+
+
+def gradient_image(width: int, height: int, stops: List[Tuple[float, str]], vertical: bool = False) -> Image.Image:
+    """Linear gradient through colour stops (offsets 0-1), horizontal unless vertical"""
+    length = max(1, height if vertical else width)
+    stops = [(offset, _hex_to_rgb(color)) for offset, color in stops]
+    pixels = []
+    for i in range(length):
+        t = i / (length - 1) if length > 1 else 0
+        for (o1, c1), (o2, c2) in zip(stops, stops[1:]):
+            if t <= o2 or (o2, c2) == stops[-1]:
+                k = 0 if o2 == o1 else min(1, max(0, (t - o1) / (o2 - o1)))
+                pixels.append(tuple(round(a + (b - a) * k) for a, b in zip(c1, c2)))
+                break
+    strip = Image.new("RGB", (1, length) if vertical else (length, 1))
+    strip.putdata(pixels)
+    return strip.resize((max(1, width), max(1, height)), Image.NEAREST)
+
+
+class NativeDashboardRenderer:
+    """Renders dashboard_data to an image with Pillow using the shared dashboard scene"""
+
+    def __init__(self, supersample: int = 2, latency_window: int = 100):
+        """
+        Args:
+            supersample: Draw at this multiple and box-downsample for anti-aliased shapes (1 = off)
+            latency_window: Number of render timings kept for stats()
+        """
+        self.supersample = max(1, supersample)
+        self.latency = deque(maxlen=latency_window)
+
+    def render(self, dashboard_data: dict, scale: Optional[float] = None, long_edge: Optional[int] = None) -> Image.Image:
+        """
+        Render the dashboard
+
+        Args:
+            dashboard_data: Same dict passed to updateDashboard() in dashboard.html
+            scale: Pixels per CSS px (like the browser's device scale factor)
+            long_edge: Alternatively, final size of the longest side in pixels
+
+        Returns:
+            RGB image
+        """
+        start = time.perf_counter()
+        scene = build_dashboard_scene(dashboard_data)
+        if long_edge is not None:
+            scale = long_edge / max(scene["width"], scene["height"])
+        scale = scale or 2
+
+        s = scale * self.supersample
+        width, height = round(scene["width"] * s), round(scene["height"] * s)
+        image = gradient_image(width, height, scene["background"]["stops"], vertical=True)
+        draw = ImageDraw.Draw(image)
+
+        for op in scene["ops"]:
+            self._draw_op(image, draw, op, s)
+
+        if self.supersample > 1:
+            image = image.reduce(self.supersample)
+        if long_edge is not None and max(image.size) != long_edge:
+            image = DashboardOutputProfiles.resize_to_long_edge(image, long_edge)
+
+        self.latency.append((time.perf_counter() - start) * 1000)
+        return image
+
+    def render_profile(self, dashboard_data: dict, profile: dict) -> Dict:
+        """
+        Render and encode for an output profile
+
+        Returns:
+            Same dict shape as DashboardOutputProfiles.capture() ('capture_ms' is the draw time)
+        """
+        start = time.perf_counter()
+        if profile["long_edge"] is None:
+            image = self.render(dashboard_data, scale=profile.get("scale", 2))
+        else:
+            image = self.render(dashboard_data, long_edge=profile["long_edge"])
+        render_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        data, quality = DashboardOutputProfiles.encode(image, profile)
+        encode_ms = (time.perf_counter() - start) * 1000
+
+        print(f"[NATIVE RENDER] {image.size[0]}x{image.size[1]}, {len(data) // 1024} KB"
+              f"{f' q{quality}' if quality else ''} | draw {render_ms:.0f}ms, encode {encode_ms:.0f}ms")
+        return {
+            "bytes": data,
+            "format": profile["format"],
+            "width": image.size[0],
+            "height": image.size[1],
+            "quality": quality,
+            "resized": False,
+            "capture_ms": round(render_ms, 1),
+            "encode_ms": round(encode_ms, 1)
+        }
+
+    def _draw_op(self, image: Image.Image, draw: ImageDraw.ImageDraw, op: dict, s: float):
+        """Draw one scene primitive at scale s"""
+        kind = op["op"]
+
+        if kind == "rect":
+            box = [op["x"] * s, op["y"] * s, (op["x"] + op["w"]) * s - 1, (op["y"] + op["h"]) * s - 1]
+            if box[2] < box[0] or box[3] < box[1]:
+                return
+            draw.rounded_rectangle(box, radius=op["radius"] * s, fill=op["fill"], outline=op["stroke"],
+                                   width=max(1, round(op["stroke_width"] * s)) if op["stroke"] else 0)
+
+        elif kind == "gradient":
+            x, y = round(op["x"] * s), round(op["y"] * s)
+            w, h = round(op["w"] * s), round(op["h"] * s)
+            if w <= 0 or h <= 0:
+                return
+            fill = gradient_image(w, h, op["stops"], op["vertical"])
+            mask = None
+            if op["radius"]:
+                mask = Image.new("L", (w, h), 0)
+                ImageDraw.Draw(mask).rounded_rectangle([0, 0, w - 1, h - 1], radius=op["radius"] * s, fill=255)
+            image.paste(fill, (x, y), mask)
+
+        elif kind == "circle":
+            r = op["r"] * s
+            box = [op["cx"] * s - r, op["cy"] * s - r, op["cx"] * s + r, op["cy"] * s + r]
+            draw.ellipse(box, fill=op["fill"], outline=op["stroke"],
+                         width=max(1, round(op["stroke_width"] * s)) if op["stroke"] else 0)
+
+        elif kind == "polyline":
+            points = [(px * s, py * s) for px, py in op["points"]]
+            width = max(1, round(op["width"] * s))
+            draw.line(points, fill=op["stroke"], width=width, joint="curve")
+            for px, py in (points[0], points[-1]):  # Round caps
+                draw.ellipse([px - width / 2, py - width / 2, px + width / 2, py + width / 2], fill=op["stroke"])
+
+        elif kind == "polygon":
+            draw.polygon([(px * s, py * s) for px, py in op["points"]], fill=op["fill"])
+
+        elif kind == "text":
+            self._draw_text(draw, op, s)
+
+    @staticmethod
+    def _draw_text(draw: ImageDraw.ImageDraw, op: dict, s: float):
+        font = load_font(op["weight"], op["size"] * s)
+        x, y = op["x"] * s, op["y"] * s
+        tracking = op["tracking"] * s
+
+        if not tracking:
+            draw.text((x, y), op["text"], font=font, fill=op["fill"], anchor=TEXT_ANCHORS[op["anchor"]])
+            return
+
+        # Letter-spacing: place glyphs one by one
+        total = font.getlength(op["text"]) + tracking * (len(op["text"]) - 1)
+        if op["anchor"] == "middle":
+            x -= total / 2
+        elif op["anchor"] == "end":
+            x -= total
+        for char in op["text"]:
+            draw.text((x, y), char, font=font, fill=op["fill"], anchor="ls")
+            x += font.getlength(char) + tracking
+
+    def stats(self) -> dict:
+        """
+        Get render timing statistics
+
+        Returns:
+            Dict with {'count': int, 'avg_ms': float, 'last_ms': float} or None if nothing rendered
+        """
+        if not self.latency:
+            return None
+        return {
+            'count': len(self.latency),
+            'avg_ms': round(sum(self.latency) / len(self.latency), 1),
+            'last_ms': round(self.latency[-1], 1)
+        }
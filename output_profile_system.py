@@ -0,0 +1,236 @@
+"""
+Output Profiles for Dashboard Images
+Picks the device scale and encoder settings that hit each destination's pixel size and byte budget
+"""
+
+import io
+import math
+import time
+from typing import Dict, Optional, Tuple
+
+from PIL import Image
+
+from image_encoder_system import default_encoder
+
+
+# Final image size and byte budget per destination.
+#   long_edge: Final pixels on the longest side (None = keep the native capture at `scale`)
+#   format: 'jpeg' (progressive), 'webp', 'avif' (if Pillow has it) or 'png'
+#   max_bytes: Encoder searches quality down until the image fits (None = no budget)
+#   quality/min_quality: Highest and lowest encoder quality
+#   min_psnr: Perceptual floor in dB - quality is raised back over the budget if it dips below (None = off)
+#   viewport: CSS layout viewport (None = caller's default; changes vw-based text sizes)
+OUTPUT_PROFILES = {
+    "telegram": {
+        # Telegram downscales photos to 2560px on the long edge - anything above that is thrown away
+        "long_edge": 2560,
+        "max_bytes": 1_000_000,
+        "format": "jpeg",
+        "quality": 90,
+        "min_quality": 75,
+        "min_psnr": 37,
+        "viewport": None,
+    },
+    "facebook": {
+        # Facebook serves feed photos at up to 2048px
+        "long_edge": 2048,
+        "max_bytes": 600_000,
+        "format": "jpeg",
+        "quality": 88,
+        "min_quality": 75,
+        "min_psnr": 37,
+        "viewport": None,
+    },
+    "web": {
+        # Browsers: WebP is about half the JPEG size at the same PSNR ('avif' is smaller again but ~20x slower)
+        "long_edge": 1600,
+        "max_bytes": 250_000,
+        "format": "webp",
+        "quality": 85,
+        "min_quality": 60,
+        "min_psnr": 37,
+        "viewport": None,
+    },
+    "archive": {
+        # Previous behaviour: 2x device scale, JPEG q95
+        "long_edge": None,
+        "scale": 2,
+        "max_bytes": None,
+        "format": "jpeg",
+        "quality": 95,
+        "min_quality": 95,
+        "min_psnr": None,
+        "viewport": None,
+    },
+}
+
+# Accept a capture this close below the target instead of resampling it
+LONG_EDGE_TOLERANCE = 0.01
+
+
+class DashboardOutputProfiles:
+    """Maps output profiles to render variants and encodes captures to each profile's budget"""
+
+    def __init__(self, profiles: Dict[str, dict] = None, fallback_scale: float = 2):
+        """
+        Args:
+            profiles: Profile definitions (defaults to OUTPUT_PROFILES)
+            fallback_scale: Device scale for the first render, before the element has been measured
+        """
+        self.profiles = profiles or OUTPUT_PROFILES
+        self.fallback_scale = fallback_scale
+        self._element_boxes = {}  # {(profile_name, template_key): (css_width, css_height)}
+
+    def get(self, profile_name: str) -> dict:
+        """Look up a profile by name"""
+        if profile_name not in self.profiles:
+            raise ValueError(f"Unknown output profile: {profile_name} (expected one of {', '.join(self.profiles)})")
+        return self.profiles[profile_name]
+
+    def variant(self, profile_name: str, template_key: int, viewport: dict) -> dict:
+        """
+        Build the browser pool variant for a profile
+
+        Args:
+            profile_name: Key into the profiles
+            template_key: Identifies the template layout (e.g. hash of the HTML)
+            viewport: Default {'width', 'height'} used when the profile doesn't set one
+
+        Returns:
+            Dict with 'width', 'height' and 'scale' for DashboardBrowserPool.render()
+        """
+        profile = self.get(profile_name)
+        viewport = profile.get("viewport") or viewport
+        return {
+            "width": viewport["width"],
+            "height": viewport["height"],
+            "scale": self._device_scale(profile_name, profile, template_key)
+        }
+
+    def _device_scale(self, profile_name: str, profile: dict, template_key: int) -> float:
+        """Device scale that rasterises the element at (just under) the profile's long edge"""
+        if profile["long_edge"] is None:
+            return profile.get("scale", self.fallback_scale)
+
+        box = self._element_boxes.get((profile_name, template_key))
+        if box is None:
+            return self.fallback_scale  # Unmeasured - over-render once and downscale
+
+        # Round down so the capture never exceeds the target (which would force a resample)
+        return math.floor(profile["long_edge"] / max(box) * 1000) / 1000
+
+    async def capture(self, page, profile_name: str, template_key: int, selector: str = '.max-w-6xl') -> dict:
+        """
+        Screenshot the dashboard element and encode it for a profile
+
+        Args:
+            page: Playwright page with the dashboard rendered
+            profile_name: Key into the profiles
+            template_key: Same key passed to variant()
+            selector: Element to capture (falls back to the viewport if missing)
+
+        Returns:
+            Dict with:
+            {
+                'bytes': bytes,
+                'format': 'jpeg', 'webp', 'avif' or 'png',
+                'width': int, 'height': int,
+                'quality': int or None,
+                'psnr': float or None,  # Measured when the budget pushed quality below the profile's
+                'resized': bool,        # True if Pillow had to downscale the capture
+                'capture_ms': float,
+                'encode_ms': float
+            }
+        """
+        profile = self.get(profile_name)
+        target = profile["long_edge"]
+
+        element = await page.query_selector(selector)
+        target_handle = element or page
+        box = await element.bounding_box() if element else None
+        scale = await page.evaluate("window.devicePixelRatio")
+
+        if box is not None:
+            self._element_boxes[(profile_name, template_key)] = (box["width"], box["height"])
+            native_long_edge = round(max(box["width"], box["height"]) * scale)
+        else:
+            native_long_edge = None
+
+        needs_resize = (target is not None and native_long_edge is not None
+                        and not target * (1 - LONG_EDGE_TOLERANCE) <= native_long_edge <= target)
+
+        # One lossless capture: the pixels are resized and encoded off the event loop on the encoder pool
+        start = time.perf_counter()
+        raw = await target_handle.screenshot(type='png')
+        capture_ms = (time.perf_counter() - start) * 1000
+
+        def encode_capture():
+            with Image.open(io.BytesIO(raw)) as image:
+                image = image.convert("RGB")
+                if needs_resize:
+                    image = self.resize_to_long_edge(image, target)
+                return self.encode_image(image, profile), image.size
+
+        start = time.perf_counter()
+        encoded, (width, height) = await default_encoder().run(encode_capture)
+        data, quality = encoded["bytes"], encoded["quality"]
+        encode_ms = (time.perf_counter() - start) * 1000
+
+        psnr_note = f" {encoded['psnr']}dB" if encoded["psnr"] else ""
+        print(f"[OUTPUT PROFILE] {profile_name}: {width}x{height} @ {scale}x, "
+              f"{len(data) // 1024} KB {profile['format']}{f' q{quality}' if quality else ''}{psnr_note}"
+              f"{' (resized)' if needs_resize else ''} | capture {capture_ms:.0f}ms, encode {encode_ms:.0f}ms")
+
+        return {
+            "bytes": data,
+            "format": profile["format"],
+            "width": width,
+            "height": height,
+            "quality": quality,
+            "psnr": encoded["psnr"],
+            "resized": needs_resize,
+            "capture_ms": round(capture_ms, 1),
+            "encode_ms": round(encode_ms, 1)
+        }
+
+    @staticmethod
+    def resize_to_long_edge(image: Image.Image, long_edge: int) -> Image.Image:
+        """Downscale so the longest side equals long_edge (never upscales)"""
+        width, height = image.size
+        factor = long_edge / max(width, height)
+        if factor >= 1:
+            return image
+        return image.resize((round(width * factor), round(height * factor)), Image.LANCZOS)
+
+    @staticmethod
+    def encode_image(image: Image.Image, profile: dict, start_quality: Optional[int] = None) -> Dict:
+        """
+        Encode an image for a profile on the calling thread (see ImageEncoder.encode())
+
+        Args:
+            image: Pixels at the final size
+            profile: Output profile dict
+            start_quality: Highest quality to search from (defaults to the profile's quality)
+
+        Returns:
+            ImageEncoder.encode() result ({'bytes', 'format', 'quality', 'psnr', 'within_budget', ...})
+        """
+        return default_encoder().encode(
+            image,
+            profile["format"],
+            max_bytes=profile["max_bytes"],
+            quality=start_quality if start_quality is not None else profile["quality"],
+            min_quality=profile["min_quality"],
+            min_psnr=profile.get("min_psnr")
+        )
+
+    @staticmethod
+    def encode(image: Image.Image, profile: dict, start_quality: Optional[int] = None) -> Tuple[bytes, Optional[int]]:
+        """
+        Encode an image with the profile's format, searching quality to fit max_bytes
+
+        Returns:
+            Tuple of (encoded_bytes, quality or None for PNG)
+        """
+        result = DashboardOutputProfiles.encode_image(image, profile, start_quality)
+        return result["bytes"], result["quality"]
@@ -0,0 +1,173 @@
+"""
+Content-Addressed Render Cache
+Reuses encoded dashboard images when the dashboard data and render settings are unchanged
+"""
+
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+
+class DashboardRenderCache:
+    """LRU cache of encoded dashboard images keyed by a hash of the data and render profile
+
+    Kept in memory by default, or on disk (survives restarts) when cache_dir is set. Either way
+    the least recently used images are evicted once the stored bytes exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes: int = 64 * 1024 * 1024, cache_dir: Optional[str] = None):
+        """
+        Args:
+            max_bytes: Byte budget for cached images (image bytes plus any SVG text)
+            cache_dir: Directory for an on-disk cache (None = memory only)
+        """
+        self.max_bytes = max_bytes
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self._entries = OrderedDict()  # {key: {"image": dict or None, "size": int}} (None = on disk), LRU first
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            self._load_index()
+
+    @staticmethod
+    def key(dashboard_data: dict, profile: dict, render_settings: Optional[dict] = None) -> str:
+        """
+        Hash the canonical JSON of everything that affects the rendered pixels
+
+        Args:
+            dashboard_data: Data passed to updateDashboard() (theme included)
+            profile: Output profile dict (size, format, quality, byte budget)
+            render_settings: Anything else that changes the image (backend, template hash, scaling)
+
+        Returns:
+            Hex sha256 digest
+        """
+        canonical = json.dumps(
+            {"data": dashboard_data, "profile": profile, "render": render_settings or {}},
+            sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """Return the cached image dict (marked 'cached': True) or None on a miss"""
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+            return None
+
+        image = entry["image"]
+        if image is None:
+            image = self._read(key)
+            if image is None:  # Deleted or corrupt on disk
+                self._drop(key)
+                self.misses += 1
+                return None
+            os.utime(self._meta_path(key))  # Keep the LRU order across restarts
+
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return {**image, "cached": True}
+
+    def put(self, key: str, image: Dict[str, Any]) -> None:
+        """Store an encoded image dict (needs 'bytes'; other JSON-serialisable fields are kept)"""
+        image = {k: v for k, v in image.items() if k != "cached"}
+        size = len(image["bytes"]) + len(image.get("svg") or "")
+        if size > self.max_bytes:
+            return
+
+        if key in self._entries:
+            self._drop(key)
+        if self.cache_dir is not None:
+            self._write(key, image)
+            self._entries[key] = {"image": None, "size": size}
+        else:
+            self._entries[key] = {"image": image, "size": size}
+        self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes and len(self._entries) > 1:
+            oldest = next(iter(self._entries))
+            self._drop(oldest)
+            self.evictions += 1
+
+    def _drop(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is None:
+            return
+        self.total_bytes -= entry["size"]
+        if self.cache_dir is not None:
+            for path in (self._meta_path(key), self._image_path(key)):
+                try:
+                    path.unlink()
+                except FileNotFoundError:
+                    pass
+
+    def _meta_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.json"
+
+    def _image_path(self, key: str) -> Path:
+        return self.cache_dir / f"{key}.bin"
+
+    def _write(self, key: str, image: Dict[str, Any]):
+        """Write image bytes then metadata (the metadata file marks a complete entry)"""
+        meta = {k: v for k, v in image.items() if k != "bytes"}
+        meta["size"] = len(image["bytes"]) + len(image.get("svg") or "")
+        self._image_path(key).write_bytes(image["bytes"])
+        tmp_path = self._meta_path(key).with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(meta), encoding="utf-8")
+        tmp_path.replace(self._meta_path(key))
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        try:
+            meta = json.loads(self._meta_path(key).read_text(encoding="utf-8"))
+            meta.pop("size", None)
+            return {**meta, "bytes": self._image_path(key).read_bytes()}
+        except (OSError, ValueError):
+            return None
+
+    def _load_index(self):
+        """Rebuild the LRU order from metadata modification times"""
+        metas = sorted(self.cache_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        for meta_path in metas:
+            key = meta_path.stem
+            try:
+                size = json.loads(meta_path.read_text(encoding="utf-8"))["size"]
+            except (OSError, ValueError, KeyError):
+                continue
+            if not self._image_path(key).exists():
+                continue
+            self._entries[key] = {"image": None, "size": size}
+            self.total_bytes += size
+
+        while self.total_bytes > self.max_bytes and self._entries:
+            self._drop(next(iter(self._entries)))
+            self.evictions += 1
+
+    def stats(self) -> dict:
+        """
+        Get cache statistics
+
+        Returns:
+            Dict with:
+            {
+                'entries': int, 'bytes': int, 'max_bytes': int,
+                'hits': int, 'misses': int, 'evictions': int,
+                'hit_rate': float       # 0-1 (0 before any lookups)
+            }
+        """
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'bytes': self.total_bytes,
+            'max_bytes': self.max_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'evictions': self.evictions,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0
+        }
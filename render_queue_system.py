@@ -0,0 +1,510 @@
+"""
+Render Job Queue
+Hands dashboard renders to worker processes (see render_worker.py) through SQLite or a Redis-compatible server
+"""
+
+import asyncio
+import json
+import os
+import socket
+import sqlite3
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+try:
+    import redis
+    REDIS_AVAILABLE = True
+except ImportError:
+    REDIS_AVAILABLE = False
+
+
+# A running job is given back to the queue this long after its timeout (worker died or hung)
+REAP_GRACE_S = 10
+# Workers not seen for this long are left out of the utilisation stats
+WORKER_STALE_S = 30
+LATENCY_WINDOW = 100
+
+
+def _split_image(image: Dict[str, Any]):
+    """Image dict -> (bytes, JSON metadata with everything else)"""
+    return image["bytes"], json.dumps({k: v for k, v in image.items() if k != "bytes"})
+
+
+def _latency_summary(samples: List[float]) -> Optional[dict]:
+    if not samples:
+        return None
+    ordered = sorted(samples)
+    return {
+        'count': len(ordered),
+        'avg_ms': round(sum(ordered) / len(ordered), 1),
+        'p95_ms': round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1)
+    }
+
+
+class RenderQueue:
+    """Job queue interface shared by the backends
+
+    Jobs move queued -> running -> done/failed. Running jobs that outlive their timeout are
+    re-queued (up to max_attempts) by reap_expired(), which claim() runs before each claim.
+    """
+
+    max_attempts = 2
+
+    @staticmethod
+    def new_worker_id() -> str:
+        return f"{socket.gethostname()}:{os.getpid()}"
+
+    def enqueue(self, payload: Dict[str, Any], timeout_s: float = 60) -> str:
+        """Queue a render job and return its id"""
+        raise NotImplementedError
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        """Take the oldest queued job: {'id', 'payload', 'timeout_s', 'attempts'} or None"""
+        raise NotImplementedError
+
+    def complete(self, job_id: str, image: Dict[str, Any]) -> None:
+        raise NotImplementedError
+
+    def fail(self, job_id: str, error: str) -> None:
+        raise NotImplementedError
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """{'status', 'image' (done), 'error' (failed)} or None for an unknown job"""
+        raise NotImplementedError
+
+    def heartbeat(self, worker_id: str, busy_s: float = 0, job_done: bool = False) -> None:
+        """Record that a worker is alive, adding busy_s to its busy time"""
+        raise NotImplementedError
+
+    def reap_expired(self) -> int:
+        raise NotImplementedError
+
+    def stats(self) -> dict:
+        """
+        Get queue statistics
+
+        Returns:
+            Dict with:
+            {
+                'depth': int,             # Queued jobs
+                'running': int, 'done': int, 'failed': int,
+                'workers': {worker_id: {'jobs': int, 'utilisation': float}},  # busy time / uptime
+                'queue_wait': {'count', 'avg_ms', 'p95_ms'} or None,  # Enqueue -> claim
+                'latency': {'count', 'avg_ms', 'p95_ms'} or None      # Enqueue -> done
+            }
+        """
+        raise NotImplementedError
+
+    async def wait_for_result(self, job_id: str, timeout_s: float, poll_s: float = 0.1) -> Dict[str, Any]:
+        """
+        Wait for a job without blocking the event loop
+
+        Returns:
+            The rendered image dict
+
+        Raises:
+            TimeoutError if the job isn't finished in time, RuntimeError if it failed
+        """
+        deadline = time.monotonic() + timeout_s
+        while True:
+            result = await asyncio.to_thread(self.result, job_id)
+            if result is not None and result["status"] == "done":
+                return result["image"]
+            if result is not None and result["status"] == "failed":
+                raise RuntimeError(f"Render job {job_id} failed: {result['error']}")
+            if time.monotonic() >= deadline:
+                raise TimeoutError(f"Render job {job_id} not finished after {timeout_s}s")
+            await asyncio.sleep(poll_s)
+
+
+class SQLiteRenderQueue(RenderQueue):
+    """Queue in a local SQLite file (WAL mode), shared by processes on the same machine"""
+
+    def __init__(self, db_path: str = "render_queue.db", keep_finished: int = 200):
+        """
+        Args:
+            db_path: SQLite database file
+            keep_finished: Finished jobs kept for results/stats (older ones are pruned)
+        """
+        self.db_path = db_path
+        self.keep_finished = keep_finished
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS render_jobs (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    timeout_s REAL NOT NULL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    worker TEXT,
+                    enqueued_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    result BLOB,
+                    result_meta TEXT,
+                    error TEXT
+                );
+                CREATE INDEX IF NOT EXISTS idx_render_jobs_status ON render_jobs (status, id);
+                CREATE TABLE IF NOT EXISTS render_workers (
+                    id TEXT PRIMARY KEY,
+                    started_at REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    busy_s REAL NOT NULL DEFAULT 0,
+                    jobs INTEGER NOT NULL DEFAULT 0
+                );
+            """)
+
+    @contextmanager
+    def _connect(self):
+        """Short-lived autocommit connection per operation (safe across threads and processes)"""
+        conn = sqlite3.connect(self.db_path, timeout=30, isolation_level=None)
+        try:
+            yield conn
+        finally:
+            conn.close()
+
+    def enqueue(self, payload: Dict[str, Any], timeout_s: float = 60) -> str:
+        with self._connect() as conn:
+            cursor = conn.execute(
+                "INSERT INTO render_jobs (status, payload, timeout_s, enqueued_at) VALUES ('queued', ?, ?, ?)",
+                (json.dumps(payload), timeout_s, time.time())
+            )
+            return str(cursor.lastrowid)
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        self.reap_expired()
+        with self._connect() as conn:
+            row = conn.execute("""
+                UPDATE render_jobs SET status = 'running', worker = ?, started_at = ?, attempts = attempts + 1
+                WHERE id = (SELECT id FROM render_jobs WHERE status = 'queued' ORDER BY id LIMIT 1)
+                RETURNING id, payload, timeout_s, attempts
+            """, (worker_id, time.time())).fetchone()
+        if row is None:
+            return None
+        return {"id": str(row[0]), "payload": json.loads(row[1]), "timeout_s": row[2], "attempts": row[3]}
+
+    def complete(self, job_id: str, image: Dict[str, Any]) -> None:
+        data, meta = _split_image(image)
+        with self._connect() as conn:
+            conn.execute(
+                "UPDATE render_jobs SET status = 'done', finished_at = ?, result = ?, result_meta = ? WHERE id = ?",
+                (time.time(), data, meta, int(job_id))
+            )
+        self._prune()
+
+    def fail(self, job_id: str, error: str) -> None:
+        with self._connect() as conn:
+            conn.execute("UPDATE render_jobs SET status = 'failed', finished_at = ?, error = ? WHERE id = ?",
+                         (time.time(), error, int(job_id)))
+        self._prune()
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._connect() as conn:
+            row = conn.execute("SELECT status, result, result_meta, error FROM render_jobs WHERE id = ?",
+                               (int(job_id),)).fetchone()
+        if row is None:
+            return None
+        status, data, meta, error = row
+        image = {**json.loads(meta), "bytes": bytes(data)} if status == "done" else None
+        return {"status": status, "image": image, "error": error}
+
+    def heartbeat(self, worker_id: str, busy_s: float = 0, job_done: bool = False) -> None:
+        now = time.time()
+        with self._connect() as conn:
+            conn.execute("""
+                INSERT INTO render_workers (id, started_at, last_seen, busy_s, jobs) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT (id) DO UPDATE SET last_seen = excluded.last_seen,
+                    busy_s = busy_s + excluded.busy_s, jobs = jobs + excluded.jobs
+            """, (worker_id, now, now, busy_s, int(job_done)))
+
+    def reap_expired(self) -> int:
+        now = time.time()
+        with self._connect() as conn:
+            failed = conn.execute("""
+                UPDATE render_jobs SET status = 'failed', finished_at = ?, error = 'timed out (worker lost)'
+                WHERE status = 'running' AND started_at + timeout_s + ? < ? AND attempts >= ?
+            """, (now, REAP_GRACE_S, now, self.max_attempts)).rowcount
+            requeued = conn.execute("""
+                UPDATE render_jobs SET status = 'queued', worker = NULL
+                WHERE status = 'running' AND started_at + timeout_s + ? < ?
+            """, (REAP_GRACE_S, now)).rowcount
+        if failed or requeued:
+            print(f"[RENDER QUEUE] Reaped expired jobs: {requeued} re-queued, {failed} failed")
+        return failed + requeued
+
+    def _prune(self):
+        with self._connect() as conn:
+            conn.execute("""
+                DELETE FROM render_jobs WHERE status IN ('done', 'failed') AND id NOT IN (
+                    SELECT id FROM render_jobs WHERE status IN ('done', 'failed') ORDER BY id DESC LIMIT ?)
+            """, (self.keep_finished,))
+
+    def stats(self) -> dict:
+        now = time.time()
+        with self._connect() as conn:
+            counts = dict(conn.execute("SELECT status, COUNT(*) FROM render_jobs GROUP BY status").fetchall())
+            timings = conn.execute("""
+                SELECT enqueued_at, started_at, finished_at FROM render_jobs
+                WHERE status = 'done' ORDER BY id DESC LIMIT ?
+            """, (LATENCY_WINDOW,)).fetchall()
+            workers = conn.execute("SELECT id, started_at, last_seen, busy_s, jobs FROM render_workers "
+                                   "WHERE last_seen > ?", (now - WORKER_STALE_S,)).fetchall()
+        return {
+            'depth': counts.get('queued', 0),
+            'running': counts.get('running', 0),
+            'done': counts.get('done', 0),
+            'failed': counts.get('failed', 0),
+            'workers': {
+                worker_id: {'jobs': jobs, 'utilisation': round(min(1.0, busy_s / max(1e-6, last_seen - started_at)), 3)}
+                for worker_id, started_at, last_seen, busy_s, jobs in workers
+            },
+            'queue_wait': _latency_summary([(started - enqueued) * 1000 for enqueued, started, _ in timings]),
+            'latency': _latency_summary([(finished - enqueued) * 1000 for enqueued, _, finished in timings])
+        }
+
+
+class InMemoryRedis:
+    """Thread-safe stand-in for the subset of redis.Redis used by RedisRenderQueue (tests, single process)
+
+    Values come back as bytes, like a real client without decode_responses.
+    """
+
+    def __init__(self):
+        self._data = {}
+        self._lock = threading.Condition()
+
+    @staticmethod
+    def _encode(value) -> bytes:
+        return value if isinstance(value, bytes) else str(value).encode("utf-8")
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            value = int(self._data.get(key, 0)) + 1
+            self._data[key] = value
+            return value
+
+    def hset(self, key: str, mapping: Dict[str, Any]) -> None:
+        with self._lock:
+            self._data.setdefault(key, {}).update({k: self._encode(v) for k, v in mapping.items()})
+
+    def hget(self, key: str, field: str) -> Optional[bytes]:
+        with self._lock:
+            return self._data.get(key, {}).get(field)
+
+    def hgetall(self, key: str) -> Dict[bytes, bytes]:
+        with self._lock:
+            return {k.encode("utf-8"): v for k, v in self._data.get(key, {}).items()}
+
+    def hincrbyfloat(self, key: str, field: str, amount: float) -> float:
+        with self._lock:
+            fields = self._data.setdefault(key, {})
+            value = float(fields.get(field, b"0")) + amount
+            fields[field] = self._encode(value)
+            return value
+
+    def lpush(self, key: str, *values) -> int:
+        with self._lock:
+            items = self._data.setdefault(key, deque())
+            for value in values:
+                items.appendleft(self._encode(value))
+            self._lock.notify_all()
+            return len(items)
+
+    def rpoplpush(self, source: str, destination: str) -> Optional[bytes]:
+        with self._lock:
+            items = self._data.get(source)
+            if not items:
+                return None
+            value = items.pop()
+            self._data.setdefault(destination, deque()).appendleft(value)
+            return value
+
+    def lrem(self, key: str, count: int, value) -> int:
+        with self._lock:
+            items = self._data.get(key, deque())
+            value = self._encode(value)
+            removed = 0
+            for item in list(items):
+                if item == value and (count == 0 or removed < abs(count)):
+                    items.remove(item)
+                    removed += 1
+            return removed
+
+    def lrange(self, key: str, start: int, end: int) -> List[bytes]:
+        with self._lock:
+            items = list(self._data.get(key, deque()))
+            return items[start:None if end == -1 else end + 1]
+
+    def ltrim(self, key: str, start: int, end: int) -> None:
+        with self._lock:
+            self._data[key] = deque(self.lrange(key, start, end))
+
+    def llen(self, key: str) -> int:
+        with self._lock:
+            return len(self._data.get(key, deque()))
+
+    def hkeys(self, key: str) -> List[bytes]:
+        with self._lock:
+            return [k.encode("utf-8") for k in self._data.get(key, {})]
+
+    def delete(self, *keys) -> None:
+        with self._lock:
+            for key in keys:
+                self._data.pop(key, None)
+
+
+class RedisRenderQueue(RenderQueue):
+    """Queue on a Redis-compatible server, so workers can run on other machines
+
+    Keys: <prefix>:queued / <prefix>:running (lists of job ids), <prefix>:job:<id> (hash),
+    <prefix>:workers:<id> (hash), <prefix>:timings (recent 'enqueued,started,finished' samples)
+    """
+
+    def __init__(self, client, prefix: str = "render", keep_finished: int = 200):
+        """
+        Args:
+            client: redis.Redis (or InMemoryRedis for tests)
+            prefix: Key namespace
+            keep_finished: Finished jobs kept for results before their hashes are deleted
+        """
+        self.client = client
+        self.prefix = prefix
+        self.keep_finished = keep_finished
+
+    def _key(self, *parts) -> str:
+        return ":".join((self.prefix,) + tuple(str(part) for part in parts))
+
+    def _job(self, job_id: str) -> Dict[str, Any]:
+        return {k.decode("utf-8"): v for k, v in self.client.hgetall(self._key("job", job_id)).items()}
+
+    def enqueue(self, payload: Dict[str, Any], timeout_s: float = 60) -> str:
+        job_id = str(self.client.incr(self._key("next_id")))
+        self.client.hset(self._key("job", job_id), mapping={
+            "status": "queued", "payload": json.dumps(payload), "timeout_s": timeout_s,
+            "attempts": 0, "enqueued_at": time.time()
+        })
+        self.client.lpush(self._key("queued"), job_id)
+        return job_id
+
+    def claim(self, worker_id: str) -> Optional[Dict[str, Any]]:
+        self.reap_expired()
+        job_id = self.client.rpoplpush(self._key("queued"), self._key("running"))
+        if job_id is None:
+            return None
+        job_id = job_id.decode("utf-8")
+        job = self._job(job_id)
+        attempts = int(job.get("attempts", b"0")) + 1
+        self.client.hset(self._key("job", job_id), mapping={
+            "status": "running", "worker": worker_id, "started_at": time.time(), "attempts": attempts
+        })
+        return {"id": job_id, "payload": json.loads(job["payload"]), "timeout_s": float(job["timeout_s"]),
+                "attempts": attempts}
+
+    def _finish(self, job_id: str, fields: Dict[str, Any]):
+        job = self._job(job_id)
+        now = time.time()
+        self.client.hset(self._key("job", job_id), mapping={**fields, "finished_at": now})
+        self.client.lrem(self._key("running"), 1, job_id)
+        self.client.lpush(self._key("finished"), job_id)
+        if fields["status"] == "done":
+            self.client.lpush(self._key("timings"), f"{job['enqueued_at'].decode()},{job['started_at'].decode()},{now}")
+            self.client.ltrim(self._key("timings"), 0, LATENCY_WINDOW - 1)
+        self.client.hincrbyfloat(self._key("counts"), fields["status"], 1)
+
+        # Forget the oldest finished jobs
+        for old_id in self.client.lrange(self._key("finished"), self.keep_finished, -1):
+            self.client.delete(self._key("job", old_id.decode("utf-8")))
+        self.client.ltrim(self._key("finished"), 0, self.keep_finished - 1)
+
+    def complete(self, job_id: str, image: Dict[str, Any]) -> None:
+        data, meta = _split_image(image)
+        self._finish(job_id, {"status": "done", "result": data, "result_meta": meta})
+
+    def fail(self, job_id: str, error: str) -> None:
+        self._finish(job_id, {"status": "failed", "error": error})
+
+    def result(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._job(job_id)
+        if not job:
+            return None
+        status = job["status"].decode("utf-8")
+        image = {**json.loads(job["result_meta"]), "bytes": job["result"]} if status == "done" else None
+        error = job["error"].decode("utf-8") if "error" in job else None
+        return {"status": status, "image": image, "error": error}
+
+    def heartbeat(self, worker_id: str, busy_s: float = 0, job_done: bool = False) -> None:
+        key = self._key("workers", worker_id)
+        now = time.time()
+        if self.client.hget(key, "started_at") is None:
+            self.client.hset(key, mapping={"started_at": now})
+        self.client.hset(key, mapping={"last_seen": now})
+        self.client.hincrbyfloat(key, "busy_s", busy_s)
+        self.client.hincrbyfloat(key, "jobs", int(job_done))
+        self.client.lrem(self._key("worker_ids"), 0, worker_id)
+        self.client.lpush(self._key("worker_ids"), worker_id)
+
+    def reap_expired(self) -> int:
+        now = time.time()
+        reaped = 0
+        for job_id in self.client.lrange(self._key("running"), 0, -1):
+            job_id = job_id.decode("utf-8")
+            job = self._job(job_id)
+            if not job or "started_at" not in job:
+                continue
+            if float(job["started_at"]) + float(job["timeout_s"]) + REAP_GRACE_S >= now:
+                continue
+            if int(job["attempts"]) >= self.max_attempts:
+                self.fail(job_id, "timed out (worker lost)")
+            elif self.client.lrem(self._key("running"), 1, job_id):
+                self.client.hset(self._key("job", job_id), mapping={"status": "queued"})
+                self.client.lpush(self._key("queued"), job_id)
+            reaped += 1
+        if reaped:
+            print(f"[RENDER QUEUE] Reaped {reaped} expired jobs")
+        return reaped
+
+    def stats(self) -> dict:
+        now = time.time()
+        counts = {k.decode("utf-8"): int(float(v)) for k, v in self.client.hgetall(self._key("counts")).items()}
+        timings = [tuple(float(part) for part in sample.decode("utf-8").split(","))
+                   for sample in self.client.lrange(self._key("timings"), 0, -1)]
+        workers = {}
+        for worker_id in self.client.lrange(self._key("worker_ids"), 0, -1):
+            worker_id = worker_id.decode("utf-8")
+            worker = {k.decode("utf-8"): float(v) for k, v in
+                      self.client.hgetall(self._key("workers", worker_id)).items()}
+            if worker and worker["last_seen"] > now - WORKER_STALE_S:
+                uptime = max(1e-6, worker["last_seen"] - worker["started_at"])
+                workers[worker_id] = {'jobs': int(worker.get("jobs", 0)),
+                                      'utilisation': round(min(1.0, worker.get("busy_s", 0) / uptime), 3)}
+        return {
+            'depth': self.client.llen(self._key("queued")),
+            'running': self.client.llen(self._key("running")),
+            'done': counts.get("done", 0),
+            'failed': counts.get("failed", 0),
+            'workers': workers,
+            'queue_wait': _latency_summary([(started - enqueued) * 1000 for enqueued, started, _ in timings]),
+            'latency': _latency_summary([(finished - enqueued) * 1000 for enqueued, _, finished in timings])
+        }
+
+
+def open_render_queue(url: str) -> RenderQueue:
+    """
+    Open a queue from a URL
+
+    Args:
+        url: 'sqlite:///path/to/render_queue.db', 'redis://host:6379/0' or 'memory://' (in-process stand-in)
+    """
+    if url.startswith("sqlite:///"):
+        return SQLiteRenderQueue(url[len("sqlite:///"):])
+    if url.startswith(("redis://", "rediss://")):
+        if not REDIS_AVAILABLE:
+            raise RuntimeError("redis package not installed - pip install redis (or use a sqlite:/// queue)")
+        return RedisRenderQueue(redis.Redis.from_url(url))
+    if url == "memory://":
+        return RedisRenderQueue(InMemoryRedis())
+    raise ValueError(f"Unsupported render queue URL: {url} (expected sqlite:///, redis:// or memory://)")
@@ -0,0 +1,201 @@
+"""
+Render worker for the dashboard render queue.
+
+Pulls dashboard_data jobs from the queue (render_queue_system.py), renders them with the job's
+backend and output profile and stores the encoded image back on the job. Every job has its own
+timeout; a Playwright render that overruns it gets its browser torn down, so a hung Chromium
+stalls one job instead of the poller.
+
+Throughput scales with workers: run --workers N processes here, or more workers on other
+machines pointed at the same Redis queue. --benchmark queues sample jobs and reports throughput.
+
+Usage:
+    python render_worker.py --queue sqlite:///render_queue.db
+    python render_worker.py --queue redis://render-host:6379/0 --workers 4
+    python render_worker.py --queue sqlite:///bench_queue.db --workers 2 --benchmark 20 --backend native
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import time
+from typing import Any, Dict, Optional
+
+from output_profile_system import DashboardOutputProfiles
+from render_queue_system import RenderQueue, open_render_queue
+
+
+# Idle workers refresh their heartbeat this often (busy workers report after each job)
+HEARTBEAT_INTERVAL_S = 5
+
+
+class RenderWorker:
+    """Claims render jobs from a queue and renders them in this process"""
+
+    def __init__(self, queue: RenderQueue, worker_id: Optional[str] = None, poll_s: float = 0.2):
+        """
+        Args:
+            queue: Render queue to pull from
+            worker_id: Name reported in queue stats (defaults to host:pid)
+            poll_s: Sleep between claims while the queue is empty
+        """
+        self.queue = queue
+        self.worker_id = worker_id or queue.new_worker_id()
+        self.poll_s = poll_s
+        self.output_profiles = DashboardOutputProfiles()
+        self._renderers = {}  # Backends are created on first use
+        self.jobs_done = 0
+        self.jobs_failed = 0
+
+    def _renderer(self, backend: str):
+        if backend not in self._renderers:
+            if backend == "native":
+                from native_renderer_system import NativeDashboardRenderer
+                self._renderers[backend] = NativeDashboardRenderer()
+            elif backend == "svg":
+                from svg_renderer_system import SvgDashboardRenderer
+                self._renderers[backend] = SvgDashboardRenderer()
+            elif backend == "playwright":
+                # Same template, browser pool and profile handling as the poller
+                import app_with_dashboard
+                self._renderers[backend] = app_with_dashboard
+            else:
+                raise ValueError(f"Unknown render backend: {backend}")
+        return self._renderers[backend]
+
+    async def render(self, payload: Dict[str, Any]) -> Dict[str, Any]:
+        """Render one job payload ({'dashboard_data', 'theme', 'backend', 'profile'})"""
+        backend = payload.get("backend", "native")
+        renderer = self._renderer(backend)
+        if backend == "playwright":
+            return await renderer.render_dashboard_playwright(payload["dashboard_data"], payload.get("theme", "dark"))
+        profile = self.output_profiles.get(payload["profile"])
+        return await asyncio.to_thread(renderer.render_profile, payload["dashboard_data"], profile)
+
+    async def _reset_browser(self):
+        """Tear down Chromium after a timeout so the next job gets a fresh browser"""
+        app = self._renderers.get("playwright")
+        if app is not None:
+            await app.browser_pool.close()
+
+    async def process(self, job: Dict[str, Any]) -> bool:
+        """Render a claimed job and store the result (True if it succeeded)"""
+        start = time.perf_counter()
+        error = None
+        try:
+            image = await asyncio.wait_for(self.render(job["payload"]), timeout=job["timeout_s"])
+            await asyncio.to_thread(self.queue.complete, job["id"], image)
+        except asyncio.TimeoutError:
+            error = f"timed out after {job['timeout_s']}s"
+            await self._reset_browser()
+        except Exception as e:
+            error = str(e) or type(e).__name__
+
+        if error is not None:
+            await asyncio.to_thread(self.queue.fail, job["id"], error)
+        busy_s = time.perf_counter() - start
+        await asyncio.to_thread(self.queue.heartbeat, self.worker_id, busy_s, error is None)
+
+        if error is None:
+            self.jobs_done += 1
+            print(f"[RENDER WORKER] {self.worker_id} job {job['id']} done in {busy_s * 1000:.0f}ms")
+        else:
+            self.jobs_failed += 1
+            print(f"[RENDER WORKER] {self.worker_id} job {job['id']} failed after {busy_s * 1000:.0f}ms: {error}")
+        return error is None
+
+    async def run(self, max_jobs: Optional[int] = None, idle_exit_s: Optional[float] = None):
+        """
+        Claim and render jobs until stopped
+
+        Args:
+            max_jobs: Exit after this many jobs in this run (None = run forever)
+            idle_exit_s: Exit once the queue has been empty this long (None = wait forever)
+        """
+        await asyncio.to_thread(self.queue.heartbeat, self.worker_id)
+        last_heartbeat = idle_since = time.monotonic()
+        jobs = 0
+        print(f"[RENDER WORKER] {self.worker_id} started")
+        try:
+            while max_jobs is None or jobs < max_jobs:
+                job = await asyncio.to_thread(self.queue.claim, self.worker_id)
+                if job is None:
+                    now = time.monotonic()
+                    if idle_exit_s is not None and now - idle_since >= idle_exit_s:
+                        break
+                    if now - last_heartbeat >= HEARTBEAT_INTERVAL_S:
+                        await asyncio.to_thread(self.queue.heartbeat, self.worker_id)
+                        last_heartbeat = now
+                    await asyncio.sleep(self.poll_s)
+                    continue
+
+                await self.process(job)
+                jobs += 1
+                last_heartbeat = idle_since = time.monotonic()
+        finally:
+            await self._reset_browser()
+            print(f"[RENDER WORKER] {self.worker_id} stopped ({self.jobs_done} done, {self.jobs_failed} failed)")
+
+
+def run_worker_process(queue_url: str, max_jobs: Optional[int], idle_exit_s: Optional[float]):
+    """Entry point for one worker process"""
+    worker = RenderWorker(open_render_queue(queue_url))
+    asyncio.run(worker.run(max_jobs=max_jobs, idle_exit_s=idle_exit_s))
+
+
+def run_workers(queue_url: str, workers: int, max_jobs: Optional[int] = None, idle_exit_s: Optional[float] = None):
+    """Run worker processes and wait for them to exit"""
+    if workers == 1:
+        run_worker_process(queue_url, max_jobs, idle_exit_s)
+        return
+    processes = [multiprocessing.Process(target=run_worker_process, args=(queue_url, max_jobs, idle_exit_s))
+                 for _ in range(workers)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+
+def benchmark(queue_url: str, workers: int, jobs: int, backend: str, profile: str):
+    """Queue sample jobs, drain them with the workers and report throughput"""
+    from benchmark_render import SAMPLE_DASHBOARD_DATA
+
+    queue = open_render_queue(queue_url)
+    payload = {"dashboard_data": SAMPLE_DASHBOARD_DATA, "theme": "dark", "backend": backend, "profile": profile}
+    for _ in range(jobs):
+        queue.enqueue(payload, timeout_s=120)
+
+    start = time.perf_counter()
+    run_workers(queue_url, workers, idle_exit_s=1)
+    elapsed = time.perf_counter() - start - 1  # Less the idle wait before exit
+
+    stats = queue.stats()
+    print(json.dumps(stats, indent=2))
+    print(f"{jobs} jobs, {workers} worker(s), {backend}: {elapsed:.1f}s ({jobs / elapsed:.2f} jobs/s)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Dashboard render worker")
+    parser.add_argument("--queue", default="sqlite:///render_queue.db",
+                        help="Queue URL: sqlite:///path or redis://host:port/db")
+    parser.add_argument("--workers", type=int, default=1, help="Worker processes to run")
+    parser.add_argument("--max-jobs", type=int, help="Exit after this many jobs per worker")
+    parser.add_argument("--idle-exit", type=float, help="Exit after the queue has been empty this many seconds")
+    parser.add_argument("--benchmark", type=int, metavar="JOBS", help="Queue JOBS sample renders and time them")
+    parser.add_argument("--backend", default="native", choices=["native", "svg", "playwright"],
+                        help="Backend for --benchmark jobs")
+    parser.add_argument("--profile", default="telegram", help="Output profile for --benchmark jobs")
+    args = parser.parse_args()
+
+    if args.queue == "memory://" and (args.workers > 1 or args.benchmark is None):
+        parser.error("memory:// queues only exist inside one process - use sqlite:/// or redis://")
+
+    if args.benchmark:
+        benchmark(args.queue, args.workers, args.benchmark, args.backend, args.profile)
+    else:
+        run_workers(args.queue, args.workers, args.max_jobs, args.idle_exit)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,57 @@
+"""
+Shared File Helpers
+Cross-process locks and atomic replacement for the state files the poller shares with the web workers
+"""
+
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+
+try:
+    import fcntl
+    FCNTL_AVAILABLE = True
+except ImportError:
+    FCNTL_AVAILABLE = False  # Windows: single-process use only, writes are still atomic
+
+
+def lock_path(path: Path) -> Path:
+    """Sidecar lock file for a shared file (the file itself gets replaced, so it can't hold the lock)"""
+    return path.with_name(path.name + ".lock")
+
+
+@contextmanager
+def exclusive_lock(path: Path):
+    """
+    Hold an exclusive advisory lock on a file's sidecar lock for the duration of the block
+
+    Serialises writers across processes. Readers never take it - they rely on atomic_write()
+    (whole-file swaps) or a seqlock (see WaitHistory) instead, so they can't hold up a writer.
+    """
+    if not FCNTL_AVAILABLE:
+        yield
+        return
+    with open(lock_path(path), "a") as lock:
+        fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def atomic_write(path: Path, text: str):
+    """
+    Replace a file's contents in one step: readers see the old file or the new one, never a partial write
+
+    Writes a temporary file in the same directory, fsyncs it and renames it over the target.
+    """
+    fd, tmp_path = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w") as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+    except BaseException:
+        os.unlink(tmp_path)
+        raise
@@ -0,0 +1,228 @@
+"""
+SVG Dashboard Renderer
+Emits the dashboard scene as a self-contained SVG document (for the web) and rasterises it with resvg (for Telegram)
+"""
+
+import base64
+import io
+import time
+from collections import deque
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+from xml.sax.saxutils import escape
+
+from PIL import Image
+
+from dashboard_scene_system import FONT_DIR, FONT_FILES, build_dashboard_scene
+from native_renderer_system import NativeDashboardRenderer
+from output_profile_system import DashboardOutputProfiles
+
+try:
+    import resvg_py
+    RESVG_AVAILABLE = True
+except ImportError:
+    RESVG_AVAILABLE = False
+
+
+# Latin subsets of the Inter weights (see build_assets.py) - TTF for resvg, woff2 embedded for browsers
+SUBSET_FONT_DIR = FONT_DIR / "subset"
+FONT_FAMILY = "Inter, ui-sans-serif, system-ui, sans-serif"
+
+
+def _num(value: float) -> str:
+    """Compact coordinate (2 decimals, no trailing zeros)"""
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+def _points(points: List[Tuple[float, float]]) -> str:
+    return " ".join(f"{_num(x)},{_num(y)}" for x, y in points)
+
+
+@lru_cache(maxsize=1)
+def font_face_css() -> str:
+    """@font-face rules with the subset Inter woff2 files inlined as data URIs"""
+    rules = []
+    for weight, filename in sorted(FONT_FILES.items()):
+        data = (SUBSET_FONT_DIR / filename).read_bytes()
+        rules.append(f"@font-face{{font-family:Inter;font-weight:{weight};font-style:normal;"
+                     f"src:url(data:font/woff2;base64,{base64.b64encode(data).decode('ascii')}) format('woff2')}}")
+    return "".join(rules)
+
+
+def scene_to_svg(scene: dict, embed_fonts: bool = True) -> str:
+    """
+    Serialise a build_dashboard_scene() result as an SVG document
+
+    Args:
+        scene: Scene dict ('width', 'height', 'background', 'ops') in CSS px
+        embed_fonts: Inline the Inter subsets so the document renders the same in any browser
+
+    Returns:
+        SVG markup with a width/height of the scene size and a matching viewBox
+    """
+    width, height = scene["width"], scene["height"]
+    defs, body = [], []
+
+    def gradient(stops: List[Tuple[float, str]], vertical: bool) -> str:
+        gradient_id = f"g{len(defs)}"
+        end = 'x2="0" y2="1"' if vertical else 'x2="1" y2="0"'
+        stop_tags = "".join(f'<stop offset="{_num(offset)}" stop-color="{color}"/>' for offset, color in stops)
+        defs.append(f'<linearGradient id="{gradient_id}" x1="0" y1="0" {end}>{stop_tags}</linearGradient>')
+        return f"url(#{gradient_id})"
+
+    body.append(f'<rect width="{width}" height="{height}" fill="{gradient(scene["background"]["stops"], True)}"/>')
+
+    for op in scene["ops"]:
+        kind = op["op"]
+
+        if kind == "rect":
+            if op["w"] <= 0 or op["h"] <= 0:
+                continue
+            # The scene draws strokes inside the box (like CSS borders); SVG centres them on the edge
+            inset = op["stroke_width"] / 2 if op["stroke"] else 0
+            stroke = (f' stroke="{op["stroke"]}" stroke-width="{_num(op["stroke_width"])}"'
+                      if op["stroke"] else "")
+            radius = f' rx="{_num(max(0, op["radius"] - inset))}"' if op["radius"] else ""
+            body.append(f'<rect x="{_num(op["x"] + inset)}" y="{_num(op["y"] + inset)}" '
+                        f'width="{_num(op["w"] - 2 * inset)}" height="{_num(op["h"] - 2 * inset)}"{radius} '
+                        f'fill="{op["fill"] or "none"}"{stroke}/>')
+
+        elif kind == "gradient":
+            if op["w"] <= 0 or op["h"] <= 0:
+                continue
+            radius = f' rx="{_num(op["radius"])}"' if op["radius"] else ""
+            body.append(f'<rect x="{_num(op["x"])}" y="{_num(op["y"])}" width="{_num(op["w"])}" '
+                        f'height="{_num(op["h"])}"{radius} fill="{gradient(op["stops"], op["vertical"])}"/>')
+
+        elif kind == "circle":
+            stroke = (f' stroke="{op["stroke"]}" stroke-width="{_num(op["stroke_width"])}"'
+                      if op["stroke"] else "")
+            body.append(f'<circle cx="{_num(op["cx"])}" cy="{_num(op["cy"])}" r="{_num(op["r"])}" '
+                        f'fill="{op["fill"] or "none"}"{stroke}/>')
+
+        elif kind == "polyline":
+            body.append(f'<polyline points="{_points(op["points"])}" fill="none" stroke="{op["stroke"]}" '
+                        f'stroke-width="{_num(op["width"])}" stroke-linecap="round" stroke-linejoin="round"/>')
+
+        elif kind == "polygon":
+            body.append(f'<polygon points="{_points(op["points"])}" fill="{op["fill"]}"/>')
+
+        elif kind == "text":
+            x = op["x"]
+            tracking = op["tracking"]
+            spacing = ""
+            if tracking:
+                # letter-spacing also trails the last glyph - shift so anchored text lines up with the scene
+                x += {"start": 0, "middle": tracking / 2, "end": tracking}[op["anchor"]]
+                spacing = f' letter-spacing="{_num(tracking)}"'
+            anchor = f' text-anchor="{op["anchor"]}"' if op["anchor"] != "start" else ""
+            body.append(f'<text x="{_num(x)}" y="{_num(op["y"])}" font-size="{_num(op["size"])}" '
+                        f'font-weight="{op["weight"]}" fill="{op["fill"]}"{anchor}{spacing}>{escape(op["text"])}</text>')
+
+    style = font_face_css() if embed_fonts else ""
+    return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+            f'viewBox="0 0 {width} {height}" font-family="{FONT_FAMILY}" xml:space="preserve">'
+            f'<style>{style}</style><defs>{"".join(defs)}</defs>{"".join(body)}</svg>')
+
+
+class SvgDashboardRenderer:
+    """Renders dashboard_data to one SVG document and rasterises it for image destinations"""
+
+    def __init__(self, embed_fonts: bool = True, latency_window: int = 100):
+        """
+        Args:
+            embed_fonts: Inline the Inter subsets in the SVG (needed for browsers without Inter installed)
+            latency_window: Number of render timings kept for stats()
+        """
+        self.embed_fonts = embed_fonts
+        self.latency = deque(maxlen=latency_window)
+        self._fallback = None if RESVG_AVAILABLE else NativeDashboardRenderer()
+        if self._fallback is not None:
+            print("[SVG RENDER] resvg_py not installed - rasterising with the native renderer instead")
+
+    def render_svg(self, dashboard_data: dict) -> str:
+        """Build the SVG document for dashboard_data"""
+        return scene_to_svg(build_dashboard_scene(dashboard_data), embed_fonts=self.embed_fonts)
+
+    @staticmethod
+    def rasterise(svg: str, long_edge: Optional[int] = None, scale: Optional[float] = None) -> Image.Image:
+        """
+        Rasterise an SVG document with resvg
+
+        Args:
+            svg: SVG markup from render_svg()
+            long_edge: Final size of the longest side in pixels
+            scale: Alternatively, pixels per CSS px
+
+        Returns:
+            RGB image
+        """
+        options = {"svg_string": svg, "font_dirs": [str(SUBSET_FONT_DIR)], "skip_system_fonts": True}
+        if long_edge is not None:
+            # resvg keeps the aspect ratio when only one side is given - pick the longer one
+            width, height = (float(v) for v in svg.split('viewBox="0 0 ', 1)[1].split('"', 1)[0].split())
+            options["height" if height >= width else "width"] = long_edge
+        else:
+            options["zoom"] = scale or 2
+        png = resvg_py.svg_to_bytes(**options)
+        with Image.open(io.BytesIO(bytes(png))) as image:
+            return image.convert("RGB")
+
+    def render_profile(self, dashboard_data: dict, profile: dict) -> Dict:
+        """
+        Render the SVG, rasterise and encode it for an output profile
+
+        Returns:
+            Same dict shape as DashboardOutputProfiles.capture(), plus 'svg' (the vector document)
+            ('capture_ms' is the SVG build + rasterise time)
+        """
+        start = time.perf_counter()
+        svg = self.render_svg(dashboard_data)
+        svg_ms = (time.perf_counter() - start) * 1000
+
+        if self._fallback is not None:
+            image = self._fallback.render_profile(dashboard_data, profile)
+            image["svg"] = svg
+            self.latency.append(svg_ms + image["capture_ms"])
+            return image
+
+        if profile["long_edge"] is None:
+            raster = self.rasterise(svg, scale=profile.get("scale", 2))
+        else:
+            raster = self.rasterise(svg, long_edge=profile["long_edge"])
+        render_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        data, quality = DashboardOutputProfiles.encode(raster, profile)
+        encode_ms = (time.perf_counter() - start) * 1000
+        self.latency.append(render_ms)
+
+        print(f"[SVG RENDER] {raster.size[0]}x{raster.size[1]}, {len(data) // 1024} KB"
+              f"{f' q{quality}' if quality else ''}, SVG {len(svg) // 1024} KB | "
+              f"svg {svg_ms:.0f}ms, rasterise {render_ms - svg_ms:.0f}ms, encode {encode_ms:.0f}ms")
+        return {
+            "bytes": data,
+            "format": profile["format"],
+            "width": raster.size[0],
+            "height": raster.size[1],
+            "quality": quality,
+            "resized": False,
+            "capture_ms": round(render_ms, 1),
+            "encode_ms": round(encode_ms, 1),
+            "svg": svg
+        }
+
+    def stats(self) -> dict:
+        """
+        Get render timing statistics
+
+        Returns:
+            Dict with {'count': int, 'avg_ms': float, 'last_ms': float} or None if nothing rendered
+        """
+        if not self.latency:
+            return None
+        return {
+            'count': len(self.latency),
+            'avg_ms': round(sum(self.latency) / len(self.latency), 1),
+            'last_ms': round(self.latency[-1], 1)
+        }
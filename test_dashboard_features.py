@@ -6,7 +6,7 @@ Test script to demonstrate the new dashboard features:
 """
 
 import asyncio
-from generate_dashboard_image import generate_dashboard_image
+from generate_dashboard_image import generate_dashboard_image, browser_pool
 from datetime import datetime, timezone
 
 # Sample hospital data
@@ -56,6 +56,7 @@ async def main():
         timestamp,
         output_path="test_dashboard_with_features.png"
     )
+    await browser_pool.close()
     
     print("\n✅ Dashboard generated: test_dashboard_with_features.png")
     print("\n📝 How it works:")
@@ -10,7 +10,7 @@ Final test for all dashboard improvements:
 """
 
 import asyncio
-from generate_dashboard_image import generate_dashboard_image
+from generate_dashboard_image import generate_dashboard_image, browser_pool
 from datetime import datetime, timezone
 
 # All 10 hospitals - COMPLETE DATA
@@ -64,6 +64,7 @@ async def main():
         timestamp,
         output_path="final_dashboard.png"
     )
+    await browser_pool.close()
     
     print("\n✅ Dashboard generated: final_dashboard.png")
     
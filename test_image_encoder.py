@@ -0,0 +1,68 @@
+"""
+Test the image encoder: quality search against a byte budget, the PSNR floor and format coverage
+"""
+
+import io
+import math
+
+import pytest
+from PIL import Image, ImageDraw
+
+from image_encoder_system import ImageEncoder, format_available, psnr
+
+
+def dashboard_like(width: int = 640, height: int = 480) -> Image.Image:
+    """Flat panels with text and lines - compresses like the dashboard"""
+    image = Image.new("RGB", (width, height), (18, 24, 38))
+    draw = ImageDraw.Draw(image)
+    for row in range(12):
+        y = 20 + row * 36
+        draw.rectangle((20, y, width - 20, y + 30), fill=(30 + row * 8, 40, 60), outline=(200, 80, 80))
+        draw.text((30, y + 8), f"Hospital {row} ED   {row * 27 + 41}m", fill=(240, 240, 240))
+        draw.line((width // 2, y + 15, width - 40, y + 5 + row), fill=(80, 200, 120), width=2)
+    return image
+
+
+@pytest.fixture(scope="module")
+def encoder():
+    encoder = ImageEncoder(max_workers=2)
+    yield encoder
+    encoder.close()
+
+
+def test_search_finds_highest_quality_within_budget(encoder):
+    image = dashboard_like()
+    unbounded = encoder.encode(image, "jpeg", quality=95, min_quality=95)
+    budget = len(unbounded["bytes"]) * 3 // 4
+
+    result = encoder.encode(image, "jpeg", max_bytes=budget, quality=95, min_quality=40)
+    assert result["within_budget"] and len(result["bytes"]) <= budget
+    assert 40 <= result["quality"] < 95
+    above = encoder.encode(image, "jpeg", quality=result["quality"] + 1, min_quality=result["quality"] + 1)
+    assert len(above["bytes"]) > budget                  # Next quality up would not fit
+    assert result["attempts"] <= 1 + math.ceil(math.log2(95 - 40 + 1))
+
+
+def test_psnr_floor_wins_over_budget(encoder):
+    image = dashboard_like()
+    with Image.open(io.BytesIO(encoder.encode(image, "jpeg", quality=95, min_quality=95)["bytes"])) as decoded:
+        floor = psnr(image, decoded.convert("RGB")) - 1
+    result = encoder.encode(image, "jpeg", max_bytes=1, quality=95, min_quality=10, min_psnr=floor)
+    assert not result["within_budget"]
+    assert result["psnr"] >= floor and 10 < result["quality"] <= 95
+    with Image.open(io.BytesIO(result["bytes"])) as decoded:
+        assert psnr(image, decoded.convert("RGB")) == pytest.approx(result["psnr"], abs=0.01)
+
+
+def test_progressive_jpeg_and_other_formats(encoder):
+    image = dashboard_like()
+    with Image.open(io.BytesIO(encoder.encode(image, "jpeg")["bytes"])) as decoded:
+        assert decoded.info.get("progressive") or decoded.info.get("progression")
+
+    formats = [f for f in ("jpeg", "webp", "avif", "png") if format_available(f)]
+    results = encoder.encode_formats(image, formats, quality=80, min_quality=80)
+    assert set(results) == set(formats)
+    assert results["png"]["quality"] is None
+    with Image.open(io.BytesIO(results["png"]["bytes"])) as decoded:
+        assert psnr(image, decoded.convert("RGB")) == math.inf
+    assert set(encoder.stats()) >= set(formats)
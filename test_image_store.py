@@ -0,0 +1,67 @@
+"""
+Test the managed dashboard image store: count/byte budgets, LRU order, thumbnails and the index
+"""
+
+import io
+import tempfile
+from pathlib import Path
+
+from PIL import Image
+
+from image_store_system import DashboardImageStore
+
+
+def jpeg(width: int = 400, height: int = 600) -> bytes:
+    buffer = io.BytesIO()
+    Image.new("RGB", (width, height), (30, 60, 90)).save(buffer, format="JPEG")
+    return buffer.getvalue()
+
+
+def test_count_budget_evicts_least_recently_used():
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = DashboardImageStore(store_dir, max_files=2)
+        store.put("a.jpg", jpeg())
+        store.put("b.jpg", jpeg())
+        assert store.get("a.jpg") is not None   # a is now most recently used
+        store.put("c.jpg", jpeg())              # Over the count budget - evicts b
+        assert store.names() == ["a.jpg", "c.jpg"]
+        assert not (Path(store_dir) / "b.jpg").exists()
+        assert store.get("b.jpg") is None
+        assert store.stats()["evictions"] == 1
+
+
+def test_byte_budget_and_replacing_a_name():
+    data = jpeg()
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = DashboardImageStore(store_dir, max_bytes=len(data) * 2)
+        store.put("a.jpg", data)
+        store.put("a.jpg", data)                # Same minute twice - replaced, not double counted
+        assert store.stats()["bytes"] == len(data)
+        assert store.get("a.jpg") == data
+        store.put("b.jpg", data)
+        store.put("c.jpg", data)
+        assert store.names() == ["b.jpg", "c.jpg"]
+        assert store.stats()["bytes"] == len(data) * 2
+
+
+def test_thumbnails_outlive_evicted_images():
+    with tempfile.TemporaryDirectory() as store_dir:
+        store = DashboardImageStore(store_dir, max_files=1, thumbnail_long_edge=60)
+        store.put("a.jpg", jpeg())
+        store.put("b.jpg", jpeg())
+        assert store.names() == ["b.jpg"]
+        assert store.thumbnail_names() == ["a.jpg", "b.jpg"]
+        with Image.open(io.BytesIO(store.get_thumbnail("a.jpg"))) as thumbnail:
+            assert thumbnail.size == (40, 60)
+
+
+def test_index_survives_restart_and_adopts_existing_files():
+    with tempfile.TemporaryDirectory() as store_dir:
+        (Path(store_dir) / "old.jpg").write_bytes(jpeg())  # Written before the store existed
+        store = DashboardImageStore(store_dir, max_files=3)
+        assert store.names() == ["old.jpg"]
+        store.put("new.jpg", jpeg())
+
+        reopened = DashboardImageStore(store_dir, max_files=1)  # Smaller budget applies on load
+        assert reopened.names() == ["new.jpg"]
+        assert not (Path(store_dir) / "old.jpg").exists()
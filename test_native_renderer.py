@@ -0,0 +1,105 @@
+"""
+Compare the native (Pillow) dashboard renderer against the Playwright render
+
+Renders the same dashboard payload with both backends at the telegram profile size and writes
+native_vs_playwright.png (Playwright | native | amplified difference) for a visual check.
+Skips the Playwright half if Chromium can't be launched.
+"""
+
+import asyncio
+import io
+import time
+from pathlib import Path
+
+from PIL import Image, ImageChops, ImageStat
+
+from asset_bundle_system import AssetBundle
+from benchmark_render import SAMPLE_DASHBOARD_DATA, VIEWPORT, apply_text_scaling
+from browser_pool_system import DashboardBrowserPool
+from native_renderer_system import NativeDashboardRenderer
+from output_profile_system import OUTPUT_PROFILES
+
+PROFILE = OUTPUT_PROFILES["telegram"]
+SIDE_BY_SIDE_FILE = "native_vs_playwright.png"
+
+# Mean absolute difference per channel (0-255) above which the layouts have drifted apart
+MAX_MEAN_DIFF = 20
+
+
+def render_native() -> Image.Image:
+    renderer = NativeDashboardRenderer()
+    renderer.render(SAMPLE_DASHBOARD_DATA, long_edge=PROFILE["long_edge"])  # Warm font cache
+    start = time.perf_counter()
+    image = renderer.render(SAMPLE_DASHBOARD_DATA, long_edge=PROFILE["long_edge"])
+    print(f"Native render: {image.size[0]}x{image.size[1]} in {(time.perf_counter() - start) * 1000:.0f}ms")
+    return image
+
+
+async def render_playwright() -> Image.Image:
+    """Render through dashboard.html (None if Chromium isn't available)"""
+    template_html = apply_text_scaling((Path(__file__).parent / "dashboard.html").read_text(encoding="utf-8"))
+    pool = DashboardBrowserPool(asset_bundle=AssetBundle())
+
+    async def capture(page):
+        element = await page.query_selector('.max-w-6xl')
+        return await element.screenshot(type='png')
+
+    try:
+        png = await pool.render(VIEWPORT, template_html, SAMPLE_DASHBOARD_DATA, capture)
+    except Exception as e:
+        print(f"Playwright render unavailable: {e}")
+        return None
+    finally:
+        await pool.close()
+    return Image.open(io.BytesIO(png)).convert("RGB")
+
+
+def visual_diff(reference: Image.Image, candidate: Image.Image) -> float:
+    """Write the side-by-side comparison and return the mean absolute difference"""
+    reference = reference.resize(candidate.size, Image.LANCZOS)
+    diff = ImageChops.difference(reference, candidate)
+    mean_diff = sum(ImageStat.Stat(diff).mean) / 3
+
+    width, height = candidate.size
+    side_by_side = Image.new("RGB", (width * 3, height))
+    side_by_side.paste(reference, (0, 0))
+    side_by_side.paste(candidate, (width, 0))
+    side_by_side.paste(diff.point(lambda v: min(255, v * 4)), (width * 2, 0))
+    side_by_side.save(SIDE_BY_SIDE_FILE)
+    print(f"Mean abs diff: {mean_diff:.1f}/255 - side-by-side saved to {SIDE_BY_SIDE_FILE}")
+    return mean_diff
+
+
+def test_native_render_size_and_speed():
+    image = render_native()
+    assert max(image.size) == PROFILE["long_edge"]
+    renderer = NativeDashboardRenderer()
+    renderer.render(SAMPLE_DASHBOARD_DATA, long_edge=PROFILE["long_edge"])
+    renderer.render(SAMPLE_DASHBOARD_DATA, long_edge=PROFILE["long_edge"])
+    assert renderer.stats()["last_ms"] < 1000
+
+
+def test_native_matches_playwright():
+    reference = asyncio.run(render_playwright())
+    if reference is None:
+        import pytest
+        pytest.skip("Chromium not available")
+    assert visual_diff(reference, render_native()) < MAX_MEAN_DIFF
+
+
+async def main():
+    print("=" * 60)
+    print("NATIVE RENDERER vs PLAYWRIGHT")
+    print("=" * 60)
+    native = render_native()
+    reference = await render_playwright()
+    if reference is None:
+        native.save("native_dashboard.png")
+        print("Saved native render only: native_dashboard.png")
+        return
+    mean_diff = visual_diff(reference, native)
+    print("PASS" if mean_diff < MAX_MEAN_DIFF else f"FAIL (threshold {MAX_MEAN_DIFF})")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -7,7 +7,7 @@ Quick test for the new dashboard layout with:
 """
 
 import asyncio
-from generate_dashboard_image import generate_dashboard_image
+from generate_dashboard_image import generate_dashboard_image, browser_pool
 from datetime import datetime, timezone
 
 # Sample hospital data - all 10 hospitals
@@ -46,6 +46,7 @@ async def main():
         timestamp,
         output_path="test_new_layout.png"
     )
+    await browser_pool.close()
     
     print("\n✅ Dashboard generated: test_new_layout.png")
     print("\n💡 Check the image - all 10 hospitals should be visible!")
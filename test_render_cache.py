@@ -0,0 +1,67 @@
+"""
+Test the content-addressed render cache: key canonicalisation, LRU eviction and the disk tier
+"""
+
+import tempfile
+
+from benchmark_render import SAMPLE_DASHBOARD_DATA
+from output_profile_system import OUTPUT_PROFILES
+from render_cache_system import DashboardRenderCache
+
+PROFILE = OUTPUT_PROFILES["telegram"]
+
+
+def fake_image(size: int, fill: bytes = b"x") -> dict:
+    return {"bytes": fill * size, "format": "jpeg", "width": 10, "height": 10, "quality": 90}
+
+
+def test_key_ignores_dict_order_but_not_content():
+    reordered = dict(reversed(list(SAMPLE_DASHBOARD_DATA.items())))
+    key = DashboardRenderCache.key(SAMPLE_DASHBOARD_DATA, PROFILE, {"backend": "native"})
+    assert DashboardRenderCache.key(reordered, PROFILE, {"backend": "native"}) == key
+
+    changed = {**SAMPLE_DASHBOARD_DATA, "headline": "Something else"}
+    assert DashboardRenderCache.key(changed, PROFILE, {"backend": "native"}) != key
+    assert DashboardRenderCache.key(SAMPLE_DASHBOARD_DATA, OUTPUT_PROFILES["facebook"], {"backend": "native"}) != key
+    assert DashboardRenderCache.key(SAMPLE_DASHBOARD_DATA, PROFILE, {"backend": "svg"}) != key
+
+
+def test_memory_lru_eviction():
+    cache = DashboardRenderCache(max_bytes=250)
+    cache.put("a", fake_image(100))
+    cache.put("b", fake_image(100))
+    assert cache.get("a")["cached"]        # a is now most recently used
+    cache.put("c", fake_image(100))        # Over budget - evicts b
+    assert cache.get("b") is None
+    assert cache.get("a") is not None and cache.get("c") is not None
+    stats = cache.stats()
+    assert stats["entries"] == 2 and stats["bytes"] == 200 and stats["evictions"] == 1
+
+
+def test_oversized_image_not_cached():
+    cache = DashboardRenderCache(max_bytes=50)
+    cache.put("big", fake_image(100))
+    assert cache.get("big") is None
+
+
+def test_disk_cache_survives_restart():
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = DashboardRenderCache(max_bytes=1000, cache_dir=cache_dir)
+        cache.put("a", {**fake_image(100, b"a"), "svg": "<svg/>"})
+        cache.put("b", fake_image(100, b"b"))
+        cache.get("a")
+
+        reopened = DashboardRenderCache(max_bytes=250, cache_dir=cache_dir)
+        image = reopened.get("a")
+        assert image["bytes"] == b"a" * 100 and image["svg"] == "<svg/>"
+        reopened.put("c", fake_image(100))  # Evicts b (least recently used before the restart)
+        assert reopened.get("b") is None
+        assert reopened.stats()["entries"] == 2
+
+
+if __name__ == "__main__":
+    test_key_ignores_dict_order_but_not_content()
+    test_memory_lru_eviction()
+    test_oversized_image_not_cached()
+    test_disk_cache_survives_restart()
+    print("Render cache tests passed")
@@ -0,0 +1,86 @@
+"""
+Test the render job queue on the SQLite and Redis-compatible (in-memory stand-in) backends,
+and a worker draining it with the native renderer
+"""
+
+import asyncio
+import tempfile
+import time
+from pathlib import Path
+
+import pytest
+
+from benchmark_render import SAMPLE_DASHBOARD_DATA
+from render_queue_system import InMemoryRedis, RedisRenderQueue, SQLiteRenderQueue
+from render_worker import RenderWorker
+
+PAYLOAD = {"dashboard_data": SAMPLE_DASHBOARD_DATA, "theme": "dark", "backend": "native", "profile": "telegram"}
+
+
+@pytest.fixture(params=["sqlite", "redis"])
+def queue(request):
+    if request.param == "redis":
+        yield RedisRenderQueue(InMemoryRedis())
+        return
+    with tempfile.TemporaryDirectory() as tmp:
+        yield SQLiteRenderQueue(str(Path(tmp) / "queue.db"))
+
+
+def fake_image() -> dict:
+    return {"bytes": b"\xff\xd8jpeg", "format": "jpeg", "width": 10, "height": 20, "quality": 80}
+
+
+def test_claim_complete_and_fail(queue):
+    first = queue.enqueue(PAYLOAD, timeout_s=30)
+    second = queue.enqueue(PAYLOAD, timeout_s=30)
+    assert queue.stats()["depth"] == 2
+
+    job = queue.claim("w1")
+    assert job["id"] == first and job["payload"] == PAYLOAD and job["attempts"] == 1
+    queue.complete(job["id"], fake_image())
+    assert queue.result(first) == {"status": "done", "image": fake_image(), "error": None}
+
+    job = queue.claim("w2")
+    assert job["id"] == second
+    queue.fail(job["id"], "boom")
+    assert queue.result(second)["status"] == "failed" and queue.result(second)["error"] == "boom"
+    assert queue.claim("w1") is None
+
+    queue.heartbeat("w1", busy_s=0.5, job_done=True)
+    stats = queue.stats()
+    assert stats["depth"] == 0 and stats["done"] == 1 and stats["failed"] == 1
+    assert stats["workers"]["w1"]["jobs"] == 1
+    assert stats["latency"]["count"] == 1  # Completed jobs only
+
+
+def test_expired_jobs_are_requeued_then_failed(queue, monkeypatch):
+    job_id = queue.enqueue(PAYLOAD, timeout_s=1)
+    assert queue.claim("lost-worker")["id"] == job_id
+
+    # Jump past timeout + grace: the job goes back on the queue for another attempt
+    now = time.time()
+    monkeypatch.setattr(time, "time", lambda: now + 60)
+    job = queue.claim("w2")
+    assert job["id"] == job_id and job["attempts"] == 2
+
+    # Out of attempts - reaped as failed instead of re-queued
+    monkeypatch.setattr(time, "time", lambda: now + 120)
+    assert queue.claim("w3") is None
+    assert queue.result(job_id)["status"] == "failed"
+
+
+def test_worker_renders_and_enforces_timeout(queue):
+    good = queue.enqueue(PAYLOAD, timeout_s=60)
+    bad = queue.enqueue({**PAYLOAD, "backend": "unknown"}, timeout_s=60)
+    worker = RenderWorker(queue, worker_id="test", poll_s=0.01)
+    asyncio.run(worker.run(max_jobs=2))
+
+    image = asyncio.run(queue.wait_for_result(good, timeout_s=1))
+    assert image["format"] == "jpeg" and image["bytes"][:2] == b"\xff\xd8"
+    with pytest.raises(RuntimeError):
+        asyncio.run(queue.wait_for_result(bad, timeout_s=1))
+
+    slow = queue.enqueue(PAYLOAD, timeout_s=0.001)
+    asyncio.run(worker.run(max_jobs=1))
+    assert "timed out" in queue.result(slow)["error"]
+    assert queue.stats()["workers"]["test"]["jobs"] == 1
@@ -0,0 +1,124 @@
+"""
+Stress test the trend cache files shared between one writer process and concurrent read-only processes
+"""
+
+import json
+import multiprocessing
+import struct
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from trend_cache_system import HospitalTrendCache
+from wait_history_system import MAGIC, WaitHistory
+
+POLLS = 300
+
+
+def polled(poll: int) -> dict:
+    """Every hospital reads the poll number; hospitals join every 30 polls (growing the slot table)"""
+    return {f"H{i} ED": poll for i in range(2 + poll // 30)}
+
+
+def write_polls(tmp: str):
+    cache = HospitalTrendCache(cache_file=f"{tmp}/cache.json", history_file=f"{tmp}/history.bin", history_capacity=16)
+    for poll in range(POLLS):
+        if poll == POLLS // 2:
+            # Retention change while readers are mapped - the file is rebuilt and swapped
+            cache.history.close()
+            cache = HospitalTrendCache(cache_file=f"{tmp}/cache.json", history_file=f"{tmp}/history.bin",
+                                       history_capacity=24)
+        cache.update_cache(polled(poll))
+    cache.history.close()
+
+
+def read_until_done(tmp: str, done, results):
+    history = WaitHistory(f"{tmp}/history.bin", readonly=True)
+    snapshots = 0
+    while not done.is_set():
+        try:
+            view = history.consistent(lambda: {h: history.readings(h) for h in history.hospitals()})
+            newest = {readings[-1][1] for readings in view.values()}
+            assert len(newest) <= 1, f"hospitals from different polls: {newest}"  # Whole polls only
+            if newest:
+                assert set(view) == set(polled(newest.pop())), f"hospitals missing: {sorted(view)}"
+            for readings in view.values():
+                waits = [wait for _, wait in readings]
+                assert waits == list(range(waits[0], waits[0] + len(waits))), f"torn ring: {waits}"
+
+            if Path(f"{tmp}/cache.json").exists():
+                data = json.loads(Path(f"{tmp}/cache.json").read_text())["data"]
+                assert len(set(data.values())) == 1, f"partial cache file: {data}"
+            snapshots += 1
+        except Exception as e:  # Reported to the test process
+            results.put(repr(e))
+    history.close()
+    results.put(snapshots)
+
+
+def test_concurrent_readers_see_whole_polls():
+    context = multiprocessing.get_context("fork")
+    with tempfile.TemporaryDirectory() as tmp:
+        done, results = context.Event(), context.Queue()
+        readers = [context.Process(target=read_until_done, args=(tmp, done, results)) for _ in range(3)]
+        for reader in readers:
+            reader.start()
+        writer = context.Process(target=write_polls, args=(tmp,))
+        writer.start()
+        writer.join(timeout=120)
+        done.set()
+        for reader in readers:
+            reader.join(timeout=30)
+
+        outcomes = [results.get(timeout=5) for _ in readers]
+        failures = [outcome for outcome in outcomes if isinstance(outcome, str)]
+        while not results.empty():
+            failures.append(results.get())
+        assert writer.exitcode == 0
+        assert not failures, failures[:5]
+        assert all(isinstance(outcome, int) and outcome > 0 for outcome in outcomes)
+
+        # A reader opened after the writer sees the final state of the swapped file
+        history = WaitHistory(f"{tmp}/history.bin", readonly=True)
+        assert history.capacity == 24 and history.series("H0 ED") == list(range(POLLS - 24, POLLS))
+        with pytest.raises(ValueError):
+            history.append({"H0 ED": 1})
+        history.close()
+
+
+def test_readonly_cache_follows_writer():
+    with tempfile.TemporaryDirectory() as tmp:
+        reader = HospitalTrendCache(cache_file=f"{tmp}/cache.json", history_file=f"{tmp}/history.bin", readonly=True)
+        assert reader.history.hospitals() == []  # Nothing written yet
+
+        writer = HospitalTrendCache(cache_file=f"{tmp}/cache.json", history_file=f"{tmp}/history.bin")
+        for i in range(12):
+            writer.update_history({"Ulster ED": 100 + i * 5}, timestamp=1_000_000 + i * 300)
+        writer.update_cache({"Ulster ED": 160})
+
+        reader.refresh()
+        assert reader.cache_data["data"] == {"Ulster ED": 160}
+        now = 1_000_000 + 12 * 300
+        assert reader.calculate_windows({"Ulster ED": 160}, now=now) == writer.calculate_windows({"Ulster ED": 160}, now=now)
+        with pytest.raises(ValueError):
+            reader.update_cache({"Ulster ED": 1})
+        writer.history.close()
+        reader.history.close()
+
+
+def test_older_version_file_is_migrated():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = Path(tmp) / "history.bin"
+        history = WaitHistory(str(path), capacity=4, slots=2)
+        history.append({"Mater ED": 90, "Causeway ED": 40}, timestamp=100)
+        history.append({"Mater ED": 95, "Causeway ED": 45}, timestamp=400)
+        history.close()
+
+        # Version 2 had a 16-byte header and the same slots
+        raw = path.read_bytes()
+        path.write_bytes(struct.pack("<4sIII", MAGIC, 2, 4, 2) + raw[32:])
+        migrated = WaitHistory(str(path), capacity=4)
+        assert migrated.readings("Mater ED") == [(100, 90), (400, 95)]
+        assert migrated.series("Causeway ED") == [40, 45]
+        migrated.close()
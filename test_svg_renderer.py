@@ -0,0 +1,61 @@
+"""
+Check the SVG dashboard renderer against the native (Pillow) renderer
+
+Both draw the same dashboard scene, so the resvg raster should be near-identical to the native
+render. Writes svg_dashboard.svg for opening in a browser.
+"""
+
+import time
+import xml.etree.ElementTree as ET
+
+from PIL import ImageChops, ImageStat
+
+from benchmark_render import SAMPLE_DASHBOARD_DATA
+from native_renderer_system import NativeDashboardRenderer
+from output_profile_system import OUTPUT_PROFILES
+from svg_renderer_system import RESVG_AVAILABLE, SvgDashboardRenderer
+
+PROFILE = OUTPUT_PROFILES["telegram"]
+SVG_FILE = "svg_dashboard.svg"
+
+# Mean absolute difference per channel (0-255) - only anti-aliasing should differ
+MAX_MEAN_DIFF = 6
+
+
+def test_svg_document_is_self_contained():
+    svg = SvgDashboardRenderer().render_svg(SAMPLE_DASHBOARD_DATA)
+    root = ET.fromstring(svg)
+    assert root.get("viewBox").startswith("0 0 1152 ")
+    assert svg.count("@font-face") == 4
+    assert "http://" not in svg.replace('xmlns="http://www.w3.org/2000/svg"', "")
+    assert "Altnagelvin Area ED" in svg
+
+
+def test_svg_raster_matches_native():
+    if not RESVG_AVAILABLE:
+        import pytest
+        pytest.skip("resvg_py not installed")
+    image = SvgDashboardRenderer().render_profile(SAMPLE_DASHBOARD_DATA, PROFILE)
+    assert max(image["width"], image["height"]) == PROFILE["long_edge"]
+    assert len(image["bytes"]) <= PROFILE["max_bytes"]
+
+    raster = SvgDashboardRenderer.rasterise(image["svg"], long_edge=PROFILE["long_edge"])
+    native = NativeDashboardRenderer().render(SAMPLE_DASHBOARD_DATA, long_edge=PROFILE["long_edge"])
+    diff = ImageChops.difference(raster, native.resize(raster.size))
+    assert sum(ImageStat.Stat(diff).mean) / 3 < MAX_MEAN_DIFF
+
+
+def main():
+    renderer = SvgDashboardRenderer()
+    start = time.perf_counter()
+    svg = renderer.render_svg(SAMPLE_DASHBOARD_DATA)
+    print(f"SVG document: {len(svg) // 1024} KB in {(time.perf_counter() - start) * 1000:.0f}ms")
+    with open(SVG_FILE, "w", encoding="utf-8") as f:
+        f.write(svg)
+    print(f"Saved {SVG_FILE}")
+    if RESVG_AVAILABLE:
+        renderer.render_profile(SAMPLE_DASHBOARD_DATA, PROFILE)
+
+
+if __name__ == "__main__":
+    main()
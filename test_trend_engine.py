@@ -0,0 +1,67 @@
+"""
+Test the vectorised trend engine against per-hospital calculations on the same history
+"""
+
+import random
+import tempfile
+from pathlib import Path
+
+from trend_engine_system import TrendEngine
+from wait_history_system import WaitHistory
+
+
+START = 1_000_000
+WINDOW, DAY, TOLERANCE = 1800, 86400, 60
+
+
+def random_history(path: str, hospitals: int, polls: int, seed: int):
+    """5-minute polls with missed polls; later hospitals join part way through. Returns (history, now)"""
+    rng = random.Random(seed)
+    history = WaitHistory(path, capacity=50, slots=2)  # Wraps the ring and grows the slot table
+    waits = [rng.randint(30, 400) for _ in range(hospitals)]
+    timestamp = START
+    for poll in range(polls):
+        timestamp += 300 * rng.choice([1] * 8 + [2, 5])
+        waits = [max(0, wait + rng.randint(-25, 25)) for wait in waits]
+        history.append({f"H{i} ED": wait for i, wait in enumerate(waits) if i < 3 + poll // 10}, timestamp=timestamp)
+    return history, timestamp + 300
+
+
+def test_engine_matches_per_hospital_calculation():
+    with tempfile.TemporaryDirectory() as tmp:
+        history, now = random_history(str(Path(tmp) / "history.bin"), hospitals=9, polls=80, seed=7)
+        current = {f"H{i} ED": 100 + i * 17 for i in range(10)}  # H9 has no history - uses the fallback
+        stats = TrendEngine(history).compute(current, now=now, trend_window_s=WINDOW, change_window_s=DAY,
+                                             tolerance_s=TOLERANCE, fallback={"H9 ED": 140}, threshold=150)
+
+        def reading_ago(hospital: str, seconds: int):
+            reading = history.at_or_before(hospital, now - seconds + TOLERANCE)
+            return reading if reading is not None else history.oldest(hospital)
+
+        expected_changes = []
+        for hospital, wait in current.items():
+            reading = reading_ago(hospital, WINDOW)
+            taken_at, previous = reading if reading is not None else (None, 140)
+            window = "5min" if taken_at is None else f"{round((now - taken_at) / 60)}min"
+            expected_changes.append({'hospital': hospital, 'current': wait, 'previous': previous,
+                                     'diff': wait - previous, 'comparison_window': window})
+        trends = stats['trends']
+        assert trends['changes'] == expected_changes
+        assert trends['improving_count'] == sum(1 for c in expected_changes if c['diff'] < 0)
+        assert trends['worst_decline']['diff'] == max(c['diff'] for c in expected_changes)
+
+        day_changes = {h: current[h] - reading_ago(h, DAY)[1] for h in history.hospitals() if history.count(h) >= 2}
+        assert stats['biggest_change_24h']['biggest_increase']['change'] == max(day_changes.values())
+
+        assert stats['pressure']['over_threshold'] == sum(1 for wait in current.values() if wait >= 150)
+        history.close()
+
+
+def test_engine_without_history():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = WaitHistory(str(Path(tmp) / "history.bin"), capacity=10)
+        stats = TrendEngine(history).compute({"Ulster ED": 200}, now=START, trend_window_s=WINDOW, change_window_s=DAY)
+        assert stats['trends']['changes'] == [] and stats['trends']['unchanged_count'] == 0
+        assert stats['biggest_change_24h'] is None
+        assert stats['pressure']['percentage'] == 100
+        history.close()
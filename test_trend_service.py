@@ -0,0 +1,76 @@
+"""
+Test the multi-window trend service against the vectorised engine and the trend cache windows
+"""
+
+import random
+import tempfile
+from pathlib import Path
+
+from trend_cache_system import HospitalTrendCache
+from trend_engine_system import TrendEngine
+from trend_service_system import TrendService
+from wait_history_system import WaitHistory
+
+
+START = 1_000_000
+WINDOWS = {'30m': 1800, '24h': 86400}
+TOLERANCE = 60
+
+
+def test_service_matches_engine_as_readings_arrive():
+    rng = random.Random(11)
+    with tempfile.TemporaryDirectory() as tmp:
+        history = WaitHistory(str(Path(tmp) / "history.bin"), capacity=60, slots=2)
+        service = TrendService(WINDOWS, tolerance_s=TOLERANCE, capacity=60)
+        engine = TrendEngine(history)
+        waits = [rng.randint(30, 400) for _ in range(6)]
+        timestamp = START
+        for poll in range(400):  # Wraps the ring several times, with missed polls and late joiners
+            timestamp += 300 * rng.choice([1] * 8 + [3, 40])
+            waits = [max(0, wait + rng.randint(-25, 25)) for wait in waits]
+            readings = {f"H{i} ED": wait for i, wait in enumerate(waits) if i < 2 + poll // 50}
+            history.append(readings, timestamp=timestamp)
+            service.add(readings, timestamp)
+            if poll % 7:
+                continue
+
+            current = {f"H{i} ED": 100 + i * 13 for i in range(7)}  # H6 has no history - uses the fallback
+            now = timestamp + rng.choice([0, 240, 300])
+            windows = service.query(current, now=now, fallback={"H6 ED": 90})
+            expected = engine.compute(current, now=now, trend_window_s=WINDOWS['30m'], change_window_s=WINDOWS['24h'],
+                                      tolerance_s=TOLERANCE, fallback={"H6 ED": 90})
+            assert {k: windows['30m'][k] for k in expected['trends']} == expected['trends']
+            assert windows['24h']['biggest_change'] == expected['biggest_change_24h']
+
+        # Seeding from the history file gives the same baselines as having seen every reading
+        seeded = TrendService(WINDOWS, tolerance_s=TOLERANCE, capacity=60)
+        seeded.seed(history)
+        current = {f"H{i} ED": 150 for i in range(7)}
+        assert seeded.query(current, now=timestamp + 300) == service.query(current, now=timestamp + 300)
+        history.close()
+
+
+def test_trend_cache_windows_in_one_call():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = HospitalTrendCache(cache_file=str(tmp / "cache.json"), history_file=str(tmp / "history.bin"))
+        for i in range(36):  # 3h of 5-minute polls, waits rising 1m per poll
+            cache.update_history({"Ulster ED": 100 + i, "Mater ED": 200}, timestamp=START + i * 300)
+        now = START + 36 * 300
+        windows = cache.calculate_windows({"Ulster ED": 136, "Mater ED": 200}, now=now)
+        assert list(windows) == ['5m', '30m', '1h', '6h', '24h', '7d']
+
+        ulster = {window: next(c for c in summary['changes'] if c['hospital'] == "Ulster ED")
+                  for window, summary in windows.items()}
+        assert ulster['5m']['diff'] == 1 and ulster['1h']['diff'] == 12
+        assert ulster['7d']['previous'] == 100 and ulster['7d']['comparison_window'] == "180min"  # Oldest held
+        assert windows['1h']['avg_previous'] == (124 + 200) / 2
+        assert windows['1h']['avg_change_pct'] == round(6 / 162 * 100, 1)
+
+        # calculate_all() reads the same windows
+        stats = cache.calculate_all({"Ulster ED": 136, "Mater ED": 200}, now=now)
+        assert stats['windows'] == windows
+        assert stats['trends']['changes'] == windows['30m']['changes']
+        assert stats['biggest_change_24h']['biggest_increase']['change'] == 36
+        assert list(cache.calculate_windows({"Ulster ED": 136}, windows=['1h'], now=now)) == ['1h']
+        cache.history.close()
@@ -0,0 +1,84 @@
+"""
+Test the wait history ring buffer: wraparound, persistence, resizing and the trend cache on top of it
+"""
+
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from trend_cache_system import HospitalTrendCache
+from wait_history_system import WaitHistory
+
+
+def test_ring_wraps_and_keeps_newest_readings():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = WaitHistory(str(Path(tmp) / "history.bin"), capacity=5, slots=1)
+        for wait in range(12):
+            history.append({"Ulster ED": wait, "Mater ED": 100 + wait}, timestamp=1000 + wait * 300)  # Mater grows the slots
+        assert history.series("Ulster ED") == [7, 8, 9, 10, 11]
+        assert history.recent("Ulster ED", 3) == [9, 10, 11]
+        assert history.recent("Mater ED", 10) == [107, 108, 109, 110, 111]
+        assert history.oldest("Ulster ED") == (1000 + 7 * 300, 7)
+        assert history.count("Ulster ED") == 5
+        assert history.series("Unknown ED") == [] and history.oldest("Unknown ED") is None
+        history.close()
+
+
+def test_lookup_by_time_across_gaps_and_wraparound():
+    with tempfile.TemporaryDirectory() as tmp:
+        history = WaitHistory(str(Path(tmp) / "history.bin"), capacity=4)
+        for timestamp, wait in [(100, 1), (200, 2), (300, 3), (1300, 4), (1400, 5), (1500, 6)]:  # Polls missed 300-1300
+            history.append({"Causeway ED": wait}, timestamp=timestamp)
+        assert history.at_or_before("Causeway ED", 1299) == (300, 3)
+        assert history.at_or_before("Causeway ED", 1400) == (1400, 5)
+        assert history.at_or_before("Causeway ED", 299) is None   # Older readings were overwritten
+        assert history.at_or_before("Unknown ED", 1400) is None
+        assert history.since("Causeway ED", 1300) == [5, 6]
+        history.append({"Causeway ED": 7}, timestamp=1450)          # Clock stepped back - kept in order
+        assert history.readings("Causeway ED")[-2:] == [(1500, 6), (1500, 7)]
+        history.close()
+
+
+def test_file_survives_reopen_and_capacity_change():
+    with tempfile.TemporaryDirectory() as tmp:
+        path = str(Path(tmp) / "history.bin")
+        history = WaitHistory(path, capacity=4)
+        for wait in range(6):
+            history.append({"Antrim Area ED": wait}, timestamp=wait)
+        history.close()
+
+        reopened = WaitHistory(path, capacity=4)
+        assert reopened.series("Antrim Area ED") == [2, 3, 4, 5]
+        reopened.close()
+
+        shrunk = WaitHistory(path, capacity=2)  # Retention lowered - newest kept
+        assert shrunk.readings("Antrim Area ED") == [(4, 4), (5, 5)]
+        shrunk.append({"Antrim Area ED": 6}, timestamp=6)
+        assert shrunk.series("Antrim Area ED") == [5, 6]
+        shrunk.close()
+
+
+def test_trend_cache_windows_follow_wall_clock():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        legacy = {"hospitals": {"Ulster ED": [200, 210, 220, 230, 240, 250], "Mater ED": [90, 95]}}
+        legacy_file = tmp / "history.json"
+        legacy_file.write_text(json.dumps(legacy))
+        os.utime(legacy_file, (10_000, 10_000))
+        cache = HospitalTrendCache(cache_file=str(tmp / "cache.json"), history_file=str(tmp / "history.bin"),
+                                   history_capacity=288)
+        assert cache.history.series("Ulster ED") == legacy["hospitals"]["Ulster ED"]
+        assert cache.history.readings("Mater ED") == [(9_700, 90), (10_000, 95)]  # Aligned to the newest reading
+
+        # Two polls after a 2h outage
+        for timestamp, wait in [(17_200, 260), (17_500, 270)]:
+            cache.update_history({"Ulster ED": wait, "Mater ED": 100}, timestamp=timestamp)
+        trends = cache.calculate_trends({"Ulster ED": 280, "Mater ED": 100}, now=17_800)
+        ulster = next(c for c in trends['changes'] if c['hospital'] == "Ulster ED")
+        assert ulster['previous'] == 250 and ulster['comparison_window'] == "130min"  # Real age, not "30min"
+
+        change = cache.calculate_biggest_24h_change({"Ulster ED": 280, "Mater ED": 100}, now=17_800)
+        assert change['biggest_increase']['previous'] == 200                          # Oldest held (< 24h of history)
+        assert cache.calculate_most_stable(min_readings=2, now=17_800)['readings'] == 2
+        cache.history.close()
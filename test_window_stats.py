@@ -0,0 +1,59 @@
+"""
+Test the sliding window stats against recomputing each window from scratch
+"""
+
+import random
+import statistics
+import tempfile
+from pathlib import Path
+
+import pytest
+
+from trend_cache_system import HospitalTrendCache
+from window_stats_system import SlidingWindowStats
+
+
+def test_window_matches_recomputed_stats():
+    rng = random.Random(3)
+    window = SlidingWindowStats(window_s=3600)
+    readings = []
+    timestamp = 0
+    for _ in range(2000):
+        timestamp += rng.choice([300, 300, 300, 600, 3000])  # Includes gaps longer than the window
+        wait = rng.randint(0, 600)
+        window.add(timestamp, wait)
+        readings.append((timestamp, wait))
+
+        expected = [w for t, w in readings if t > timestamp - 3600]
+        stats = window.stats()
+        assert stats['readings'] == len(expected)
+        assert stats['min'] == min(expected) and stats['max'] == max(expected)
+        assert stats['mean'] == pytest.approx(statistics.mean(expected))
+        if len(expected) > 1:
+            assert stats['std_dev'] == pytest.approx(statistics.stdev(expected), abs=1e-6)
+
+    window.evict(timestamp + 3600)  # Query after the window has emptied
+    assert window.stats() == {'readings': 0, 'mean': 0.0, 'std_dev': 0.0, 'min': None, 'max': None}
+
+
+def test_trend_cache_stability_and_volatility():
+    with tempfile.TemporaryDirectory() as tmp:
+        tmp = Path(tmp)
+        cache = HospitalTrendCache(cache_file=str(tmp / "cache.json"), history_file=str(tmp / "history.bin"))
+        start = 1_000_000
+        for i in range(300):  # 25h of 5-minute polls
+            cache.update_history({"Steady ED": 100 + i % 2, "Swinging ED": 100 + (i % 12) * 20},
+                                 timestamp=start + i * 300)
+        now = start + 300 * 300
+
+        stable = cache.calculate_most_stable(now=now)
+        assert stable['hospital'] == "Steady ED" and stable['readings'] == 6
+        volatile = cache.calculate_volatility(now=now)
+        assert volatile['hospital'] == "Swinging ED" and volatile['range'] == 220
+        assert volatile['readings'] == 287  # 24h of polls, less the one taken now
+
+        # A restart rebuilds the windows from the history file
+        cache.history.close()
+        reopened = HospitalTrendCache(cache_file=str(tmp / "cache.json"), history_file=str(tmp / "history.bin"))
+        assert reopened.calculate_volatility(now=now) == volatile
+        reopened.history.close()
@@ -4,20 +4,95 @@ Tracks wait time changes between polls for trend analysis
 """
 
 import json
+import time
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 
+import numpy as np
+
+from shared_file_system import atomic_write, exclusive_lock
+from trend_engine_system import TrendEngine
+from trend_service_system import TrendService
+from wait_history_system import WaitHistory
+from window_stats_system import WindowStatsTracker
+
+# Comparison windows, by wall-clock time rather than reading count (polls can be skipped)
+TREND_WINDOW_SECONDS = 30 * 60
+CHANGE_WINDOW_SECONDS = 24 * 3600
+WINDOW_TOLERANCE_SECONDS = 60  # Poll jitter: a reading 29m30s old still counts as "30 minutes ago"
+
+# Every comparison window the trend service keeps a baseline for ('30m' drives the trend arrows, '24h' the "vs yesterday" stat)
+TREND_WINDOWS = {
+    '5m': 5 * 60,
+    '30m': TREND_WINDOW_SECONDS,
+    '1h': 3600,
+    '6h': 6 * 3600,
+    '24h': CHANGE_WINDOW_SECONDS,
+    '7d': 7 * 24 * 3600
+}
+
+# Windows kept incrementally for the stability/volatility stats (30min matches the trend window)
+STATS_WINDOWS = {'30min': TREND_WINDOW_SECONDS + WINDOW_TOLERANCE_SECONDS, '24h': CHANGE_WINDOW_SECONDS}
+
+# Spacing assumed for the legacy JSON history, which had no timestamps
+LEGACY_POLL_SECONDS = 300
+
 
 class HospitalTrendCache:
-    """Manages caching and comparison of hospital wait times"""
+    """Manages caching and comparison of hospital wait times
+    
+    The poller owns the files; web workers open the same files with readonly=True and call
+    refresh() to pick up its writes (see WaitHistory for how readers stay consistent).
+    """
     
-    def __init__(self, cache_file: str = "hospital_wait_cache.json", history_file: str = "hospital_wait_history.json"):
+    def __init__(self, cache_file: str = "hospital_wait_cache.json", history_file: str = "hospital_wait_history.bin",
+                 history_capacity: int = 288, readonly: bool = False):
+        """
+        Args:
+            cache_file: JSON cache of the last poll and persisted trend directions
+            history_file: Ring buffer file of recent readings per hospital (see WaitHistory)
+            history_capacity: Readings kept per hospital (288 = 24h of 5-minute polls)
+            readonly: Read another process's files without ever writing them (web workers)
+        """
         self.cache_file = Path(cache_file)
         self.history_file = Path(history_file)
+        self.readonly = readonly
         self.last_trends = {}  # Initialize before loading (will be overwritten if cache exists)
         self.cache_data = self._load_cache()
-        self.history_data = self._load_history()
+        self._cache_mtime = self._modified(self.cache_file)
+        self.history = WaitHistory(str(self.history_file), capacity=history_capacity, readonly=readonly)
+        if not readonly:
+            self._import_legacy_history()
+        self._seed_windows()
+    
+    @staticmethod
+    def _modified(path: Path) -> Optional[int]:
+        try:
+            return path.stat().st_mtime_ns
+        except FileNotFoundError:
+            return None
+    
+    def _seed_windows(self):
+        """(Re)build the trend baselines and window stats from the history file"""
+        self._seeded_at = self.history.sequence()
+        self.trend_service = TrendService(TREND_WINDOWS, tolerance_s=WINDOW_TOLERANCE_SECONDS,
+                                          capacity=self.history.capacity)
+        self.trend_service.seed(self.history)
+        self.window_stats = WindowStatsTracker(STATS_WINDOWS)
+        self.window_stats.seed(self.history)
+    
+    def refresh(self):
+        """
+        Catch up with the writer process (readonly caches): reload the JSON cache if it was replaced
+        and rebuild the windows if new readings were written since the last seed
+        """
+        modified = self._modified(self.cache_file)
+        if modified != self._cache_mtime:
+            self.cache_data = self._load_cache()
+            self._cache_mtime = modified
+        if self.history.sequence() != self._seeded_at:
+            self._seed_windows()
     
     def _load_cache(self) -> dict:
         """Load cached data from file"""
@@ -65,29 +140,35 @@ class HospitalTrendCache:
             "last_trends": {}  # Persist trend directions
         }
     
-    def _load_history(self) -> dict:
-        """Load historical data from file"""
-        if self.history_file.exists():
-            try:
-                with open(self.history_file, 'r') as f:
-                    return json.load(f)
-            except (json.JSONDecodeError, IOError):
-                return self._empty_history()
-        return self._empty_history()
-    
-    def _empty_history(self) -> dict:
-        """Create empty history structure"""
-        return {
-            "hospitals": {}  # {hospital_name: [wait1, wait2, wait3, ...]}
-        }
-    
-    def _save_history(self):
-        """Save history to file"""
-        with open(self.history_file, 'w') as f:
-            json.dump(self.history_data, f, indent=2)
+    def _import_legacy_history(self):
+        """Seed an empty ring buffer from the old JSON history ({"hospitals": {name: [waits]}}) once
+
+        The old file had no timestamps: its last reading is taken as the file's mtime and earlier
+        ones as LEGACY_POLL_SECONDS apart.
+        """
+        legacy_file = self.history_file.with_suffix(".json")
+        if self.history.hospitals() or legacy_file == self.history_file or not legacy_file.exists():
+            return
+        try:
+            with open(legacy_file, 'r') as f:
+                legacy = json.load(f).get("hospitals", {})
+        except (json.JSONDecodeError, IOError, AttributeError) as e:
+            print(f"[TREND CACHE] Legacy history unreadable, starting empty: {e}")
+            return
+        # Replay reading by reading, newest aligned to the file's mtime
+        last_written = legacy_file.stat().st_mtime
+        readings = max((len(waits) for waits in legacy.values()), default=0)
+        for i in range(readings):
+            self.history.append(
+                {hospital: waits[i - readings] for hospital, waits in legacy.items() if readings - i <= len(waits)},
+                timestamp=last_written - (readings - 1 - i) * LEGACY_POLL_SECONDS
+            )
+        print(f"[TREND CACHE] Imported legacy history for {len(legacy)} hospitals from {legacy_file}")
     
     def _save_cache(self):
-        """Save cache to file with persisted last_trends"""
+        """Save cache to file with persisted last_trends (atomic replace, safe to read from other processes)"""
+        if self.readonly:
+            raise ValueError(f"{self.cache_file} is open read-only")
         # Include last_trends in the cache data
         cache_with_trends = {
             "fetched_at": self.cache_data.get("fetched_at"),
@@ -98,8 +179,9 @@ class HospitalTrendCache:
         print(f"[TREND CACHE] Saving cache with {len(self.last_trends)} trends")
         if self.last_trends:
             print(f"[TREND CACHE] Sample trends being saved: {list(self.last_trends.items())[:3]}")
-        with open(self.cache_file, 'w') as f:
-            json.dump(cache_with_trends, f, indent=2)
+        # Swapped in whole under the writer lock - web workers reading it never see a partial file
+        with exclusive_lock(self.cache_file):
+            atomic_write(self.cache_file, json.dumps(cache_with_trends, indent=2))
     
     def update_cache(self, current_data: Dict[str, int], source_updated: str = None):
         """
@@ -121,37 +203,82 @@ class HospitalTrendCache:
         # Also update history
         self.update_history(current_data)
     
-    def update_history(self, current_data: Dict[str, int], max_history: int = 6):
+    def update_history(self, current_data: Dict[str, int], timestamp: Optional[float] = None):
         """
-        Update rolling history of wait times (keeps last N readings)
+        Append the current readings to the rolling history (oldest overwritten past history_capacity)
         
         Args:
             current_data: Dict mapping hospital names to current wait times
-            max_history: Maximum number of historical readings to keep (default 6)
+            timestamp: Unix time of the poll (default now)
         """
-        for hospital, wait_time in current_data.items():
-            if hospital not in self.history_data["hospitals"]:
-                self.history_data["hospitals"][hospital] = []
-            
-            # Append current wait time
-            self.history_data["hospitals"][hospital].append(wait_time)
-            
-            # Keep only last N readings
-            if len(self.history_data["hospitals"][hospital]) > max_history:
-                self.history_data["hospitals"][hospital] = \
-                    self.history_data["hospitals"][hospital][-max_history:]
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        self.history.append(current_data, timestamp=timestamp)
+        self.trend_service.add(current_data, timestamp)
+        self.window_stats.add(current_data, timestamp)
+    
+    def calculate_all(self, current_data: Dict[str, int], threshold: int = 120, now: Optional[float] = None) -> dict:
+        """
+        Calculate every dashboard stat from one trend service query (see TrendService)
         
-        self._save_history()
+        Args:
+            current_data: Dict mapping hospital names to current wait times
+            threshold: Pressure index threshold in minutes (default 120 = 2 hours)
+            now: Unix time of the current reading (default now)
+        
+        Returns:
+            Dict with:
+            {
+                'trends': dict,                         # As calculate_trends()
+                'biggest_change_24h': dict or None,     # As calculate_biggest_24h_change()
+                'windows': dict,                        # As calculate_windows(), every window in TREND_WINDOWS
+                'most_stable': dict or None,            # As calculate_most_stable()
+                'most_volatile': dict or None,          # As calculate_volatility()
+                'pressure': dict                        # As calculate_pressure_index()
+            }
+        """
+        now = time.time() if now is None else now
+        windows = self.calculate_windows(current_data, now=now)
+        return {
+            'trends': self._finish_trends(current_data, windows['30m']),
+            'biggest_change_24h': windows['24h']['biggest_change'],
+            'windows': windows,
+            'most_stable': self.calculate_most_stable(now=now),
+            'most_volatile': self.calculate_volatility(now=now),
+            'pressure': self.calculate_pressure_index(current_data, threshold)
+        }
     
-    def calculate_trends(self, current_data: Dict[str, int]) -> dict:
+    def calculate_windows(self, current_data: Dict[str, int], windows: Optional[List[str]] = None,
+                          now: Optional[float] = None) -> Dict[str, dict]:
+        """
+        Compare the current readings against each comparison window in one call
+        
+        Args:
+            current_data: Dict mapping hospital names to current wait times
+            windows: Window names from TREND_WINDOWS (default all)
+            now: Unix time of the current reading (default now)
+        
+        Returns:
+            Dict of {window_name: summary} - see TrendService.query(). Hospitals with no history
+            are compared against the cached last poll.
+        """
+        return self.trend_service.query(
+            current_data,
+            now=time.time() if now is None else now,
+            windows=windows,
+            fallback=self.cache_data.get("data", {})
+        )
+    
+    def calculate_trends(self, current_data: Dict[str, int], now: Optional[float] = None) -> dict:
         """
         Calculate trend statistics by comparing current vs 30-minute-ago data
         
-        Uses history data (oldest reading in 6-reading window) for more meaningful trends.
-        Falls back to cache data if insufficient history.
+        Uses the latest history reading taken 30+ minutes ago (or the oldest held, if history is
+        younger), so skipped polls don't stretch or shrink the window silently - the comparison_window
+        label is the real age of the reading. Falls back to cache data if a hospital has no history.
         
         Args:
             current_data: Dict mapping hospital names to current wait times
+            now: Unix time of the current reading (default now)
         
         Returns:
             Dict containing trend statistics:
@@ -164,9 +291,13 @@ class HospitalTrendCache:
                 'changes': [{'hospital': str, 'current': int, 'previous': int, 'diff': int}, ...]
             }
         """
+        return self.calculate_all(current_data, now=now)['trends']
+    
+    def _finish_trends(self, current_data: Dict[str, int], trends: dict) -> dict:
+        """Update the persisted trend directions from the 30m window's changes and add them to the result"""
         # Check if we have any comparison data
         has_cache = bool(self.cache_data.get("data", {}))
-        has_history = bool(self.history_data.get("hospitals", {}))
+        has_history = bool(self.history.hospitals())
         
         if not has_cache and not has_history:
             # First run - no comparison possible
@@ -181,42 +312,7 @@ class HospitalTrendCache:
                 'has_previous_data': False
             }
         
-        # Calculate differences for each hospital
-        changes = []
-        for hospital, current_wait in current_data.items():
-            # Try to get 30-minute-ago data from history (oldest reading)
-            history = self.history_data.get("hospitals", {}).get(hospital, [])
-            
-            if len(history) >= 6:
-                # Use oldest reading (30 minutes ago: 6 readings × 5 min = 30 min)
-                previous_wait = history[0]
-                comparison_window = "30min"
-            elif len(history) >= 1:
-                # Use oldest available reading (less than 30 min of history)
-                previous_wait = history[0]
-                comparison_window = f"{len(history) * 5}min"
-            else:
-                # Fall back to cache (5 minutes ago)
-                previous_wait = self.cache_data.get("data", {}).get(hospital)
-                comparison_window = "5min"
-            
-            if previous_wait is None:
-                # New hospital, no comparison
-                continue
-            
-            diff = current_wait - previous_wait  # Positive = worse, Negative = better
-            changes.append({
-                'hospital': hospital,
-                'current': current_wait,
-                'previous': previous_wait,
-                'diff': diff,
-                'comparison_window': comparison_window
-            })
-        
-        # Count trends
-        improving = [c for c in changes if c['diff'] < 0]
-        worsening = [c for c in changes if c['diff'] > 0]
-        unchanged = [c for c in changes if c['diff'] == 0]
+        changes = trends['changes']
         
         # Update last known trends (only update when there's actual change)
         # Keep existing trends for hospitals with diff == 0
@@ -235,41 +331,10 @@ class HospitalTrendCache:
             if self.last_trends:
                 print(f"[TREND DEBUG] Sample persisted trends: {list(self.last_trends.items())[:3]}")
         
-        # Find fastest improvement (most negative diff)
-        fastest_improvement = None
-        if improving:
-            best = min(improving, key=lambda x: x['diff'])
-            fastest_improvement = {
-                'hospital': best['hospital'],
-                'diff': abs(best['diff']),  # Make positive for display
-                'current': best['current'],
-                'previous': best['previous']
-            }
-        
-        # Find worst decline (most positive diff)
-        worst_decline = None
-        if worsening:
-            worst = max(worsening, key=lambda x: x['diff'])
-            worst_decline = {
-                'hospital': worst['hospital'],
-                'diff': worst['diff'],
-                'current': worst['current'],
-                'previous': worst['previous']
-            }
-        
-        result = {
-            'improving_count': len(improving),
-            'worsening_count': len(worsening),
-            'unchanged_count': len(unchanged),
-            'fastest_improvement': fastest_improvement,
-            'worst_decline': worst_decline,
-            'changes': changes,
-            'last_trends': self.last_trends,  # Include last known trends
-            'has_previous_data': True
-        }
+        result = dict(trends, last_trends=self.last_trends, has_previous_data=True)
         
         print(f"[TREND CALC] Returning trends with {len(self.last_trends)} persisted trends")
-        print(f"[TREND CALC] Changes: {len(improving)} improving, {len(worsening)} worsening, {len(unchanged)} unchanged")
+        print(f"[TREND CALC] Changes: {trends['improving_count']} improving, {trends['worsening_count']} worsening, {trends['unchanged_count']} unchanged")
         
         return result
     
@@ -318,12 +383,13 @@ class HospitalTrendCache:
         
         return f"{hospital} ↓ {diff}m"
     
-    def calculate_most_stable(self, min_readings: int = 4) -> Optional[dict]:
+    def calculate_most_stable(self, min_readings: int = 4, now: Optional[float] = None) -> Optional[dict]:
         """
-        Calculate which hospital has the most stable wait times
+        Calculate which hospital has the most stable wait times over the trend window (30 minutes)
         
         Args:
             min_readings: Minimum number of historical readings required (default 4)
+            now: Unix time the window ends at (default now)
         
         Returns:
             Dict with:
@@ -335,23 +401,18 @@ class HospitalTrendCache:
             }
             or None if insufficient data
         """
-        import statistics
-        
         stable_scores = {}
         
-        for hospital, history in self.history_data["hospitals"].items():
-            if len(history) < min_readings:
+        # Running window stats - O(1) per hospital however long the window
+        for hospital, stats in self.window_stats.all('30min', time.time() if now is None else now).items():
+            if stats['readings'] < min_readings:
                 continue
             
-            # Calculate standard deviation (lower = more stable)
-            std_dev = statistics.stdev(history)
-            avg = statistics.mean(history)
-            
             stable_scores[hospital] = {
                 'hospital': hospital,
-                'std_dev': round(std_dev, 1),
-                'readings': len(history),
-                'avg': round(avg, 0)
+                'std_dev': round(stats['std_dev'], 1),
+                'readings': stats['readings'],
+                'avg': round(stats['mean'], 0)
             }
         
         if not stable_scores:
@@ -361,6 +422,43 @@ class HospitalTrendCache:
         most_stable = min(stable_scores.values(), key=lambda x: x['std_dev'])
         return most_stable
     
+    def calculate_volatility(self, window: str = '24h', min_readings: int = 4, now: Optional[float] = None) -> Optional[dict]:
+        """
+        Calculate which hospital's wait times swung the most over a window
+        
+        Args:
+            window: Window name from STATS_WINDOWS (default '24h')
+            min_readings: Minimum number of readings in the window required (default 4)
+            now: Unix time the window ends at (default now)
+        
+        Returns:
+            Dict with:
+            {
+                'hospital': str,
+                'std_dev': float,
+                'min': int,
+                'max': int,
+                'range': int,
+                'readings': int,
+                'avg': float
+            }
+            or None if insufficient data
+        """
+        volatility = [
+            {
+                'hospital': hospital,
+                'std_dev': round(stats['std_dev'], 1),
+                'min': stats['min'],
+                'max': stats['max'],
+                'range': stats['max'] - stats['min'],
+                'readings': stats['readings'],
+                'avg': round(stats['mean'], 0)
+            }
+            for hospital, stats in self.window_stats.all(window, time.time() if now is None else now).items()
+            if stats['readings'] >= min_readings
+        ]
+        return max(volatility, key=lambda x: x['std_dev'], default=None)
+    
     def format_most_stable(self, stable_data: Optional[dict]) -> str:
         """
         Format most stable hospital stat for display
@@ -394,27 +492,7 @@ class HospitalTrendCache:
                 'severity': str  # 'High', 'Moderate', or 'Stable'
             }
         """
-        waits = list(current_data.values())
-        total = len(waits)
-        over_threshold = sum(1 for w in waits if w >= threshold)
-        
-        percentage = round((over_threshold / total) * 100) if total > 0 else 0
-        
-        # Determine severity
-        if percentage >= 80:
-            severity = "High strain"
-        elif percentage >= 50:
-            severity = "Moderate strain"
-        else:
-            severity = "Stable"
-        
-        return {
-            'percentage': percentage,
-            'over_threshold': over_threshold,
-            'total': total,
-            'severity': severity,
-            'threshold': threshold
-        }
+        return TrendEngine.pressure_index(np.array(list(current_data.values()), dtype=np.int64), threshold)
     
     def format_pressure_index(self, pressure_data: dict) -> str:
         """
@@ -428,12 +506,13 @@ class HospitalTrendCache:
         
         return f"{percentage}% hospitals over {threshold_hours}h"
     
-    def calculate_biggest_24h_change(self, current_data: Dict[str, int]) -> Optional[dict]:
+    def calculate_biggest_24h_change(self, current_data: Dict[str, int], now: Optional[float] = None) -> Optional[dict]:
         """
         Calculate biggest increase and decrease over 24 hours
         
         Args:
             current_data: Dict mapping hospital names to current wait times
+            now: Unix time of the current reading (default now)
         
         Returns:
             Dict with:
@@ -453,60 +532,8 @@ class HospitalTrendCache:
             }
             or None if insufficient data
         """
-        # Check if we have 24h history (assuming 5-minute polls = 288 readings per day)
-        # For practical purposes, we'll use the oldest available reading as "24h ago"
-        
-        if not self.history_data["hospitals"]:
-            return None
-        
-        increases = []
-        decreases = []
-        
-        for hospital, history in self.history_data["hospitals"].items():
-            if len(history) < 2:  # Need at least 2 readings
-                continue
-            
-            # Get current wait time
-            if hospital not in current_data:
-                continue
-            
-            current_wait = current_data[hospital]
-            # Use oldest reading as "24h ago" (or as far back as we have)
-            oldest_wait = history[0]
-            
-            change = current_wait - oldest_wait
-            
-            if change > 0:  # Increase
-                increases.append({
-                    'hospital': hospital,
-                    'change': change,
-                    'previous': oldest_wait,
-                    'current': current_wait
-                })
-            elif change < 0:  # Decrease
-                decreases.append({
-                    'hospital': hospital,
-                    'change': abs(change),
-                    'previous': oldest_wait,
-                    'current': current_wait
-                })
-        
-        if not increases and not decreases:
-            return None
-        
-        result = {}
-        
-        if increases:
-            result['biggest_increase'] = max(increases, key=lambda x: x['change'])
-        else:
-            result['biggest_increase'] = None
-        
-        if decreases:
-            result['biggest_decrease'] = max(decreases, key=lambda x: x['change'])
-        else:
-            result['biggest_decrease'] = None
-        
-        return result
+        # Latest reading taken 24h+ ago (or as far back as we have until then)
+        return self.calculate_all(current_data, now=now)['biggest_change_24h']
     
     def format_biggest_24h_change(self, change_data: Optional[dict]) -> dict:
         """
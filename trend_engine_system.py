@@ -0,0 +1,207 @@
+"""
+Vectorised Trend Engine
+Computes every dashboard trend stat for all hospitals in one NumPy pass over the memory-mapped wait history
+"""
+
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from wait_history_system import WaitHistory
+
+
+class TrendEngine:
+    """Vectorised view of the wait history, with all trend stats computed as array operations
+
+    The history file's rings are viewed as strided hospital × capacity arrays straight over its
+    memory map. Window baselines come from a binary search run across every hospital at once, so a
+    compute() costs O(hospitals × log capacity) array steps however long the retention - not a
+    Python loop per hospital per stat. One call gives the 30-minute trends, the 24h change and the
+    pressure index (stability is kept incrementally, see WindowStatsTracker).
+    """
+
+    def __init__(self, history: WaitHistory):
+        self.history = history
+
+    def rings(self) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Every slot's ring as strided views over the history file (no copy, writable unless the history is read-only)
+
+        Returns:
+            Tuple of (heads uint32[slots], counts uint32[slots], timestamps int64[slots, capacity],
+            waits int32[slots, capacity]) - drop them before the history is closed or resized, and
+            read them inside history.consistent() if another process writes the file
+        """
+        layout = self.history.layout()
+        slots, capacity, stride, buffer = layout['slots'], layout['capacity'], layout['slot_bytes'], layout['buffer']
+        heads = np.ndarray((slots,), dtype=np.uint32, buffer=buffer, offset=layout['head_offset'], strides=(stride,))
+        counts = np.ndarray((slots,), dtype=np.uint32, buffer=buffer, offset=layout['head_offset'] + 4,
+                            strides=(stride,))
+        times = np.ndarray((slots, capacity), dtype=np.int64, buffer=buffer, offset=layout['timestamps_offset'],
+                           strides=(stride, 8))
+        waits = np.ndarray((slots, capacity), dtype=np.int32, buffer=buffer, offset=layout['values_offset'],
+                           strides=(stride, 4))
+        return heads, counts, times, waits
+
+    def compute(self, current_data: Dict[str, int], now: float, trend_window_s: int, change_window_s: int,
+                tolerance_s: int = 0, fallback: Optional[Dict[str, int]] = None, threshold: int = 120) -> dict:
+        """
+        Compute all trend stats for the current readings in one pass
+
+        Args:
+            current_data: Dict mapping hospital names to current wait times
+            now: Unix time of the current readings
+            trend_window_s: Trend comparison window (seconds)
+            change_window_s: "vs yesterday" comparison window (seconds)
+            tolerance_s: Readings this much younger than a window still count as its baseline (poll jitter)
+            fallback: Previous waits for hospitals with no history (the last poll), compared as "5min"
+            threshold: Pressure index threshold in minutes
+
+        Returns:
+            Dict with:
+            {
+                'trends': {
+                    'improving_count': int, 'worsening_count': int, 'unchanged_count': int,
+                    'fastest_improvement': {'hospital', 'diff', 'current', 'previous'} or None,
+                    'worst_decline': {'hospital', 'diff', 'current', 'previous'} or None,
+                    'changes': [{'hospital', 'current', 'previous', 'diff', 'comparison_window'}, ...]
+                },
+                'biggest_change_24h': {'biggest_increase': {...} or None, 'biggest_decrease': {...} or None} or None,
+                'pressure': {'percentage', 'over_threshold', 'total', 'severity', 'threshold'}
+            }
+        """
+        return self.history.consistent(lambda: self._compute(current_data, now, trend_window_s, change_window_s,
+                                                             tolerance_s, fallback or {}, threshold))
+
+    def _compute(self, current_data: Dict[str, int], now: float, trend_window_s: int, change_window_s: int,
+                 tolerance_s: int, fallback: Dict[str, int], threshold: int) -> dict:
+        current_names = list(current_data)
+        slots = np.array([-1 if (slot := self.history.slot(h)) is None else slot for h in current_names],
+                         dtype=np.int64)
+        known = slots >= 0
+        rows = np.where(known, slots, 0)
+
+        ring_heads, ring_counts, ring_times, ring_waits = self.rings()
+        capacity = ring_times.shape[1]
+        counts = np.where(known, ring_counts[rows], 0).astype(np.int64)
+        oldest = ring_heads[rows].astype(np.int64) - counts  # Ring position of each row's oldest reading
+
+        def at(index: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+            """Timestamp and wait of each row's index-th oldest reading"""
+            position = (oldest + index) % capacity
+            return ring_times[rows, position], ring_waits[rows, position].astype(np.int64)
+
+        def count_at_or_before(timestamp: float) -> np.ndarray:
+            """Readings per row taken at or before a time (binary search on every row at once)"""
+            low, high = np.zeros_like(counts), counts.copy()
+            while (active := low < high).any():
+                mid = (low + high) // 2
+                later = at(mid)[0] > timestamp
+                low = np.where(active & ~later, mid + 1, low)
+                high = np.where(active & later, mid, high)
+            return low
+
+        def reading_ago(seconds: int) -> Tuple[np.ndarray, np.ndarray]:
+            """Latest reading at or before now - seconds per row, else the oldest held"""
+            return at(np.maximum(count_at_or_before(now - seconds + tolerance_s) - 1, 0))
+
+        current = np.array([current_data[h] for h in current_names], dtype=np.int64)
+        has_history = counts > 0
+
+        # 30-minute trends (cache fallback for hospitals without history)
+        taken_at, previous = reading_ago(trend_window_s)
+        ages = np.maximum(np.round((now - taken_at) / 60), 0).astype(np.int64)
+        cached = np.array([fallback.get(h) is not None for h in current_names], dtype=bool) & ~has_history
+        previous = np.where(cached, [fallback.get(h) or 0 for h in current_names], previous).astype(np.int64)
+        compared = has_history | cached
+        diffs = current - previous
+
+        # 24h change (needs 2+ readings)
+        _, day_previous = reading_ago(change_window_s)
+        day_changes = current - day_previous
+        day_compared = counts >= 2
+
+        return {
+            'trends': self.trend_summary(current_names, current, previous, diffs, compared, ages, cached),
+            'biggest_change_24h': self.change_summary(current_names, current, day_previous, day_changes, day_compared),
+            'pressure': self.pressure_index(current, threshold)
+        }
+
+    @staticmethod
+    def _pick(mask: np.ndarray, scores: np.ndarray, lowest: bool) -> Optional[int]:
+        """Index of the lowest/highest score among masked rows (first on ties), or None"""
+        if not mask.any():
+            return None
+        candidates = np.flatnonzero(mask)
+        return int(candidates[np.argmin(scores[candidates]) if lowest else np.argmax(scores[candidates])])
+
+    @staticmethod
+    def trend_summary(names: List[str], current: np.ndarray, previous: np.ndarray, diffs: np.ndarray,
+                      compared: np.ndarray, ages: np.ndarray, cached: np.ndarray) -> dict:
+        """The 'trends' dict of compute() from per-row arrays (ages in minutes; cached rows labelled "5min")"""
+        improving, worsening = compared & (diffs < 0), compared & (diffs > 0)
+        current_list, previous_list, diff_list, age_list = current.tolist(), previous.tolist(), diffs.tolist(), ages.tolist()
+        changes = [{
+            'hospital': names[i],
+            'current': current_list[i],
+            'previous': previous_list[i],
+            'diff': diff_list[i],
+            'comparison_window': "5min" if cached[i] else f"{age_list[i]}min"
+        } for i in np.flatnonzero(compared).tolist()]
+
+        def summary(i: Optional[int]) -> Optional[dict]:
+            if i is None:
+                return None
+            return {'hospital': names[i], 'diff': abs(diff_list[i]), 'current': current_list[i],
+                    'previous': previous_list[i]}
+
+        return {
+            'improving_count': int(improving.sum()),
+            'worsening_count': int(worsening.sum()),
+            'unchanged_count': int((compared & (diffs == 0)).sum()),
+            'fastest_improvement': summary(TrendEngine._pick(improving, diffs, lowest=True)),
+            'worst_decline': summary(TrendEngine._pick(worsening, diffs, lowest=False)),
+            'changes': changes
+        }
+
+    @staticmethod
+    def change_summary(names: List[str], current: np.ndarray, previous: np.ndarray, changes: np.ndarray,
+                       compared: np.ndarray) -> Optional[dict]:
+        """The 'biggest_change_24h' dict of compute() from per-row arrays, or None if nothing changed"""
+        increases, decreases = compared & (changes > 0), compared & (changes < 0)
+        if not increases.any() and not decreases.any():
+            return None
+
+        def change(i: Optional[int]) -> Optional[dict]:
+            if i is None:
+                return None
+            return {'hospital': names[i], 'change': abs(int(changes[i])), 'previous': int(previous[i]),
+                    'current': int(current[i])}
+
+        return {
+            'biggest_increase': change(TrendEngine._pick(increases, changes, lowest=False)),
+            'biggest_decrease': change(TrendEngine._pick(decreases, changes, lowest=True))
+        }
+
+    @staticmethod
+    def pressure_index(current: np.ndarray, threshold: int) -> dict:
+        """Share of hospitals at or over the threshold, with a severity label"""
+        total = len(current)
+        over_threshold = int((current >= threshold).sum())
+        percentage = round((over_threshold / total) * 100) if total > 0 else 0
+
+        # Determine severity
+        if percentage >= 80:
+            severity = "High strain"
+        elif percentage >= 50:
+            severity = "Moderate strain"
+        else:
+            severity = "Stable"
+
+        return {
+            'percentage': percentage,
+            'over_threshold': over_threshold,
+            'total': total,
+            'severity': severity,
+            'threshold': threshold
+        }
@@ -0,0 +1,159 @@
+"""
+Multi-Window Trend Service
+Keeps each hospital's baseline reading for every comparison window (5m to 7d) up to date as readings arrive
+"""
+
+import math
+from collections import deque
+from typing import Dict, Iterable, Optional, Tuple
+
+import numpy as np
+
+from trend_engine_system import TrendEngine
+from wait_history_system import WaitHistory
+
+
+class WindowBaseline:
+    """The reading one window before now for one hospital, advanced as readings arrive
+
+    Holds the readings from the current baseline onwards. Each new reading moves the baseline
+    forward past any readings that are now old enough, so a reading is popped at most once
+    (amortised O(1) per reading) and a query only steps over the readings since the last poll.
+    """
+
+    __slots__ = ("window_s", "tolerance_s", "capacity", "readings")
+
+    def __init__(self, window_s: int, tolerance_s: int, capacity: int):
+        """
+        Args:
+            window_s: Window length in seconds
+            tolerance_s: Readings this much younger than the window still count as its baseline (poll jitter)
+            capacity: Readings the history holds per hospital (older ones can't be a baseline)
+        """
+        self.window_s = window_s
+        self.tolerance_s = tolerance_s
+        self.capacity = capacity
+        self.readings = deque()  # (timestamp, wait), oldest first - front is the baseline
+
+    def add(self, timestamp: int, wait: int):
+        """Add a reading (timestamps must not go backwards) and move the baseline up to it"""
+        self.readings.append((timestamp, wait))
+        if len(self.readings) > self.capacity:
+            self.readings.popleft()
+        cutoff = timestamp - self.window_s + self.tolerance_s
+        while len(self.readings) > 1 and self.readings[1][0] <= cutoff:
+            self.readings.popleft()
+
+    def baseline(self, now: float) -> Optional[Tuple[int, int]]:
+        """Latest reading at or before now - window_s (+ tolerance), else the oldest held, or None"""
+        if not self.readings:
+            return None
+        cutoff = now - self.window_s + self.tolerance_s
+        index = 0
+        while index + 1 < len(self.readings) and self.readings[index + 1][0] <= cutoff:
+            index += 1
+        return self.readings[index]
+
+
+class TrendService:
+    """Trends for all hospitals over any set of comparison windows, from baselines kept per window
+
+    The single source for "vs 5 minutes ago" through "vs last week": the dashboard image, the
+    Telegram text and the web API all read the same per-window summaries from query().
+    """
+
+    def __init__(self, windows: Dict[str, int], tolerance_s: int = 0, capacity: int = 288):
+        """
+        Args:
+            windows: Dict of {window_name: seconds}, e.g. {'1h': 3600, '24h': 86400}
+            tolerance_s: Poll jitter allowed on every window
+            capacity: Readings the history holds per hospital (see WaitHistory)
+        """
+        self.windows = windows
+        self.tolerance_s = tolerance_s
+        self.capacity = capacity
+        self.hospitals = {}  # {hospital: {window_name: WindowBaseline}}
+        self.held = {}  # {hospital: readings held, as WaitHistory.count()}
+
+    def add(self, current_data: Dict[str, int], timestamp: float):
+        """Add one poll's readings to every window"""
+        for hospital, wait in current_data.items():
+            windows = self.hospitals.get(hospital)
+            if windows is None:
+                windows = self.hospitals[hospital] = {name: WindowBaseline(seconds, self.tolerance_s, self.capacity)
+                                                      for name, seconds in self.windows.items()}
+            newest = next(iter(windows.values())).readings
+            if newest:
+                # Clock stepped back - match WaitHistory, which never lets timestamps go backwards
+                timestamp = max(timestamp, newest[-1][0])
+            for window in windows.values():
+                window.add(timestamp, wait)
+            self.held[hospital] = min(self.held.get(hospital, 0) + 1, self.capacity)
+
+    def seed(self, history: WaitHistory):
+        """Replay each hospital's readings from its longest window's baseline onwards (once, on startup)"""
+        longest = max(self.windows.values(), default=0)
+        for hospital in history.hospitals():
+            newest = history.at_or_before(hospital, math.inf)
+            if newest is None:
+                continue
+            start = history.at_or_before(hospital, newest[0] - longest + self.tolerance_s)
+            for timestamp, wait in history.readings(hospital, after=None if start is None else start[0] - 1):
+                self.add({hospital: wait}, timestamp)
+            self.held[hospital] = history.count(hospital)
+
+    def query(self, current_data: Dict[str, int], now: float, windows: Optional[Iterable[str]] = None,
+              fallback: Optional[Dict[str, int]] = None) -> Dict[str, dict]:
+        """
+        Compare the current readings against every hospital's baseline in each window
+
+        Args:
+            current_data: Dict mapping hospital names to current wait times
+            now: Unix time of the current readings
+            windows: Window names to compare (default all)
+            fallback: Previous waits for hospitals with no history (the last poll), compared as "5min"
+
+        Returns:
+            Dict of {window_name: summary}, each summary as TrendEngine.trend_summary() plus:
+            {
+                'window_seconds': int,
+                'biggest_change': As TrendEngine.change_summary() (hospitals with 2+ readings) or None,
+                'avg_current': float or None, 'avg_previous': float or None,  # Over the compared hospitals
+                'avg_change': float or None, 'avg_change_pct': float or None
+            }
+        """
+        fallback = fallback or {}
+        names = list(current_data)
+        current = np.array([current_data[h] for h in names], dtype=np.int64)
+        held = np.array([self.held.get(h, 0) for h in names], dtype=np.int64)
+        has_history = held > 0
+        cached = np.array([fallback.get(h) is not None for h in names], dtype=bool) & ~has_history
+        compared = has_history | cached
+        cached_previous = [fallback.get(h) or 0 for h in names]
+
+        results = {}
+        for window in (self.windows if windows is None else windows):
+            baselines = [None if h not in self.hospitals else self.hospitals[h][window].baseline(now) for h in names]
+            taken_at = np.array([now if b is None else b[0] for b in baselines], dtype=np.float64)
+            previous = np.where(cached, cached_previous, [0 if b is None else b[1] for b in baselines]).astype(np.int64)
+            ages = np.maximum(np.round((now - taken_at) / 60), 0).astype(np.int64)
+            diffs = current - previous
+
+            summary = TrendEngine.trend_summary(names, current, previous, diffs, compared, ages, cached)
+            summary['window_seconds'] = self.windows[window]
+            summary['biggest_change'] = TrendEngine.change_summary(names, current, previous, diffs, held >= 2)
+            summary.update(self._averages(current[compared], previous[compared]))
+            results[window] = summary
+        return results
+
+    @staticmethod
+    def _averages(current: np.ndarray, previous: np.ndarray) -> dict:
+        if not len(current):
+            return {'avg_current': None, 'avg_previous': None, 'avg_change': None, 'avg_change_pct': None}
+        avg_current, avg_previous = float(current.mean()), float(previous.mean())
+        return {
+            'avg_current': round(avg_current, 1),
+            'avg_previous': round(avg_previous, 1),
+            'avg_change': round(avg_current - avg_previous, 1),
+            'avg_change_pct': round((avg_current - avg_previous) / avg_previous * 100, 1) if avg_previous > 0 else 0.0
+        }
@@ -0,0 +1,153 @@
+"""
+Dashboard Variant Matrix
+Renders every requested (aspect, theme, scale) variant concurrently, one browser render per layout
+"""
+
+import asyncio
+import io
+import itertools
+import time
+from typing import Callable, Dict, List, Optional
+
+from PIL import Image
+
+
+# CSS viewport per aspect ratio
+ASPECTS = {
+    "landscape": {"width": 1920, "height": 1080},  # 16:9 (Facebook landscape posts)
+    "square": {"width": 1080, "height": 1080},     # 1:1 (Instagram/Facebook square posts)
+    "portrait": {"width": 1080, "height": 1920},   # 9:16 (stories, phones)
+}
+
+
+class DashboardVariantMatrix:
+    """Renders a matrix of dashboard variants on one browser pool
+
+    Variants with the same aspect and theme share a layout: that layout is rendered once in the
+    browser at the largest requested scale (the master) and the other scales are resampled from it.
+    All layouts render concurrently in pages of one browser context.
+    """
+
+    def __init__(self, browser_pool, template_for_theme: Callable[[str], str], aspects: Dict[str, dict] = None,
+                 selector: Optional[str] = None):
+        """
+        Args:
+            browser_pool: DashboardBrowserPool to render on
+            template_for_theme: Returns the dashboard HTML for a theme ('light' or 'dark')
+            aspects: Viewport per aspect name (defaults to ASPECTS)
+            selector: Element to capture (None = the whole viewport)
+        """
+        self.browser_pool = browser_pool
+        self.template_for_theme = template_for_theme
+        self.aspects = aspects or ASPECTS
+        self.selector = selector
+
+    @staticmethod
+    def expand(aspects: List[str], themes: List[str], scales: List[float]) -> List[dict]:
+        """Every combination of aspect, theme and scale as variant dicts"""
+        return [{"aspect": aspect, "theme": theme, "scale": scale}
+                for aspect, theme, scale in itertools.product(aspects, themes, scales)]
+
+    @staticmethod
+    def variant_name(variant: dict) -> str:
+        """Stable name for a variant, e.g. 'square-dark@2x'"""
+        return f"{variant['aspect']}-{variant['theme']}@{variant['scale']:g}x"
+
+    async def render(self, dashboard_data: dict, variants: List[dict], image_format: str = "png",
+                     quality: int = 90) -> Dict:
+        """
+        Render all variants for one dashboard payload
+
+        Args:
+            dashboard_data: Data passed to updateDashboard()
+            variants: Dicts with 'aspect', 'theme' and 'scale' (see expand())
+            image_format: 'png' or 'jpeg'
+            quality: JPEG quality
+
+        Returns:
+            Dict with:
+            {
+                'images': {variant_name: {'bytes', 'format', 'width', 'height', 'scale',
+                                          'derived': bool}},  # derived = resampled from the master
+                'browser_renders': int,
+                'total_ms': float           # Wall time for the whole matrix
+            }
+        """
+        for variant in variants:
+            if variant["aspect"] not in self.aspects:
+                raise ValueError(f"Unknown aspect: {variant['aspect']} (expected one of {', '.join(self.aspects)})")
+
+        start = time.perf_counter()
+        layouts = {}
+        for variant in variants:
+            layouts.setdefault((variant["aspect"], variant["theme"]), []).append(variant)
+
+        # One master scale for the whole matrix keeps every page in the same browser context
+        master_scale = max(variant["scale"] for variant in variants)
+        results = await asyncio.gather(*(
+            self._render_layout(dashboard_data, aspect, theme, master_scale, layout_variants, image_format, quality)
+            for (aspect, theme), layout_variants in layouts.items()
+        ))
+
+        images = {}
+        for layout_images in results:
+            images.update(layout_images)
+        total_ms = (time.perf_counter() - start) * 1000
+
+        derived = sum(1 for image in images.values() if image["derived"])
+        print(f"[VARIANT MATRIX] {len(images)} variants ({len(layouts)} browser renders, {derived} resampled) "
+              f"in {total_ms:.0f}ms")
+        return {
+            "images": images,
+            "browser_renders": len(layouts),
+            "total_ms": round(total_ms, 1)
+        }
+
+    async def _render_layout(self, dashboard_data: dict, aspect: str, theme: str, master_scale: float,
+                             variants: List[dict], image_format: str, quality: int) -> Dict[str, dict]:
+        """Render one layout's master in the browser and derive its variants"""
+        viewport = self.aspects[aspect]
+        pool_variant = {"width": viewport["width"], "height": viewport["height"], "scale": master_scale,
+                        "label": theme}
+
+        async def capture(page):
+            element = await page.query_selector(self.selector) if self.selector else None
+            # Lossless master so resampled variants aren't re-encoding JPEG artefacts
+            return await (element or page).screenshot(type='png')
+
+        master_png = await self.browser_pool.render(pool_variant, self.template_for_theme(theme), dashboard_data,
+                                                    capture)
+        return await asyncio.to_thread(self._derive, master_png, master_scale, variants, image_format, quality)
+
+    def _derive(self, master_png: bytes, master_scale: float, variants: List[dict], image_format: str,
+                quality: int) -> Dict[str, dict]:
+        """Resample and encode each variant from the master capture (runs in a worker thread)"""
+        images = {}
+        with Image.open(io.BytesIO(master_png)) as master:
+            master.load()
+            for variant in variants:
+                factor = variant["scale"] / master_scale
+                image = master
+                if factor != 1:
+                    size = (max(1, round(master.size[0] * factor)), max(1, round(master.size[1] * factor)))
+                    image = master.resize(size, Image.LANCZOS)
+
+                if image_format == "png" and factor == 1:
+                    data = master_png
+                else:
+                    buffer = io.BytesIO()
+                    if image_format == "jpeg":
+                        image.convert("RGB").save(buffer, format="JPEG", quality=quality, optimize=True)
+                    else:
+                        image.save(buffer, format="PNG", optimize=True)
+                    data = buffer.getvalue()
+
+                images[self.variant_name(variant)] = {
+                    "bytes": data,
+                    "format": image_format,
+                    "width": image.size[0],
+                    "height": image.size[1],
+                    "scale": variant["scale"],
+                    "derived": factor != 1
+                }
+        return images
@@ -0,0 +1,436 @@
+"""
+Wait Time History Ring Buffer
+Fixed-capacity timestamped history per hospital in a memory-mapped binary file (O(1) append, O(log n) lookup by time)
+"""
+
+import functools
+import mmap
+import os
+import struct
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple, TypeVar
+
+from shared_file_system import exclusive_lock
+
+
+MAGIC = b"NIWH"
+VERSION = 3  # 2 = timestamps stored alongside values, 3 = seqlock and used-slot count in the header
+LEGACY_HEADER_BYTES = {2: 16}  # Header size of older versions, migrated when a writer opens them
+RETIRED = 0  # Written over the version of a file once it has been replaced - readers reopen the path
+# magic, version, capacity (readings per hospital), slots (hospitals), sequence (odd while writing), used slots
+HEADER = struct.Struct("<4sIIIQI4x")
+VERSION_FIELD = struct.Struct("<I")
+VERSION_OFFSET = 4
+SEQUENCE_FIELD = struct.Struct("<Q")
+SEQUENCE_OFFSET = 16
+USED_FIELD = struct.Struct("<I")
+USED_OFFSET = 24
+REOPEN_ATTEMPTS = 100
+
+T = TypeVar("T")
+
+
+def _consistent_read(method):
+    """Run a WaitHistory read through consistent()"""
+    @functools.wraps(method)
+    def read(self, *args, **kwargs):
+        return self.consistent(lambda: method(self, *args, **kwargs))
+    return read
+NAME_BYTES = 96
+SLOT_HEADER = struct.Struct(f"<{NAME_BYTES}sII")  # hospital name (utf-8, NUL padded), head, count
+TIMESTAMP_BYTES = 8  # int64 unix seconds
+VALUE_BYTES = 4  # int32 minutes
+
+
+class WaitHistory:
+    """Ring buffer of timestamped wait readings per hospital, stored in place in a fixed-width file
+
+    File layout: header, then one slot per hospital of [name, head, count, timestamps * capacity,
+    values * capacity] (padded to 8 bytes). Readings are written straight into the memory map, so an
+    append touches a few bytes and startup maps the file instead of parsing it - cost doesn't grow
+    with retention. Timestamps only move forward within a slot, so time lookups are a binary search.
+
+    One writer (the poller) and any number of read-only processes (web workers) can share the file.
+    Writers serialise on a lock file; readers never lock. Instead the header holds a sequence number
+    that is odd while a write is in progress (a seqlock): every read runs against the shared map and
+    is retried if the sequence moved, so readers always see whole polls and never hold up the writer.
+    Resizes build a new file and swap it in, then mark the old one retired so readers reopen.
+    """
+
+    def __init__(self, path: str, capacity: int = 288, slots: int = 32, readonly: bool = False):
+        """
+        Args:
+            path: History file (created if missing, unless readonly)
+            capacity: Readings kept per hospital (288 = 24h of 5-minute polls)
+            slots: Hospitals the file has room for (grows automatically)
+            readonly: Map the file read-only and follow the writer (empty until the writer creates it)
+        """
+        self.path = Path(path)
+        self.readonly = readonly
+        self.capacity, self.slots = capacity, slots
+        self._mm = None
+        self._file = None
+        self._thread = threading.local()  # .inside: this thread is already writing, or in a consistent() read
+        self._header_bytes = HEADER.size
+        self._slot_bytes = self._slot_size(capacity)
+        self._index = {}  # {hospital: slot}
+        self._timestamps, self._values = [], []
+        if readonly:
+            self._refresh()
+            return
+        with exclusive_lock(self.path):
+            if not self.path.exists() or self.path.stat().st_size < HEADER.size:
+                self._build(self.path, capacity, slots, {})
+            try:
+                self._open()
+            except ValueError as e:
+                # Derived data (the trend cache re-seeds from the legacy JSON) - start again rather than fail
+                print(f"[WAIT HISTORY] {e}, starting a new file")
+                self._build(self.path, capacity, slots, {})
+                self._open()
+            if self.capacity != capacity or self._header_bytes != HEADER.size:
+                # Retention changed or an older version - rewrite keeping the newest readings
+                self._resize(capacity, self.slots)
+
+    @staticmethod
+    def _slot_size(capacity: int) -> int:
+        size = SLOT_HEADER.size + capacity * (TIMESTAMP_BYTES + VALUE_BYTES)
+        return size + -size % 8  # Keep every slot's timestamps 8-byte aligned
+
+    @classmethod
+    def _build(cls, path: Path, capacity: int, slots: int, series: Dict[str, List[Tuple[int, int]]],
+               sequence: int = 0):
+        """Write a complete file next to path, filled with the given readings, then swap it in"""
+        tmp_path = path.with_name(path.name + ".tmp")
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, capacity, slots, sequence, 0))
+            f.truncate(HEADER.size + slots * cls._slot_size(capacity))
+        scratch = cls.__new__(cls)
+        scratch.path, scratch.readonly, scratch._mm, scratch._file = tmp_path, False, None, None
+        scratch._thread = threading.local()
+        scratch._thread.inside = True
+        scratch._open()
+        for hospital, readings in series.items():
+            for timestamp, value in readings:
+                scratch._append_one(hospital, value, timestamp)
+        scratch.flush()
+        scratch.close()
+        os.replace(tmp_path, path)
+
+    def _open(self):
+        self._file = open(self.path, "rb" if self.readonly else "r+b")
+        try:
+            self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ if self.readonly else mmap.ACCESS_WRITE)
+        except ValueError:
+            self.close()
+            raise ValueError(f"{self.path} is empty")
+        magic, version, self.capacity, self.slots = struct.unpack_from("<4sIII", self._mm, 0)
+        if magic != MAGIC or not (version == VERSION or version in LEGACY_HEADER_BYTES and not self.readonly):
+            self.close()
+            raise ValueError(f"{self.path} is not a wait history file (version {VERSION})")
+        self._header_bytes = HEADER.size if version == VERSION else LEGACY_HEADER_BYTES[version]
+        self._slot_bytes = self._slot_size(self.capacity)
+        self._index = {}  # {hospital: slot}
+        self._timestamps = []  # int64 view of each slot's timestamp ring
+        self._values = []  # int32 view of each slot's value ring
+        view = memoryview(self._mm)
+        for slot in range(self.slots):
+            offset = self._slot_offset(slot)
+            start = offset + SLOT_HEADER.size
+            middle = start + self.capacity * TIMESTAMP_BYTES
+            self._timestamps.append(view[start:middle].cast("q"))
+            self._values.append(view[middle:middle + self.capacity * VALUE_BYTES].cast("i"))
+        self._index_slots()
+
+    def _index_slots(self):
+        """Add named slots not yet in the index (the writer names slots in order, then bumps the used count)"""
+        for slot in range(len(self._index), self.slots):
+            name = SLOT_HEADER.unpack_from(self._mm, self._slot_offset(slot))[0].rstrip(b"\0")
+            if not name:
+                break
+            self._index[name.decode("utf-8")] = slot
+
+    def _reopen(self):
+        """Map the current file at the path (it was replaced, or a reader is waiting for it to be created)"""
+        self.close()
+        for _ in range(REOPEN_ATTEMPTS):
+            try:
+                self._open()
+                return
+            except FileNotFoundError:
+                return
+            except ValueError:
+                if not self.readonly:
+                    raise
+                time.sleep(0.001)  # Caught a file mid-swap - the writer retires it straight after
+
+    def _refresh(self):
+        """Follow other processes' writes: reopen a replaced file and index hospitals added since"""
+        if self._mm is None:
+            if self.readonly:
+                self._reopen()
+            return
+        if self._header_bytes != HEADER.size:
+            return  # Older version, only open while a writer migrates it
+        _, version, _, _, _, used = HEADER.unpack_from(self._mm, 0)
+        if version == RETIRED:
+            self._reopen()
+        elif used > len(self._index):
+            self._index_slots()
+
+    def _sequence(self) -> int:
+        if self._mm is None or self._header_bytes != HEADER.size:
+            return 0
+        return SEQUENCE_FIELD.unpack_from(self._mm, SEQUENCE_OFFSET)[0]
+
+    @contextmanager
+    def _writing(self):
+        """Exclusive write: lock out other writers and keep the sequence odd so readers retry"""
+        if self.readonly:
+            raise ValueError(f"{self.path} is open read-only")
+        with exclusive_lock(self.path):
+            self._refresh()
+            SEQUENCE_FIELD.pack_into(self._mm, SEQUENCE_OFFSET, self._sequence() + 1)
+            self._in_write = True
+            try:
+                yield
+            finally:
+                self._thread = threading.local()  # .inside: this thread is already writing, or in a consistent() read
+                SEQUENCE_FIELD.pack_into(self._mm, SEQUENCE_OFFSET, self._sequence() + 1)
+
+    def consistent(self, read: Callable[[], T]) -> T:
+        """
+        Run a read against a consistent view of the file, retrying it if a write overlapped
+
+        Every public read goes through here; wrap several reads in one call to see them all as of
+        the same poll (TrendEngine.compute() does). Never blocks the writer.
+        """
+        if getattr(self._thread, "inside", False):
+            return read()  # Nested read (the outer one validates), or the writer reading its own poll
+        while True:
+            self._refresh()
+            start = self._sequence()
+            if start & 1:
+                time.sleep(0)  # Write in progress
+                continue
+            self._thread.inside = True
+            try:
+                result = read()
+            except (IndexError, ValueError, struct.error):
+                if self._sequence() == start:
+                    raise
+                continue  # Torn read of a slot being rewritten
+            finally:
+                self._thread.inside = False
+            if self._sequence() == start:
+                return result
+
+    def _slot_offset(self, slot: int) -> int:
+        return self._header_bytes + slot * self._slot_bytes
+
+    def _resize(self, capacity: int, slots: int):
+        """Rewrite the file with a new capacity/slot count, keeping the newest readings"""
+        series = {hospital: self.readings(hospital)[-capacity:] for hospital in self._index}
+        self._build(self.path, capacity, slots, series, sequence=self._sequence())
+        # Readers still mapping the old file see it retired and reopen the path
+        VERSION_FIELD.pack_into(self._mm, VERSION_OFFSET, RETIRED)
+        self.close()
+        self._open()
+
+    def _slot_for(self, hospital: str) -> int:
+        slot = self._index.get(hospital)
+        if slot is not None:
+            return slot
+        name = hospital.encode("utf-8")
+        if len(name) > NAME_BYTES:
+            raise ValueError(f"Hospital name longer than {NAME_BYTES} bytes: {hospital}")
+        if len(self._index) == self.slots:
+            self._resize(self.capacity, self.slots * 2)
+        slot = len(self._index)
+        SLOT_HEADER.pack_into(self._mm, self._slot_offset(slot), name, 0, 0)
+        self._index[hospital] = slot
+        USED_FIELD.pack_into(self._mm, USED_OFFSET, len(self._index))  # Name first - readers index up to used
+        return slot
+
+    def _append_one(self, hospital: str, wait: int, timestamp: int):
+        slot = self._slot_for(hospital)
+        offset = self._slot_offset(slot)
+        name, head, count = SLOT_HEADER.unpack_from(self._mm, offset)
+        if count:
+            # Clock stepped back - never let a slot's timestamps go backwards (keeps the bisect valid)
+            timestamp = max(timestamp, self._timestamps[slot][(head - 1) % self.capacity])
+        # Reading first, then the slot header - a crash in between only loses this reading
+        self._timestamps[slot][head] = timestamp
+        self._values[slot][head] = wait
+        SLOT_HEADER.pack_into(self._mm, offset, name, (head + 1) % self.capacity, min(count + 1, self.capacity))
+
+    def append(self, readings: Dict[str, int], timestamp: Optional[float] = None):
+        """
+        Append one poll's readings (oldest readings are overwritten once a hospital is at capacity)
+
+        Args:
+            readings: Dict of {hospital_name: wait_minutes}
+            timestamp: Unix time of the poll (default now)
+        """
+        timestamp = int(time.time() if timestamp is None else timestamp)
+        with self._writing():
+            for hospital, wait in readings.items():
+                self._append_one(hospital, int(wait), timestamp)
+        self.flush()
+
+    def _ring(self, hospital: str) -> Tuple[int, int, int]:
+        """(slot, head, count) of a hospital, or (-1, 0, 0) without history"""
+        slot = self._index.get(hospital)
+        if slot is None:
+            return -1, 0, 0
+        _, head, count = SLOT_HEADER.unpack_from(self._mm, self._slot_offset(slot))
+        return slot, head, count
+
+    def _position(self, head: int, count: int, i: int) -> int:
+        """Ring position of the i-th oldest reading"""
+        return (head - count + i) % self.capacity
+
+    def _count_at_or_before(self, slot: int, head: int, count: int, timestamp: float) -> int:
+        """Number of readings in a slot taken at or before a time (bisect over the ring in age order)"""
+        low, high = 0, count
+        while low < high:
+            mid = (low + high) // 2
+            if self._timestamps[slot][self._position(head, count, mid)] <= timestamp:
+                low = mid + 1
+            else:
+                high = mid
+        return low
+
+    @_consistent_read
+    def at_or_before(self, hospital: str, timestamp: float) -> Optional[Tuple[int, int]]:
+        """
+        Latest reading taken at or before a time (binary search over the ring)
+
+        Args:
+            hospital: Hospital name
+            timestamp: Unix time
+
+        Returns:
+            (timestamp, wait_minutes), or None if every reading held is newer
+        """
+        slot, head, count = self._ring(hospital)
+        older = self._count_at_or_before(slot, head, count, timestamp)
+        if older == 0:
+            return None
+        position = self._position(head, count, older - 1)
+        return self._timestamps[slot][position], self._values[slot][position]
+
+    @_consistent_read
+    def since(self, hospital: str, timestamp: float) -> List[int]:
+        """Waits recorded after a time, oldest first"""
+        slot, head, count = self._ring(hospital)
+        older = self._count_at_or_before(slot, head, count, timestamp)
+        return [self._values[slot][self._position(head, count, i)] for i in range(older, count)]
+
+    @_consistent_read
+    def readings(self, hospital: str, after: Optional[float] = None) -> List[Tuple[int, int]]:
+        """(timestamp, wait_minutes) readings for a hospital, oldest first - all, or those taken after a time"""
+        slot, head, count = self._ring(hospital)
+        start = 0 if after is None else self._count_at_or_before(slot, head, count, after)
+        return [(self._timestamps[slot][position], self._values[slot][position])
+                for position in (self._position(head, count, i) for i in range(start, count))]
+
+    @_consistent_read
+    def count(self, hospital: str) -> int:
+        """Number of readings held for a hospital"""
+        return self._ring(hospital)[2]
+
+    @_consistent_read
+    def series(self, hospital: str) -> List[int]:
+        """All waits for a hospital, oldest first"""
+        slot = self._index.get(hospital)
+        if slot is None:
+            return []
+        _, head, count = SLOT_HEADER.unpack_from(self._mm, self._slot_offset(slot))
+        values = self._values[slot]
+        if count < self.capacity:
+            return values[:count].tolist()
+        return values[head:].tolist() + values[:head].tolist()
+
+    @_consistent_read
+    def recent(self, hospital: str, n: int) -> List[int]:
+        """Newest n waits for a hospital, oldest first"""
+        slot = self._index.get(hospital)
+        if slot is None:
+            return []
+        _, head, count = SLOT_HEADER.unpack_from(self._mm, self._slot_offset(slot))
+        n = min(n, count)
+        start = head - n
+        values = self._values[slot]
+        if start >= 0:
+            return values[start:head].tolist()
+        return values[self.capacity + start:].tolist() + values[:head].tolist()
+
+    @_consistent_read
+    def oldest(self, hospital: str) -> Optional[Tuple[int, int]]:
+        """Oldest (timestamp, wait_minutes) reading held for a hospital, or None"""
+        slot, head, count = self._ring(hospital)
+        if count == 0:
+            return None
+        position = self._position(head, count, 0)
+        return self._timestamps[slot][position], self._values[slot][position]
+
+    @_consistent_read
+    def slot(self, hospital: str) -> Optional[int]:
+        """Slot index of a hospital in the file, or None without history"""
+        return self._index.get(hospital)
+
+    @_consistent_read
+    def layout(self) -> dict:
+        """
+        Where the rings live in the mapped file, for readers that view them as arrays (see TrendEngine)
+
+        Returns:
+            Dict with:
+            {
+                'buffer': mmap,             # Map of the whole file (read-only if the history is)
+                'capacity': int,
+                'slots': int,
+                'slot_bytes': int,          # Stride between slots
+                'head_offset': int,         # uint32 head of slot 0 (count follows it)
+                'timestamps_offset': int,   # int64[capacity] of slot 0
+                'values_offset': int        # int32[capacity] of slot 0
+            }
+            A slot's i-th oldest reading is at ring position (head - count + i) % capacity.
+        """
+        timestamps_offset = self._header_bytes + SLOT_HEADER.size
+        return {
+            'buffer': self._mm,
+            'capacity': self.capacity,
+            'slots': self.slots,
+            'slot_bytes': self._slot_bytes,
+            'head_offset': self._header_bytes + NAME_BYTES,
+            'timestamps_offset': timestamps_offset,
+            'values_offset': timestamps_offset + self.capacity * TIMESTAMP_BYTES
+        }
+
+    def sequence(self) -> int:
+        """Write counter of the file - changes with every poll appended, by any process"""
+        return self.consistent(self._sequence)
+
+    @_consistent_read
+    def hospitals(self) -> List[str]:
+        """Hospitals with history, in first-seen order"""
+        return list(self._index)
+
+    def flush(self):
+        """Write dirty pages back to the file"""
+        if self._mm is not None and not self.readonly:
+            self._mm.flush()
+
+    def close(self):
+        if self._mm is not None:
+            self._timestamps, self._values = [], []
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
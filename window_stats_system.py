@@ -0,0 +1,124 @@
+"""
+Sliding Window Wait Statistics
+Mean, standard deviation, min and max of each hospital's recent readings, updated in O(1) as readings arrive
+"""
+
+import math
+from collections import deque
+from typing import Dict, Optional
+
+from wait_history_system import WaitHistory
+
+
+class SlidingWindowStats:
+    """Running stats over the readings in a trailing time window
+
+    Mean and variance use Welford's method with removal, so adding or evicting a reading is O(1).
+    Min and max come from monotonic deques (amortised O(1)). Queries never rescan the window.
+    """
+
+    __slots__ = ("window_s", "readings", "mean", "m2", "minima", "maxima")
+
+    def __init__(self, window_s: int):
+        """
+        Args:
+            window_s: Window length in seconds (readings taken at or before newest - window_s drop out)
+        """
+        self.window_s = window_s
+        self.readings = deque()  # (timestamp, wait), oldest first
+        self.mean = 0.0
+        self.m2 = 0.0  # Sum of squared deviations from the mean
+        self.minima = deque()  # (timestamp, wait), waits increasing - front is the window minimum
+        self.maxima = deque()  # (timestamp, wait), waits decreasing - front is the window maximum
+
+    def add(self, timestamp: float, wait: int):
+        """Add a reading (timestamps must not go backwards) and evict readings now outside the window"""
+        self.readings.append((timestamp, wait))
+        delta = wait - self.mean
+        self.mean += delta / len(self.readings)
+        self.m2 += delta * (wait - self.mean)
+
+        while self.minima and self.minima[-1][1] >= wait:
+            self.minima.pop()
+        self.minima.append((timestamp, wait))
+        while self.maxima and self.maxima[-1][1] <= wait:
+            self.maxima.pop()
+        self.maxima.append((timestamp, wait))
+
+        self.evict(timestamp)
+
+    def evict(self, now: float):
+        """Drop readings taken at or before now - window_s"""
+        cutoff = now - self.window_s
+        while self.readings and self.readings[0][0] <= cutoff:
+            _, wait = self.readings.popleft()
+            if not self.readings:
+                self.mean, self.m2 = 0.0, 0.0
+            else:
+                delta = wait - self.mean
+                self.mean -= delta / len(self.readings)
+                self.m2 -= delta * (wait - self.mean)
+        while self.minima and self.minima[0][0] <= cutoff:
+            self.minima.popleft()
+        while self.maxima and self.maxima[0][0] <= cutoff:
+            self.maxima.popleft()
+
+    def stats(self) -> dict:
+        """
+        Returns:
+            Dict with {'readings': int, 'mean': float, 'std_dev': float (sample, 0 below 2 readings),
+            'min': int or None, 'max': int or None}
+        """
+        n = len(self.readings)
+        return {
+            'readings': n,
+            'mean': self.mean,
+            'std_dev': math.sqrt(max(self.m2, 0.0) / (n - 1)) if n > 1 else 0.0,  # m2 can dip below 0 by rounding
+            'min': self.minima[0][1] if self.minima else None,
+            'max': self.maxima[0][1] if self.maxima else None
+        }
+
+
+class WindowStatsTracker:
+    """SlidingWindowStats per hospital for each named window, fed from the polling loop"""
+
+    def __init__(self, windows: Dict[str, int]):
+        """
+        Args:
+            windows: Dict of {window_name: seconds}, e.g. {'30min': 1860, '24h': 86400}
+        """
+        self.windows = windows
+        self.hospitals = {}  # {hospital: {window_name: SlidingWindowStats}}
+
+    def add(self, current_data: Dict[str, int], timestamp: float):
+        """Add one poll's readings to every window"""
+        for hospital, wait in current_data.items():
+            windows = self.hospitals.get(hospital)
+            if windows is None:
+                windows = self.hospitals[hospital] = {name: SlidingWindowStats(seconds)
+                                                      for name, seconds in self.windows.items()}
+            for window in windows.values():
+                window.add(timestamp, wait)
+
+    def seed(self, history: WaitHistory):
+        """Replay each hospital's readings within the longest window of its newest one (once, on startup)"""
+        longest = max(self.windows.values(), default=0)
+        for hospital in history.hospitals():
+            newest = history.at_or_before(hospital, math.inf)
+            if newest is None:
+                continue
+            for timestamp, wait in history.readings(hospital, after=newest[0] - longest):
+                self.add({hospital: wait}, timestamp)
+
+    def get(self, hospital: str, window: str, now: Optional[float] = None) -> Optional[dict]:
+        """Stats of one hospital's window as of now (default: as of its newest reading), or None"""
+        stats = self.hospitals.get(hospital, {}).get(window)
+        if stats is None:
+            return None
+        if now is not None:
+            stats.evict(now)
+        return stats.stats()
+
+    def all(self, window: str, now: Optional[float] = None) -> Dict[str, dict]:
+        """Stats of every hospital's window, as get()"""
+        return {hospital: self.get(hospital, window, now) for hospital in self.hospitals}